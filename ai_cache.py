@@ -0,0 +1,185 @@
+"""
+AI Analysis Cache
+Content-addressed cache for Gemini career analyses, keyed by a normalized
+student profile and the career row it was computed for
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Cache configuration
+AI_CACHE_SIZE = int(os.getenv('AI_CACHE_SIZE', '2048'))
+AI_CACHE_TTL = int(os.getenv('AI_CACHE_TTL', str(7 * 24 * 3600)))
+AI_CACHE_PERSIST = os.getenv('AI_CACHE_PERSIST', 'False').lower() == 'true'
+
+# Bump when the shape or meaning of cached analyses changes
+CACHE_VERSION = 3
+
+# Fields of the analysis that come from the model; career_details is re-attached on read
+CACHED_FIELDS = ('match_score', 'reasoning', 'skill_gaps')
+
+# Age bands the profile is normalized to, as (upper bound, label)
+AGE_BANDS = [(17, 'under-18'), (21, '18-21'), (25, '22-25'), (30, '26-30')]
+
+
+def age_band(age):
+    """Map an age onto a coarse band so nearby ages share cache entries"""
+    try:
+        age = int(age)
+    except (TypeError, ValueError):
+        return 'unknown'
+    for upper, label in AGE_BANDS:
+        if age <= upper:
+            return label
+    return '31+'
+
+
+def _normalize_terms(terms):
+    return sorted({str(term).strip().lower() for term in terms or [] if str(term).strip()})
+
+
+def normalize_profile(user_dict, user_interests, user_skills):
+    """Reduce a student profile to the fields that influence an analysis"""
+    return {
+        'education_level': (user_dict.get('education_level') or '').strip().lower(),
+        'age_band': age_band(user_dict.get('age')),
+        'interests': _normalize_terms(user_interests),
+        'skills': _normalize_terms(user_skills)
+    }
+
+
+def career_fingerprint(career_dict, required_skills):
+    """
+    Hash the parts of a career the analysis depends on, so edits change the
+    key. `required_skills` is the list the prompt and fallback actually used
+    (the normalized career_skills rows, not necessarily the JSON column).
+    """
+    payload = {
+        'title': career_dict.get('title'),
+        'industry': career_dict.get('industry'),
+        'description': career_dict.get('description'),
+        'required_skills': list(required_skills)
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def cache_key(profile, career_dict, required_skills, mode='career'):
+    """Canonical content hash of a normalized profile and a career with its required skills"""
+    payload = {
+        'version': CACHE_VERSION,
+        'mode': mode,
+        'profile': profile,
+        'career_id': career_dict['id'],
+        'career': career_fingerprint(career_dict, required_skills)
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Thread-safe LRU cache of analyses with a TTL. When `connect` is given,
+    entries are also written through to an ai_analysis_cache SQLite table so
+    they survive restarts.
+    """
+
+    def __init__(self, max_entries=None, ttl=None, connect=None):
+        self.max_entries = max_entries or AI_CACHE_SIZE
+        self.ttl = AI_CACHE_TTL if ttl is None else ttl
+        self.connect = connect
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.persistent_hits = 0
+
+    def _expired(self, stored_at, now):
+        return self.ttl > 0 and now - stored_at > self.ttl
+
+    def _remember(self, key, career_id, analysis, stored_at):
+        # Caller holds the lock
+        self._entries[key] = (career_id, analysis, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        """Return the cached analysis for a key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and not self._expired(entry[2], now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[1])
+            if entry:
+                del self._entries[key]
+
+        if self.connect:
+            conn = self.connect()
+            try:
+                row = conn.execute(
+                    'SELECT career_id, payload, stored_at FROM ai_analysis_cache WHERE cache_key = ?', (key,)
+                ).fetchone()
+                if row and self._expired(row[2], now):
+                    conn.execute('DELETE FROM ai_analysis_cache WHERE cache_key = ?', (key,))
+                    conn.commit()
+                    row = None
+            finally:
+                conn.close()
+
+            if row:
+                analysis = json.loads(row[1])
+                with self._lock:
+                    self._remember(key, row[0], analysis, row[2])
+                    self.hits += 1
+                    self.persistent_hits += 1
+                return dict(analysis)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, career_id, recommendation):
+        """Store the model-derived fields of a recommendation"""
+        analysis = {field: recommendation[field] for field in CACHED_FIELDS}
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, career_id, analysis, stored_at)
+
+        if self.connect:
+            conn = self.connect()
+            try:
+                conn.execute('''
+                    INSERT OR REPLACE INTO ai_analysis_cache (cache_key, career_id, payload, stored_at)
+                    VALUES (?, ?, ?, ?)
+                ''', (key, career_id, json.dumps(analysis), stored_at))
+                conn.commit()
+            finally:
+                conn.close()
+
+    def clear(self):
+        """Drop every in-memory entry (persisted entries are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'persistent': bool(self.connect),
+                'hits': self.hits,
+                'persistent_hits': self.persistent_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,308 @@
+"""
+Resilient Gemini Client
+Wraps a model object (LazyGeminiModel or a test stub) with a
+token-bucket rate limiter, an adaptive concurrency limit and a circuit
+breaker, shared by every request in the process. While the breaker is open,
+calls fail immediately and the AI engine falls back to skill-overlap scoring
+instead of waiting for each career's call to fail on its own.
+"""
+
+import os
+import time
+import threading
+
+# Client configuration
+AI_RATE_LIMIT = float(os.getenv('AI_RATE_LIMIT', '10'))  # calls per second, 0 = unlimited
+AI_RATE_BURST = int(os.getenv('AI_RATE_BURST', '10'))
+AI_MAX_CONCURRENCY = int(os.getenv('AI_MAX_CONCURRENCY', os.getenv('AI_MAX_WORKERS', '8')))
+AI_MIN_CONCURRENCY = int(os.getenv('AI_MIN_CONCURRENCY', '1'))
+AI_QUEUE_TIMEOUT = float(os.getenv('AI_QUEUE_TIMEOUT', '10'))
+AI_SLOW_CALL_SECONDS = float(os.getenv('AI_SLOW_CALL_SECONDS', os.getenv('AI_CALL_TIMEOUT', '20')))
+AI_BREAKER_FAILURES = int(os.getenv('AI_BREAKER_FAILURES', '5'))
+AI_BREAKER_RESET_SECONDS = float(os.getenv('AI_BREAKER_RESET_SECONDS', '30'))
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the model while the circuit breaker is open"""
+
+
+class RateLimitedError(RuntimeError):
+    """Raised when a call waited AI_QUEUE_TIMEOUT for a rate or concurrency slot"""
+
+
+def is_quota_error(error):
+    """Gemini signals quota exhaustion as ResourceExhausted / HTTP 429"""
+    return type(error).__name__ in ('ResourceExhausted', 'TooManyRequests') or '429' in str(error)
+
+
+class TokenBucket:
+    """Allows `rate` calls per second on average, with bursts of up to `burst`"""
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        """Take a token, or return the seconds until one is available"""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout, abort=None):
+        """Wait up to `timeout` seconds for a token; False if none came (or abort() turned true)"""
+        if self.rate <= 0:
+            return True
+        deadline = self.clock() + timeout
+        while True:
+            wait = self._take()
+            if wait == 0:
+                return True
+            if (abort and abort()) or self.clock() + wait > deadline:
+                return False
+            time.sleep(min(wait, 0.05))
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adjusted by AIMD: every `limit` successful calls raise
+    it by one, a failed or slow call halves it, within [min_limit, max_limit].
+    """
+
+    def __init__(self, max_limit, min_limit=1):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout, abort=None):
+        """Wait up to `timeout` seconds for a slot; False if none came (or abort() turned true)"""
+        with self._cond:
+            ready = self._cond.wait_for(lambda: self.in_flight < self.limit or (abort and abort()),
+                                        timeout=timeout)
+            if not ready or self.in_flight >= self.limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, ok):
+        with self._cond:
+            self.in_flight -= 1
+            if ok:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.max_limit:
+                    self.limit += 1
+                    self._successes = 0
+            else:
+                self.limit = max(self.min_limit, self.limit // 2)
+                self._successes = 0
+            self._cond.notify_all()
+
+    def wake_all(self):
+        with self._cond:
+            self._cond.notify_all()
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures. After
+    `reset_seconds` one trial call is let through (half-open): success
+    closes the breaker, failure opens it for another period.
+    """
+
+    def __init__(self, failure_threshold, reset_seconds, clock=time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        """True while calls would be refused (the trial call of a half-open breaker counts as open)"""
+        with self._lock:
+            self._maybe_half_open()
+            return self.state == 'open' or (self.state == 'half_open' and self._trial_in_flight)
+
+    def _maybe_half_open(self):
+        # Caller holds the lock
+        if self.state == 'open' and self.clock() - self.opened_at >= self.reset_seconds:
+            self.state = 'half_open'
+            self._trial_in_flight = False
+
+    def allow(self):
+        """Whether a call may go ahead now"""
+        with self._lock:
+            self._maybe_half_open()
+            if self.state == 'closed':
+                return True
+            if self.state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def cancel_trial(self):
+        """A call let through by allow() never reached the model"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Count a failure; returns True if this one opened the breaker"""
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self.failure_threshold):
+                self.state = 'open'
+                self.opened_at = self.clock()
+                self.times_opened += 1
+                self._trial_in_flight = False
+                return True
+            return False
+
+
+class LazyGeminiModel:
+    """
+    genai.GenerativeModel that is only imported and configured on the first
+    call. google.generativeai and its gRPC stack take most of a cold start
+    to import, and most requests never reach the model.
+    """
+
+    def __init__(self, api_key, model_name='gemini-pro'):
+        self.api_key = api_key
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=self.api_key)
+                self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def generate_content(self, prompt, **kwargs):
+        return (self._model or self._load()).generate_content(prompt, **kwargs)
+
+
+class ResilientModel:
+    """
+    Drop-in wrapper for a model's generate_content(). Calls wait for a rate
+    token and a concurrency slot (up to `queue_timeout` seconds) and are
+    refused outright while the breaker is open. Calls slower than
+    `slow_call_seconds` count as failures, since the caller has given up on
+    them by then.
+    """
+
+    def __init__(self, model, rate=None, burst=None, max_concurrency=None, min_concurrency=None,
+                 queue_timeout=None, slow_call_seconds=None, failure_threshold=None,
+                 reset_seconds=None, clock=time.monotonic):
+        self.model = model
+        self.clock = clock
+        self.queue_timeout = AI_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        self.slow_call_seconds = AI_SLOW_CALL_SECONDS if slow_call_seconds is None else slow_call_seconds
+        self.bucket = TokenBucket(AI_RATE_LIMIT if rate is None else rate,
+                                  burst or AI_RATE_BURST, clock=clock)
+        self.limiter = AdaptiveLimiter(max_concurrency or AI_MAX_CONCURRENCY,
+                                       min_concurrency or AI_MIN_CONCURRENCY)
+        self.breaker = CircuitBreaker(AI_BREAKER_FAILURES if failure_threshold is None else failure_threshold,
+                                      AI_BREAKER_RESET_SECONDS if reset_seconds is None else reset_seconds,
+                                      clock=clock)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.quota_errors = 0
+        self.short_circuited = 0
+        self.rate_limited = 0
+
+    @property
+    def available(self):
+        """False while the breaker refuses calls, so callers can skip the model entirely"""
+        return not self.breaker.is_open
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def generate_content(self, prompt, **kwargs):
+        if not self.breaker.allow():
+            self._count('short_circuited')
+            raise CircuitOpenError('Gemini circuit breaker is open')
+
+        # The breaker may open while we queue; stop waiting as soon as it does
+        opened = lambda: self.breaker.state == 'open'
+        if not (self.bucket.acquire(self.queue_timeout, abort=opened)
+                and self.limiter.acquire(self.queue_timeout, abort=opened)):
+            self.breaker.cancel_trial()
+            if opened():
+                self._count('short_circuited')
+                raise CircuitOpenError('Gemini circuit breaker is open')
+            self._count('rate_limited')
+            raise RateLimitedError('timed out waiting for a rate limit token or concurrency slot')
+
+        self._count('calls')
+        started = self.clock()
+        try:
+            response = self.model.generate_content(prompt, **kwargs)
+        except Exception as e:
+            self._count('failures')
+            if is_quota_error(e):
+                self._count('quota_errors')
+            self._failed()
+            raise
+
+        if self.clock() - started > self.slow_call_seconds:
+            self._count('slow_calls')
+            self._failed()
+        else:
+            self._count('successes')
+            self.breaker.record_success()
+            self.limiter.release(ok=True)
+        return response
+
+    def _failed(self):
+        self.limiter.release(ok=False)
+        if self.breaker.record_failure():
+            # Release everyone queued behind the limiter so they can fall back now
+            self.limiter.wake_all()
+
+    def stats(self):
+        with self._lock:
+            counters = {
+                'calls': self.calls,
+                'successes': self.successes,
+                'failures': self.failures,
+                'slow_calls': self.slow_calls,
+                'quota_errors': self.quota_errors,
+                'short_circuited': self.short_circuited,
+                'rate_limited': self.rate_limited
+            }
+        return dict(counters, **{
+            'breaker_state': self.breaker.state,
+            'breaker_opened': self.breaker.times_opened,
+            'consecutive_failures': self.breaker.failures,
+            'concurrency_limit': self.limiter.limit,
+            'in_flight': self.limiter.in_flight,
+            'rate_limit': self.bucket.rate
+        })
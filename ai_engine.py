@@ -0,0 +1,334 @@
+"""
+AI Analysis Engine
+Fans Gemini career analyses out over a bounded thread pool, with a per-call
+timeout and a skill-overlap fallback for every career that fails. Careers can
+be analyzed one per call, or packed several to a prompt in batch mode. Each
+request spends at most a fixed number of prompt tokens; careers beyond the
+budget get the fallback without a call.
+"""
+
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+
+from ai_cache import normalize_profile, cache_key
+from ai_client import CircuitOpenError
+from ai_response import analysis_metrics, parse_career_analysis, parse_batch_response
+from prompts import CareerPrompts, TokenBudget
+from scoring import skill_overlap_recommendation
+
+# Concurrency configuration
+AI_MAX_WORKERS = int(os.getenv('AI_MAX_WORKERS', '8'))
+AI_CALL_TIMEOUT = float(os.getenv('AI_CALL_TIMEOUT', '20'))
+
+# Batch mode configuration (0 disables batching: one call per career)
+AI_BATCH_SIZE = int(os.getenv('AI_BATCH_SIZE', '0'))
+AI_BATCH_RETRIES = int(os.getenv('AI_BATCH_RETRIES', '1'))
+
+# How often the collector wakes up to check for calls that ran past their timeout
+POLL_INTERVAL = 0.05
+
+
+def ai_recommendation(response, career_dict, required_skills, user_skills):
+    """Turn a model response into a recommendation, raising ValueError if it can't be parsed"""
+    analysis = parse_career_analysis(response.text).to_dict()
+    if not analysis['skill_gaps']:
+        analysis['skill_gaps'] = list(set(required_skills) - set(user_skills))[:3]
+    return analysis_recommendation(analysis, career_dict)
+
+
+def call_model(model, prompt, tokens=None):
+    """Call the model, recording its latency and prompt size in the analysis metrics"""
+    if tokens is not None:
+        analysis_metrics.record_prompt(tokens)
+    started = time.monotonic()
+    try:
+        response = model.generate_content(prompt)
+    except Exception:
+        analysis_metrics.record_call(time.monotonic() - started, ok=False)
+        raise
+    analysis_metrics.record_call(time.monotonic() - started)
+    return response
+
+
+def analysis_recommendation(entry, career_dict):
+    """Turn a validated (or cached) analysis into a recommendation"""
+    return {
+        'career_id': career_dict['id'],
+        'career_title': career_dict['title'],
+        'match_score': entry['match_score'],
+        'reasoning': entry['reasoning'],
+        'skill_gaps': entry['skill_gaps'],
+        'career_details': career_dict
+    }
+
+
+def prepare_jobs(careers, required_skills=None):
+    """
+    Pair career rows with their required skills: `required_skills` (the
+    scoring engine's normalized lists) when given, else the row's JSON column
+    """
+    if required_skills is not None:
+        return [(dict(career), list(skills)) for career, skills in zip(careers, required_skills)]
+    jobs = []
+    for career in careers:
+        career_dict = dict(career)
+        jobs.append((career_dict, json.loads(career_dict['required_skills'])))
+    return jobs
+
+
+def model_available(model):
+    """False while a ResilientModel's circuit breaker is refusing calls"""
+    return getattr(model, 'available', True)
+
+
+def by_overlap(jobs, indexes, user_skills):
+    """Indexes ordered by skill overlap, best first, so a tight budget goes to likely matches"""
+    user_skills = set(user_skills)
+
+    def overlap(index):
+        required_skills = jobs[index][1]
+        return len(user_skills.intersection(required_skills)) / max(len(required_skills), 1)
+
+    return sorted(indexes, key=overlap, reverse=True)
+
+
+def iter_completed(calls, max_workers=None, timeout=None):
+    """
+    Run zero-argument callables on a bounded thread pool and yield
+    (index, result, error) triples as each one completes. A call that runs
+    longer than `timeout` seconds is abandoned and reported as a TimeoutError.
+    """
+    if not calls:
+        return
+
+    max_workers = max(1, max_workers or AI_MAX_WORKERS)
+    timeout = timeout or AI_CALL_TIMEOUT
+    started = {}
+
+    def run(index):
+        started[index] = time.monotonic()
+        return calls[index]()
+
+    # Calls that hang keep their worker busy, so bound the whole fan-out too:
+    # every wave of max_workers calls gets one timeout, plus one for slack.
+    waves = -(-len(calls) // max_workers)
+    overall_deadline = time.monotonic() + timeout * (waves + 1)
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(calls)))
+    try:
+        futures = {executor.submit(run, index): index for index in range(len(calls))}
+        pending = set(futures)
+
+        while pending:
+            done, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, e
+
+            now = time.monotonic()
+            for future in list(pending):
+                index = futures[future]
+                call_started = started.get(index)
+                timed_out = call_started is not None and now - call_started > timeout
+                if timed_out or now > overall_deadline:
+                    future.cancel()
+                    pending.discard(future)
+                    yield index, None, TimeoutError(f"call timed out after {timeout}s")
+    finally:
+        # Don't block the response on calls we already gave up on
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def lookup_cached(cache, jobs, profile, mode):
+    """
+    Split jobs into cached analyses and the ones that still need the model.
+    Returns (hits, misses, keys): hits maps index to recommendation, misses
+    lists indexes, keys maps every miss to its cache key.
+    """
+    hits, misses, keys = {}, [], {}
+    for index, (career_dict, required_skills) in enumerate(jobs):
+        if cache is not None:
+            key = cache_key(profile, career_dict, required_skills, mode)
+            cached = cache.get(key)
+            if cached:
+                hits[index] = analysis_recommendation(cached, career_dict)
+                continue
+            keys[index] = key
+        misses.append(index)
+    return hits, misses, keys
+
+
+def iter_career_analyses(model, user_dict, user_interests, user_skills, careers,
+                         max_workers=None, timeout=None, cache=None, token_budget=None,
+                         required_skills=None):
+    """
+    Analyze careers concurrently, one call per career, and yield
+    (index, recommendation) pairs as each one completes. Careers whose call
+    raises or times out, or that don't fit the token budget, are scored with
+    the skill-overlap fallback instead. Analyses found in `cache` are yielded
+    first without calling the model.
+    """
+    jobs = prepare_jobs(careers, required_skills)
+    profile = normalize_profile(user_dict, user_interests, user_skills)
+    hits, misses, keys = lookup_cached(cache, jobs, profile, 'career')
+    yield from hits.items()
+
+    prompts = CareerPrompts(user_dict, user_interests, user_skills)
+    budget = TokenBudget(token_budget)
+    called, calls, fallback = [], [], []
+    # With the circuit breaker open every career goes straight to the fallback
+    available = model_available(model)
+    for index in by_overlap(jobs, misses, user_skills):
+        if not available:
+            fallback.append(index)
+            continue
+        prompt, tokens = prompts.career_prompt(*jobs[index])
+        if budget.reserve(tokens):
+            called.append(index)
+            calls.append(partial(call_model, model, prompt, tokens))
+        else:
+            fallback.append(index)
+            analysis_metrics.record_over_budget(1)
+
+    for index in fallback:
+        career_dict, required_skills = jobs[index]
+        yield index, skill_overlap_recommendation(career_dict, required_skills, user_skills)
+
+    for c, response, error in iter_completed(calls, max_workers=max_workers, timeout=timeout):
+        index = called[c]
+        career_dict, required_skills = jobs[index]
+        if error is None:
+            try:
+                recommendation = ai_recommendation(response, career_dict, required_skills, user_skills)
+                if cache is not None:
+                    cache.put(keys[index], career_dict['id'], recommendation)
+                yield index, recommendation
+                continue
+            except Exception as e:
+                error = e
+        if not isinstance(error, CircuitOpenError):
+            print(f"AI error for career {career_dict['id']}: {error}")
+        yield index, skill_overlap_recommendation(career_dict, required_skills, user_skills)
+
+
+def pack_batches(prompts, jobs, indexes, batch_size, budget):
+    """
+    Group indexes into at most `batch_size` careers per prompt, reserving each
+    prompt's tokens from `budget`. Returns (batches, prompts with their token
+    counts, indexes that did not fit the budget).
+    """
+    batches, batch_prompts, over_budget = [], [], []
+    for start in range(0, len(indexes), batch_size):
+        batch = indexes[start:start + batch_size]
+        blocks = [prompts.batch_block(*jobs[index]) for index in batch]
+        # Drop careers from the end of the batch until its prompt fits
+        while batch:
+            prompt, tokens = prompts.batch_prompt(blocks)
+            if budget.reserve(tokens):
+                batches.append(batch)
+                batch_prompts.append((prompt, tokens))
+                break
+            over_budget.append(batch.pop())
+            blocks.pop()
+    return batches, batch_prompts, over_budget
+
+
+def iter_batch_analyses(model, user_dict, user_interests, user_skills, careers,
+                        batch_size=None, max_workers=None, timeout=None, retries=None, cache=None,
+                        token_budget=None, required_skills=None):
+    """
+    Analyze careers `batch_size` at a time, one prompt per batch, and yield
+    (index, recommendation) pairs as batches complete. Careers missing from a
+    response or returned malformed are re-requested up to `retries` times
+    while the token budget allows, then scored with the skill-overlap
+    fallback. Analyses found in `cache` are yielded first without calling
+    the model.
+    """
+    jobs = prepare_jobs(careers, required_skills)
+    batch_size = max(1, batch_size or AI_BATCH_SIZE or 1)
+    retries = AI_BATCH_RETRIES if retries is None else retries
+
+    profile = normalize_profile(user_dict, user_interests, user_skills)
+    hits, remaining, keys = lookup_cached(cache, jobs, profile, 'batch')
+    yield from hits.items()
+
+    prompts = CareerPrompts(user_dict, user_interests, user_skills)
+    budget = TokenBudget(token_budget)
+    remaining = by_overlap(jobs, remaining, user_skills)
+    over_budget = []
+
+    for attempt in range(retries + 1):
+        if not remaining or not model_available(model):
+            break
+
+        batches, batch_prompts, skipped = pack_batches(prompts, jobs, remaining, batch_size, budget)
+        over_budget.extend(skipped)
+        calls = [partial(call_model, model, prompt, tokens) for prompt, tokens in batch_prompts]
+
+        missing = []
+        for b, response, error in iter_completed(calls, max_workers=max_workers, timeout=timeout):
+            batch = batches[b]
+            if error is not None:
+                if not isinstance(error, CircuitOpenError):
+                    print(f"AI batch error: {error}")
+                parsed = {}
+            else:
+                parsed = parse_batch_response(getattr(response, 'text', ''),
+                                              {jobs[i][0]['id'] for i in batch})
+
+            for index in batch:
+                career_dict = jobs[index][0]
+                entry = parsed.get(career_dict['id'])
+                if entry:
+                    recommendation = analysis_recommendation(entry.to_dict(), career_dict)
+                    if cache is not None:
+                        cache.put(keys[index], career_dict['id'], recommendation)
+                    yield index, recommendation
+                else:
+                    missing.append(index)
+
+        remaining = by_overlap(jobs, missing, user_skills)
+
+    if over_budget:
+        analysis_metrics.record_over_budget(len(over_budget))
+    for index in remaining + over_budget:
+        career_dict, required_skills = jobs[index]
+        yield index, skill_overlap_recommendation(career_dict, required_skills, user_skills)
+
+
+def iter_analyses(model, user_dict, user_interests, user_skills, careers,
+                  max_workers=None, timeout=None, batch_size=None, cache=None, token_budget=None,
+                  required_skills=None):
+    """
+    Yield (index, recommendation) pairs in completion order. A batch_size
+    above zero (or AI_BATCH_SIZE) switches to batch mode; token_budget
+    overrides AI_TOKEN_BUDGET for this request. `required_skills`, parallel
+    to `careers`, overrides their required_skills column.
+    """
+    batch_size = AI_BATCH_SIZE if batch_size is None else batch_size
+    if batch_size > 0:
+        return iter_batch_analyses(model, user_dict, user_interests, user_skills, careers,
+                                   batch_size=batch_size, max_workers=max_workers,
+                                   timeout=timeout, cache=cache, token_budget=token_budget,
+                                   required_skills=required_skills)
+    return iter_career_analyses(model, user_dict, user_interests, user_skills, careers,
+                                max_workers=max_workers, timeout=timeout, cache=cache,
+                                token_budget=token_budget, required_skills=required_skills)
+
+
+def analyze_careers(model, user_dict, user_interests, user_skills, careers,
+                    max_workers=None, timeout=None, batch_size=None, cache=None, token_budget=None,
+                    required_skills=None):
+    """Analyze all careers concurrently and return recommendations in catalog order"""
+    results = dict(iter_analyses(model, user_dict, user_interests, user_skills, careers,
+                                 max_workers=max_workers, timeout=timeout,
+                                 batch_size=batch_size, cache=cache, token_budget=token_budget,
+                                 required_skills=required_skills))
+    return [results[index] for index in sorted(results)]
+
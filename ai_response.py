@@ -0,0 +1,328 @@
+"""
+AI Response Parsing
+Tolerant extraction of JSON from Gemini responses (code fences, trailing
+prose, truncated objects), schema validation of career analyses, and
+parse/latency metrics
+"""
+
+import json
+import threading
+from dataclasses import dataclass, field, asdict
+
+CLOSERS = {'{': '}', '[': ']'}
+
+# Bounds on the work one response can cause: junk full of stray brackets must
+# not pin a worker after the model call has already returned
+MAX_RESTARTS = 16
+MAX_REPAIR_CANDIDATES = 16
+# Analyses nest a few levels deep; repairing anything deeper isn't worth trying
+MAX_REPAIR_DEPTH = 32
+
+
+def _closing(stack):
+    """Closing brackets for a stack of open ones, innermost first"""
+    closers = []
+    while stack:
+        opener, stack, _ = stack
+        closers.append(CLOSERS[opener])
+    return ''.join(closers)
+
+
+class JsonStreamExtractor:
+    """
+    Incrementally scans text for top-level JSON objects and arrays, ignoring
+    anything around them (markdown fences, explanations). feed() returns the
+    values completed by each chunk; close() repairs a value the text ended in
+    the middle of, keeping every member that was fully written. An opener
+    that turns out not to start a value (a stray brace in prose) is dropped
+    and the scan restarts just after it, so it can't swallow a real value.
+    After MAX_RESTARTS such openers, failed candidates are dropped whole.
+
+    The stack of open brackets is a linked list of (opener, rest, depth), so
+    remembering it at every cut point costs nothing however deep it gets.
+    """
+
+    def __init__(self):
+        self._restarts = 0
+        self._reset()
+
+    def _reset(self):
+        self._current = []
+        self._stack = None
+        self._in_string = False
+        self._escape = False
+        self._cuts = []
+
+    def _abandon(self):
+        """Drop the current candidate and return the text after its opener, to be scanned again"""
+        self._restarts += 1
+        text = ''.join(self._current[1:]) if self._restarts <= MAX_RESTARTS else ''
+        self._reset()
+        return text
+
+    def feed(self, chunk):
+        """Consume a chunk of text and return the JSON values it completed"""
+        values = []
+        text, i = chunk, 0
+        while i < len(text):
+            ch = text[i]
+            i += 1
+            if not self._stack:
+                if ch in CLOSERS:
+                    self._current = [ch]
+                    self._stack = (ch, None, 1)
+                    self._cuts = [(1, self._stack)]
+                continue
+
+            self._current.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in CLOSERS:
+                self._stack = (ch, self._stack, self._stack[2] + 1)
+                self._cuts.append((len(self._current), self._stack))
+            elif ch in '}]':
+                opener, self._stack, _ = self._stack
+                if CLOSERS[opener] != ch:
+                    # Brackets don't pair up, so the opener was prose rather than JSON
+                    text, i = self._abandon() + text[i:], 0
+                    continue
+                if not self._stack:
+                    try:
+                        values.append(json.loads(''.join(self._current)))
+                    except (ValueError, RecursionError):
+                        text, i = self._abandon() + text[i:], 0
+                        continue
+                    self._reset()
+                else:
+                    self._cuts.append((len(self._current), self._stack))
+            elif ch == ',':
+                # Cutting just before a comma drops only the member being written
+                self._cuts.append((len(self._current) - 1, self._stack))
+        return values
+
+    def close(self):
+        """
+        Finish the text. Returns (values, partial): values completed by
+        rescanning after an opener that never closed, and the repaired
+        trailing value (or None).
+        """
+        values = []
+        while self._stack:
+            text = ''.join(self._current)
+            candidates = [(text + ('"' if self._in_string else ''), self._stack)]
+            # A cut right after the outer opener would keep nothing that was written
+            cuts = [(cut, stack) for cut, stack in reversed(self._cuts) if cut > 1][:MAX_REPAIR_CANDIDATES]
+            candidates += [(text[:cut], stack) for cut, stack in cuts]
+
+            for prefix, stack in candidates:
+                if stack[2] > MAX_REPAIR_DEPTH:
+                    continue
+                try:
+                    value = json.loads(prefix + _closing(stack))
+                except (ValueError, RecursionError):
+                    continue
+                self._reset()
+                return values, value
+
+            values += self.feed(self._abandon())
+        return values, None
+
+
+def extract_json_values(text):
+    """
+    Return (values, partial) for the JSON objects and arrays in `text`:
+    every complete value, plus the repaired trailing value (or None).
+    """
+    extractor = JsonStreamExtractor()
+    values = extractor.feed(text or '')
+    rest, partial = extractor.close()
+    return values + rest, partial
+
+
+@dataclass
+class CareerAnalysis:
+    """A schema-validated career analysis returned by the model"""
+    match_score: float
+    reasoning: str
+    skill_gaps: list = field(default_factory=list)
+    career_id: int = None
+
+    @classmethod
+    def from_dict(cls, data, require_career_id=False):
+        """Validate and normalize a decoded analysis, raising ValueError if it is unusable"""
+        if not isinstance(data, dict):
+            raise ValueError('analysis must be a JSON object')
+
+        career_id = data.get('career_id')
+        if career_id is not None or require_career_id:
+            try:
+                career_id = int(career_id)
+            except (TypeError, ValueError):
+                raise ValueError('career_id must be an integer')
+
+        match_score = data.get('match_score')
+        if isinstance(match_score, str):
+            match_score = match_score.strip().rstrip('%')
+        try:
+            match_score = float(match_score)
+        except (TypeError, ValueError):
+            raise ValueError('match_score must be a number')
+        if match_score != match_score:
+            raise ValueError('match_score must be a number')
+
+        reasoning = data.get('reasoning')
+        if not isinstance(reasoning, str) or not reasoning.strip():
+            raise ValueError('reasoning must be a non-empty string')
+
+        skill_gaps = data.get('skill_gaps', [])
+        if isinstance(skill_gaps, str):
+            skill_gaps = [gap.strip() for gap in skill_gaps.split(',') if gap.strip()]
+        if not isinstance(skill_gaps, list) or not all(isinstance(gap, str) for gap in skill_gaps):
+            raise ValueError('skill_gaps must be a list of strings')
+
+        return cls(
+            match_score=max(0.0, min(100.0, match_score)),
+            reasoning=reasoning.strip(),
+            skill_gaps=skill_gaps[:3],
+            career_id=career_id
+        )
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class AnalysisMetrics:
+    """Thread-safe counters for model call latency, prompt tokens and response parsing"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.call_errors = 0
+            self.call_seconds = 0.0
+            self.parsed = 0
+            self.repaired = 0
+            self.failed = 0
+            self.entries_valid = 0
+            self.entries_invalid = 0
+            self.prompts = 0
+            self.prompt_tokens = 0
+            self.over_budget = 0
+
+    def record_prompt(self, tokens):
+        """Estimated tokens of one prompt sent to the model"""
+        with self._lock:
+            self.prompts += 1
+            self.prompt_tokens += tokens
+
+    def record_over_budget(self, careers):
+        """Careers that fell back to skill overlap because the token budget ran out"""
+        with self._lock:
+            self.over_budget += careers
+
+    def record_call(self, seconds, ok=True):
+        with self._lock:
+            self.calls += 1
+            self.call_seconds += seconds
+            if not ok:
+                self.call_errors += 1
+
+    def record_parse(self, outcome, valid=0, invalid=0):
+        """outcome is 'parsed', 'repaired' or 'failed'"""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            self.entries_valid += valid
+            self.entries_invalid += invalid
+
+    def stats(self):
+        with self._lock:
+            responses = self.parsed + self.repaired + self.failed
+            return {
+                'model_calls': self.calls,
+                'model_call_errors': self.call_errors,
+                'avg_call_seconds': round(self.call_seconds / self.calls, 4) if self.calls else 0.0,
+                'responses_parsed': self.parsed,
+                'responses_repaired': self.repaired,
+                'responses_failed': self.failed,
+                'parse_success_rate': round((self.parsed + self.repaired) / responses, 4) if responses else 0.0,
+                'entries_valid': self.entries_valid,
+                'entries_invalid': self.entries_invalid,
+                'prompt_tokens': self.prompt_tokens,
+                'avg_prompt_tokens': round(self.prompt_tokens / self.prompts, 1) if self.prompts else 0.0,
+                'careers_over_budget': self.over_budget
+            }
+
+
+# Process-wide metrics, served from /api/ai/stats
+analysis_metrics = AnalysisMetrics()
+
+
+def _candidate_objects(values, partial):
+    """Yield (candidate, repaired) pairs, unwrapping arrays of analyses"""
+    sources = [(value, False) for value in values]
+    if partial is not None:
+        sources.append((partial, True))
+    for value, repaired in sources:
+        if isinstance(value, list):
+            for item in value:
+                yield item, repaired
+        else:
+            yield value, repaired
+
+
+def parse_career_analysis(text, metrics=None):
+    """Parse a single-career response into a CareerAnalysis, raising ValueError if none is usable"""
+    metrics = metrics or analysis_metrics
+    values, partial = extract_json_values(text)
+
+    invalid = 0
+    for candidate, repaired in _candidate_objects(values, partial):
+        try:
+            analysis = CareerAnalysis.from_dict(candidate)
+        except ValueError:
+            invalid += 1
+            continue
+        metrics.record_parse('repaired' if repaired else 'parsed', valid=1, invalid=invalid)
+        return analysis
+
+    metrics.record_parse('failed', invalid=invalid)
+    raise ValueError('no valid career analysis in model response')
+
+
+def parse_batch_response(text, career_ids, metrics=None):
+    """Split a batch response into CareerAnalysis entries keyed by career id"""
+    metrics = metrics or analysis_metrics
+    values, partial = extract_json_values(text)
+
+    parsed = {}
+    invalid = 0
+    any_repaired = False
+    for candidate, repaired in _candidate_objects(values, partial):
+        try:
+            analysis = CareerAnalysis.from_dict(candidate, require_career_id=True)
+        except ValueError:
+            invalid += 1
+            continue
+        if analysis.career_id in career_ids and analysis.career_id not in parsed:
+            parsed[analysis.career_id] = analysis
+            any_repaired = any_repaired or repaired
+        else:
+            invalid += 1
+
+    if parsed:
+        metrics.record_parse('repaired' if any_repaired else 'parsed', valid=len(parsed), invalid=invalid)
+    else:
+        metrics.record_parse('failed', invalid=invalid)
+    return parsed
@@ -1,11 +1,30 @@
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, render_template, request, jsonify, session, g, has_app_context, stream_with_context
 from flask_cors import CORS
 import sqlite3
 import json
+import csv
 import os
 from datetime import datetime
 from dotenv import load_dotenv
-import google.generativeai as genai
+
+from database.migrations import migrate
+from db import ConnectionPool
+from catalog_snapshot import open_snapshot_pool, snapshot_info
+from assessments import (
+    rank_recommendations, assessment_rows, insert_assessments, AssessmentWriter, ASSESSMENT_WRITE_BEHIND
+)
+from batch_assess import BATCH_CHUNK_SIZE, start_run, load_run, claim_run, count_users, run_batch
+from bulk_import import IMPORT_CHUNK_SIZE, import_users, iter_rows, text_stream
+from jobs import JobManager
+from catalog import CatalogResponseCache, CatalogQuery, table_columns, run_catalog_query
+from skill_index import SUGGEST_DEFAULT_LIMIT, SUGGEST_MAX_LIMIT, get_skill_index
+from search import SEARCH_SOURCES, SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT, search_available, search_catalog
+from ai_cache import AnalysisCache, AI_CACHE_PERSIST
+from ai_client import ResilientModel, LazyGeminiModel
+from ai_engine import iter_analyses
+from ai_response import analysis_metrics
+from scoring import SCORING_MODES, SCORING_MODE, get_scoring_engine
+from embeddings import get_embedding_index, embeddings_needed, embedding_candidates, recommend_embedding
 
 # Load environment variables
 load_dotenv()
@@ -18,71 +37,94 @@ CORS(app)
 # Configure Gemini AI
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel('gemini-pro')
+    # Shared rate limiter, adaptive concurrency limit and circuit breaker around every call;
+    # the Gemini SDK itself is imported on the first call, not on every cold start
+    model = ResilientModel(LazyGeminiModel(GEMINI_API_KEY))
 else:
     model = None
     print("Warning: Gemini API key not found. AI features will be limited.")
 
-# Database helper functions
-def get_db_connection():
-    # Use /tmp for Vercel serverless functions
-    db_path = '/tmp/career_advisor.db' if os.environ.get('VERCEL') else 'database/career_advisor.db'
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+# Database helper functions; the schema is migrated on the first connection, not at import
+db_pool = ConnectionPool(setup=migrate)
+
+# Prebuilt read-only catalog (python catalog_snapshot.py); None when none was deployed
+catalog_pool = open_snapshot_pool()
+
+def checkout(pool):
+    conn = pool.acquire()
+    if has_app_context():
+        # Remember the lease so teardown can return anything a request forgot to close
+        g.setdefault('db_leases', []).append((pool, conn, conn.lease))
     return conn
 
-def init_db():
-    """Initialize database if it doesn't exist"""
-    db_path = '/tmp/career_advisor.db' if os.environ.get('VERCEL') else 'database/career_advisor.db'
-    if not os.path.exists(db_path):
-        # For Vercel, we'll create a simple in-memory database structure
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Create tables
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                age INTEGER,
-                education_level TEXT,
-                interests TEXT,
-                current_skills TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS career_paths (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                industry TEXT,
-                required_skills TEXT,
-                average_salary_min INTEGER,
-                average_salary_max INTEGER,
-                growth_potential TEXT,
-                education_requirements TEXT
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS skills (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                category TEXT,
-                difficulty_level TEXT,
-                learning_resources TEXT
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+def get_db_connection():
+    """Check a WAL-configured connection out of the pool; close() returns it"""
+    return checkout(db_pool)
+
+def get_catalog_connection():
+    """Connection for catalog reads: the immutable snapshot if deployed, else the main database"""
+    return checkout(catalog_pool or db_pool)
+
+@app.teardown_appcontext
+def release_db_connections(exception=None):
+    """Return connections still checked out when the request ends"""
+    for pool, conn, lease in g.pop('db_leases', []):
+        pool.release(conn, lease)
+
+# Background assessment jobs (POST /api/assess with "mode": "async")
+assessment_jobs = JobManager()
+SSE_KEEPALIVE_SECONDS = 15
+
+# Streamed /api/assess responses
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Catalog endpoint page sizes
+CATALOG_PAGE_LIMIT = 50
+CATALOG_MAX_LIMIT = 500
+
+# Serialized /api/careers and /api/skills payloads, rebuilt when the catalog tables change
+catalog_cache = CatalogResponseCache()
+
+# Optional write-behind queue for assessment rows, flushed in batches off the request path
+assessment_writer = AssessmentWriter(get_db_connection) if ASSESSMENT_WRITE_BEHIND else None
+
+# Cache of AI career analyses, optionally persisted to the ai_analysis_cache table
+analysis_cache = AnalysisCache(connect=get_db_connection if AI_CACHE_PERSIST else None)
 
-# Initialize database on startup
-init_db()
+# SQLite's default limit on bound parameters is 999
+SQL_IN_CHUNK = 500
+
+def fetch_skills_by_name(conn, names):
+    """Bulk-fetch skill rows with WHERE name IN (...), keyed by name"""
+    names = list(dict.fromkeys(names))
+    skills_by_name = {}
+    for start in range(0, len(names), SQL_IN_CHUNK):
+        chunk = names[start:start + SQL_IN_CHUNK]
+        placeholders = ', '.join('?' * len(chunk))
+        for row in conn.execute(f'SELECT * FROM skills WHERE name IN ({placeholders})', chunk):
+            skills_by_name.setdefault(row['name'], dict(row))
+    return skills_by_name
+
+def fetch_skill_resources(conn, skill_ids):
+    """Learning resources from skill_resources, in their listed order, keyed by skill id"""
+    resources = {}
+    for start in range(0, len(skill_ids), SQL_IN_CHUNK):
+        chunk = skill_ids[start:start + SQL_IN_CHUNK]
+        placeholders = ', '.join('?' * len(chunk))
+        for row in conn.execute(f'''
+            SELECT skill_id, resource FROM skill_resources
+            WHERE skill_id IN ({placeholders}) ORDER BY skill_id, position
+        ''', chunk):
+            resources.setdefault(row['skill_id'], []).append(row['resource'])
+    return resources
+
+def load_skill_index():
+    """Prefix index and canonicalizer over catalog skill names and aliases, rebuilt when they change"""
+    catalog_conn = get_catalog_connection()
+    try:
+        return get_skill_index(catalog_conn)
+    finally:
+        catalog_conn.close()
 
 # Routes
 @app.route('/')
@@ -94,6 +136,8 @@ def index():
 def register_user():
     """Register a new user"""
     data = request.json
+    # Stored under catalog names so skill-overlap scoring matches them exactly
+    skills = load_skill_index().canonicalize_all(data.get('current_skills', []))
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -107,10 +151,10 @@ def register_user():
             data.get('age'),
             data.get('education_level'),
             json.dumps(data.get('interests', [])),
-            json.dumps(data.get('current_skills', []))
+            json.dumps(skills)
         ))
-        conn.commit()
         user_id = cursor.lastrowid
+        conn.commit()
         session['user_id'] = user_id
         
         return jsonify({
@@ -126,177 +170,513 @@ def register_user():
     finally:
         conn.close()
 
-@app.route('/api/careers', methods=['GET'])
-def get_careers():
-    """Get all available career paths"""
+@app.route('/api/users/import', methods=['POST'])
+def import_users_route():
+    """
+    Bulk-register users from a CSV or NDJSON upload (a multipart 'file' field
+    or the raw request body). The body is read as a stream, so large files
+    never sit in memory.
+    """
+    upload = request.files.get('file')
+    source = upload.stream if upload else request.stream
+    name = (upload.filename or '') if upload else ''
+    content_type = (upload.mimetype if upload else request.mimetype) or ''
+
+    fmt = request.args.get('format')
+    if not fmt:
+        ndjson = 'ndjson' in content_type or 'jsonl' in content_type or name.endswith(('.ndjson', '.jsonl'))
+        fmt = 'ndjson' if ndjson else 'csv'
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'success': False, 'message': "format must be 'csv' or 'ndjson'"}), 400
+
+    try:
+        chunk_size = int(request.args.get('chunk_size', IMPORT_CHUNK_SIZE))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'chunk_size must be an integer'}), 400
+    chunk_size = max(1, min(chunk_size, 10_000))
+
+    canonicalize = load_skill_index().canonicalize_all
     conn = get_db_connection()
-    careers = conn.execute('SELECT * FROM career_paths').fetchall()
-    conn.close()
+    try:
+        report = import_users(conn, iter_rows(text_stream(source), fmt), chunk_size, canonicalize)
+    except (UnicodeDecodeError, csv.Error) as e:
+        return jsonify({'success': False, 'message': f'Could not read upload: {e}'}), 400
+    finally:
+        conn.close()
+
+    return jsonify(report.to_dict())
+
+def catalog_response(body, etag):
+    """Serve a cached catalog payload with a strong ETag, answering If-None-Match with 304"""
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+def parse_catalog_args(conn, table, filter_columns):
+    """
+    Validate the catalog query string: ?after_id=&limit= keyset pagination,
+    ?fields= projection and exact-match filters. Raises ValueError on bad input.
+    """
+    columns = table_columns(conn, table)
+    args = request.args
     
-    career_list = []
-    for career in careers:
-        career_dict = dict(career)
-        career_dict['required_skills'] = json.loads(career_dict['required_skills'])
-        career_list.append(career_dict)
+    paginated = 'after_id' in args or 'limit' in args
+    try:
+        after_id = int(args.get('after_id', 0))
+        limit = int(args.get('limit', CATALOG_PAGE_LIMIT))
+    except ValueError:
+        raise ValueError('after_id and limit must be integers')
+    if not 1 <= limit <= CATALOG_MAX_LIMIT:
+        raise ValueError(f'limit must be between 1 and {CATALOG_MAX_LIMIT}')
     
-    return jsonify(career_list)
+    fields = None
+    if args.get('fields'):
+        # id is always returned; keyset pagination needs it
+        fields = tuple(dict.fromkeys(['id'] + [f.strip() for f in args['fields'].split(',') if f.strip()]))
+        unknown = [f for f in fields if f not in columns]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    
+    filters = tuple((column, args[column]) for column in filter_columns if column in args)
+    return CatalogQuery(paginated, after_id, limit, fields, filters)
+
+def serve_catalog(table, filter_columns, json_fields):
+    """Shared handler for the catalog endpoints"""
+    conn = get_catalog_connection()
+    try:
+        query = parse_catalog_args(conn, table, filter_columns)
+    except ValueError as e:
+        conn.close()
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    try:
+        body, etag = catalog_cache.get(conn, table, query,
+                                       lambda: run_catalog_query(conn, table, query, json_fields))
+    finally:
+        conn.close()
+    
+    return catalog_response(body, etag)
+
+@app.route('/api/skills/suggest', methods=['GET'])
+def suggest_skills():
+    """
+    Skill autocomplete: ?q=ma returns catalog skills whose name (or one of
+    its words, or an alias such as "ML") starts with the text typed so far.
+    """
+    try:
+        limit = int(request.args.get('limit', SUGGEST_DEFAULT_LIMIT))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'limit must be an integer'}), 400
+    if not 1 <= limit <= SUGGEST_MAX_LIMIT:
+        return jsonify({'success': False, 'message': f'limit must be between 1 and {SUGGEST_MAX_LIMIT}'}), 400
+    
+    query = request.args.get('q', '')
+    return jsonify({
+        'success': True,
+        'query': query,
+        'suggestions': load_skill_index().suggest(query, limit)
+    })
+
+@app.route('/api/careers', methods=['GET'])
+def get_careers():
+    """
+    Get available career paths. Filter with ?industry= and ?growth_potential=,
+    project with ?fields=title,industry. Passing after_id or limit returns a
+    page: {"items": [...], "next_after_id": <id or null>}.
+    """
+    return serve_catalog('career_paths', ('industry', 'growth_potential'), ('required_skills',))
 
 @app.route('/api/skills', methods=['GET'])
 def get_skills():
-    """Get all available skills"""
-    conn = get_db_connection()
-    skills = conn.execute('SELECT * FROM skills').fetchall()
-    conn.close()
+    """
+    Get available skills. Filter with ?category= and ?difficulty_level=,
+    project with ?fields=name,category. Passing after_id or limit returns a
+    page: {"items": [...], "next_after_id": <id or null>}.
+    """
+    return serve_catalog('skills', ('category', 'difficulty_level'), ('learning_resources',))
+
+@app.route('/api/search', methods=['GET'])
+def search():
+    """
+    Full-text catalog search: ?q=data sci returns careers and skills ranked
+    by BM25, each with a highlighted snippet; the last word matches as a
+    prefix. Narrow with ?type=careers or ?type=skills, cap with ?limit=.
+    """
+    args = request.args
+    text = args.get('q', '').strip()
+    if not text:
+        return jsonify({'success': False, 'message': 'Search query required'}), 400
+    
+    kind = args.get('type')
+    if kind and kind not in SEARCH_SOURCES:
+        return jsonify({'success': False, 'message': f"type must be one of: {', '.join(SEARCH_SOURCES)}"}), 400
+    
+    try:
+        limit = int(args.get('limit', SEARCH_DEFAULT_LIMIT))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'limit must be an integer'}), 400
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        return jsonify({'success': False, 'message': f'limit must be between 1 and {SEARCH_MAX_LIMIT}'}), 400
+    
+    conn = get_catalog_connection()
+    try:
+        if not search_available(conn):
+            return jsonify({'success': False, 'message': 'Search is not available'}), 503
+        # Keep the raw text: a trailing space means the last word is complete
+        results = search_catalog(conn, args['q'], kinds=(kind,) if kind else tuple(SEARCH_SOURCES), limit=limit)
+    finally:
+        conn.close()
+    
+    return jsonify(dict(results, success=True, query=text))
+
+def load_assessment_user(conn, user_id):
+    """Return (user_dict, interests, skills) for a user, or None if they don't exist"""
+    user = conn.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+    if not user:
+        return None
+    
+    user_dict = dict(user)
+    user_interests = json.loads(user_dict['interests']) if user_dict['interests'] else []
+    user_skills = json.loads(user_dict['current_skills']) if user_dict['current_skills'] else []
+    return user_dict, user_interests, user_skills
+
+def parse_profile_update(data):
+    """
+    Optional "skills" / "interests" lists from the request body, as
+    (skills or None, interests or None); raises ValueError if either isn't a list of strings
+    """
+    values = []
+    for field in ('skills', 'interests'):
+        value = data.get(field)
+        if value is not None and not (isinstance(value, list) and all(isinstance(item, str) for item in value)):
+            raise ValueError(f'{field} must be a list of strings')
+        values.append(value)
+    return tuple(values)
+
+def update_user_profile(conn, user, skills, interests):
+    """Persist skills/interests submitted with an assessment and return the updated (user_dict, interests, skills)"""
+    user_dict, user_interests, user_skills = user
+    if skills is not None:
+        user_skills = load_skill_index().canonicalize_all(skills)
+    if interests is not None:
+        user_interests = interests
+    # Triggers on users keep user_skills and user_interests in step
+    conn.execute('UPDATE users SET current_skills = ?, interests = ? WHERE id = ?',
+                 (json.dumps(user_skills), json.dumps(user_interests), user_dict['id']))
+    conn.commit()
+    user_dict = dict(user_dict, current_skills=json.dumps(user_skills), interests=json.dumps(user_interests))
+    return user_dict, user_interests, user_skills
+
+def parse_batch_size(data):
+    """Optional batch_size from the request body; raises ValueError if it isn't an integer"""
+    try:
+        return int(data['batch_size']) if data.get('batch_size') is not None else None
+    except (TypeError, ValueError):
+        raise ValueError('batch_size must be an integer')
+
+def parse_scoring_mode(data):
+    """Optional "scoring" formula from the request body; raises ValueError if it isn't known"""
+    scoring = data.get('scoring') or SCORING_MODE
+    if scoring not in SCORING_MODES:
+        raise ValueError(f"scoring must be one of: {', '.join(SCORING_MODES)}")
+    return scoring
+
+def start_scoring(user_dict, user_interests, user_skills, batch_size=None, scoring=SCORING_MODE):
+    """
+    Begin scoring a user against the catalog. Returns (careers scored,
+    careers pruned, iterator of recommendations in the order they finish).
+    Without the AI, `scoring` picks the overlap, TF-IDF cosine or embedding
+    formula; with it, ASSESS_PREFILTER picks how careers are pre-selected.
+    """
+    # Career catalog, decoded and indexed once per catalog version
+    catalog_conn = get_catalog_connection()
+    try:
+        scoring_engine = get_scoring_engine(catalog_conn)
+        embedding_index = (get_embedding_index(scoring_engine, catalog_conn)
+                           if embeddings_needed(scoring, model is not None) else None)
+    finally:
+        catalog_conn.close()
+    
+    if not model and scoring == 'tfidf':
+        # Cosine similarity of IDF-weighted skills and interest terms in one sparse product;
+        # careers sharing no term with the user are never visited
+        recommendations, scored = scoring_engine.recommend_tfidf(user_skills, user_interests, k=5)
+        return scored, len(scoring_engine) - scored, iter(recommendations)
+    
+    if not model and scoring == 'embedding':
+        # Nearest careers in the local embedding index: semantic matching with no API calls
+        recommendations, scored = recommend_embedding(embedding_index, scoring_engine,
+                                                      user_skills, user_interests, k=5)
+        return scored, len(scoring_engine) - scored, iter(recommendations)
+    
+    if embedding_index is not None:
+        # Only the careers nearest the user in the embedding index go to the AI
+        candidates, pruned = embedding_candidates(embedding_index, scoring_engine, user_skills, user_interests)
+    else:
+        # Only careers sharing a skill with the user (via the inverted index) are scored
+        candidates, pruned = scoring_engine.candidates(user_skills)
+    
+    if model:
+        # Use AI for personalized recommendations, analyzing careers concurrently
+        # (optionally several careers per prompt when a batch_size is given)
+        careers = [scoring_engine.careers[i] for i in candidates]
+        required_skills = [scoring_engine.required_skills[i] for i in candidates]
+        analyses = iter_analyses(model, user_dict, user_interests, user_skills, careers,
+                                 batch_size=batch_size, cache=analysis_cache, required_skills=required_skills)
+        return len(candidates), pruned, (recommendation for _, recommendation in analyses)
+    
+    # Simple rule-based matching without AI, scored against the candidates at once
+    return len(candidates), pruned, iter(scoring_engine.recommend(user_skills, k=5, indexes=candidates))
+
+def save_assessment(conn, user_id, user_skills, user_interests, recommendations, total_careers, careers_pruned=0,
+                    scoring=SCORING_MODE):
+    """Rank recommendations, persist the top ones and build the /api/assess response"""
+    # Sort by match score
+    rank_recommendations(recommendations)
     
-    skill_list = []
-    for skill in skills:
-        skill_dict = dict(skill)
-        skill_dict['learning_resources'] = json.loads(skill_dict['learning_resources'])
-        skill_list.append(skill_dict)
+    # Save the assessment and its top recommendations
+    assessment, recommendation_rows = assessment_rows(user_id, user_skills, user_interests, recommendations)
+    if not (assessment_writer and assessment_writer.submit(assessment, recommendation_rows)):
+        # No write-behind queue (or it is backed up): write synchronously
+        insert_assessments(conn.cursor(), [assessment], recommendation_rows)
+        conn.commit()
     
-    return jsonify(skill_list)
+    return {
+        'success': True,
+        'recommendations': recommendations[:5],
+        'assessment_summary': {
+            'total_careers_analyzed': total_careers,
+            'careers_pruned': careers_pruned,
+            'scoring': 'ai' if model else scoring,
+            'top_match_score': recommendations[0]['match_score'] if recommendations else 0,
+            'skills_evaluated': len(user_skills)
+        }
+    }
+
+def run_assessment_job(job, user_id, batch_size, scoring=SCORING_MODE):
+    """Background body of an async assessment: publish each career as it is scored"""
+    conn = get_db_connection()
+    try:
+        user_dict, user_interests, user_skills = load_assessment_user(conn, user_id)
+        total_careers, pruned, results = start_scoring(user_dict, user_interests, user_skills, batch_size, scoring)
+        job.start(total_careers)
+        
+        recommendations = []
+        for recommendation in results:
+            recommendations.append(recommendation)
+            job.publish(recommendation)
+        
+        return save_assessment(conn, user_id, user_skills, user_interests, recommendations,
+                               total_careers, pruned, scoring)
+    finally:
+        conn.close()
 
 @app.route('/api/assess', methods=['POST'])
 def assess_user():
-    """Assess user and provide career recommendations"""
+    """
+    Assess user and provide career recommendations. "skills" and "interests"
+    lists, when given, are saved onto the user first. With "mode": "async" the
+    work runs in the background and a job id is returned right away; follow
+    it at /api/assess/<job_id> or /api/assess/<job_id>/events. Requests that
+    prefer application/x-ndjson get results streamed as they are scored.
+    """
     data = request.json
     user_id = data.get('user_id')
     
     if not user_id:
         return jsonify({'success': False, 'message': 'User ID required'}), 400
     
+    try:
+        batch_size = parse_batch_size(data)
+        scoring = parse_scoring_mode(data)
+        skills, interests = parse_profile_update(data)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
     # Get user data
     conn = get_db_connection()
-    user = conn.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+    user = load_assessment_user(conn, user_id)
     
     if not user:
         conn.close()
         return jsonify({'success': False, 'message': 'User not found'}), 404
     
-    user_dict = dict(user)
-    user_interests = json.loads(user_dict['interests']) if user_dict['interests'] else []
-    user_skills = json.loads(user_dict['current_skills']) if user_dict['current_skills'] else []
+    if skills is not None or interests is not None:
+        user = update_user_profile(conn, user, skills, interests)
     
-    # Get all career paths
-    careers = conn.execute('SELECT * FROM career_paths').fetchall()
+    if data.get('mode') == 'async':
+        conn.close()
+        job = assessment_jobs.submit(run_assessment_job, user_id, batch_size, scoring)
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': f'/api/assess/{job.id}',
+            'events_url': f'/api/assess/{job.id}/events'
+        }), 202
     
-    recommendations = []
+    user_dict, user_interests, user_skills = user
+    total_careers, pruned, results = start_scoring(user_dict, user_interests, user_skills, batch_size, scoring)
     
-    if model:
-        # Use AI for personalized recommendations
-        for career in careers:
-            career_dict = dict(career)
-            required_skills = json.loads(career_dict['required_skills'])
-            
-            # Create prompt for AI
-            prompt = f"""
-            Analyze the career match for an Indian student with the following profile:
-            - Education Level: {user_dict['education_level']}
-            - Age: {user_dict['age']}
-            - Interests: {', '.join(user_interests)}
-            - Current Skills: {', '.join(user_skills)}
-            
-            Career Path: {career_dict['title']}
-            Required Skills: {', '.join(required_skills)}
-            Industry: {career_dict['industry']}
-            
-            Provide:
-            1. Match score (0-100)
-            2. Brief reasoning (2-3 sentences)
-            3. Top 3 skill gaps
-            
-            Format response as JSON with keys: match_score, reasoning, skill_gaps
-            """
-            
-            try:
-                response = model.generate_content(prompt)
-                # Parse AI response (simplified for MVP)
-                ai_analysis = response.text
-                
-                # Simple scoring based on skill overlap (fallback if AI parsing fails)
-                skill_overlap = len(set(user_skills) & set(required_skills))
-                match_score = min(100, (skill_overlap / max(len(required_skills), 1)) * 100 + 20)
-                
-                recommendations.append({
-                    'career_id': career_dict['id'],
-                    'career_title': career_dict['title'],
-                    'match_score': match_score,
-                    'reasoning': f"Based on your skills and interests, this career aligns well with your profile.",
-                    'skill_gaps': list(set(required_skills) - set(user_skills))[:3],
-                    'career_details': career_dict
-                })
-            except Exception as e:
-                print(f"AI error: {e}")
-                # Fallback to simple matching
-                skill_overlap = len(set(user_skills) & set(required_skills))
-                match_score = min(100, (skill_overlap / max(len(required_skills), 1)) * 100)
-                
-                recommendations.append({
-                    'career_id': career_dict['id'],
-                    'career_title': career_dict['title'],
-                    'match_score': match_score,
-                    'reasoning': f"You have {skill_overlap} out of {len(required_skills)} required skills.",
-                    'skill_gaps': list(set(required_skills) - set(user_skills))[:3],
-                    'career_details': career_dict
-                })
-    else:
-        # Simple rule-based matching without AI
-        for career in careers:
-            career_dict = dict(career)
-            required_skills = json.loads(career_dict['required_skills'])
+    if request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE:
+        return stream_assessment(conn, user_id, user_skills, user_interests, results,
+                                 total_careers, pruned, scoring)
+    
+    response = save_assessment(conn, user_id, user_skills, user_interests, list(results),
+                               total_careers, pruned, scoring)
+    conn.close()
+    
+    return jsonify(response)
+
+def stream_assessment(conn, user_id, user_skills, user_interests, results, total_careers, careers_pruned=0,
+                      scoring=SCORING_MODE):
+    """
+    NDJSON response for /api/assess: a summary line, one line per career as
+    soon as it is scored, then the final top-5 ranking once it is saved.
+    A client that disconnects mid-stream still gets its assessment saved.
+    """
+    def generate():
+        recommendations = []
+        saved = False
+        try:
+            yield json.dumps({
+                'type': 'summary',
+                'total_careers': total_careers,
+                'careers_pruned': careers_pruned,
+                'skills_evaluated': len(user_skills)
+            }) + '\n'
             
-            skill_overlap = len(set(user_skills) & set(required_skills))
-            match_score = min(100, (skill_overlap / max(len(required_skills), 1)) * 100)
+            for recommendation in results:
+                recommendations.append(recommendation)
+                yield json.dumps(dict(recommendation, type='career')) + '\n'
             
-            recommendations.append({
-                'career_id': career_dict['id'],
-                'career_title': career_dict['title'],
-                'match_score': match_score,
-                'reasoning': f"You have {skill_overlap} out of {len(required_skills)} required skills.",
-                'skill_gaps': list(set(required_skills) - set(user_skills))[:3],
-                'career_details': career_dict
-            })
+            response = save_assessment(conn, user_id, user_skills, user_interests, recommendations,
+                                       total_careers, careers_pruned, scoring)
+            saved = True
+            yield json.dumps(dict(response, type='result')) + '\n'
+        except GeneratorExit:
+            # The client went away: finish scoring and save as the JSON response would have
+            if not saved:
+                try:
+                    recommendations.extend(results)
+                    save_assessment(conn, user_id, user_skills, user_interests, recommendations,
+                                    total_careers, careers_pruned, scoring)
+                except Exception as e:
+                    print(f"Assessment stream error: {e}")
+            raise
+        except Exception as e:
+            print(f"Assessment stream error: {e}")
+            yield json.dumps({'type': 'error', 'success': False, 'message': 'Assessment failed'}) + '\n'
+        finally:
+            conn.close()
     
-    # Sort by match score
-    recommendations.sort(key=lambda x: x['match_score'], reverse=True)
+    # stream_with_context keeps the app context (and its connection lease) alive until the stream ends
+    return app.response_class(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE,
+                              headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/assess/<job_id>', methods=['GET'])
+def get_assessment_job(job_id):
+    """Poll an async assessment; ?since=N returns only results after the first N"""
+    job = assessment_jobs.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
     
-    # Save assessment results
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO assessments (user_id, assessment_type, results, recommendations)
-        VALUES (?, ?, ?, ?)
-    ''', (
-        user_id,
-        'career_match',
-        json.dumps({'user_skills': user_skills, 'user_interests': user_interests}),
-        json.dumps(recommendations[:5])  # Top 5 recommendations
-    ))
-    
-    # Save top recommendations
-    for rec in recommendations[:3]:
-        cursor.execute('''
-            INSERT INTO recommendations (user_id, career_path_id, match_score, reasoning, skill_gaps)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            user_id,
-            rec['career_id'],
-            rec['match_score'],
-            rec['reasoning'],
-            json.dumps(rec['skill_gaps'])
-        ))
+    since = request.args.get('since', 0, type=int)
+    return jsonify(dict(job.snapshot(since), success=True))
+
+@app.route('/api/assess/<job_id>/events', methods=['GET'])
+def stream_assessment_job(job_id):
+    """
+    Server-Sent Events for an async assessment: 'started' with the number of
+    careers, one 'career' event per scored career, then 'done' with the final
+    ranking (or 'failed'). Reconnects resume from Last-Event-ID.
+    """
+    job = assessment_jobs.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
     
-    conn.commit()
-    conn.close()
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', 0, type=int)
+    
+    def generate():
+        cursor = since
+        announced = False
+        while True:
+            events, finished = job.wait_for_events(cursor, timeout=SSE_KEEPALIVE_SECONDS)
+            if not announced and job.total is not None:
+                announced = True
+                yield f"event: started\ndata: {json.dumps({'total': job.total})}\n\n"
+            for event in events:
+                cursor += 1
+                yield f"id: {cursor}\nevent: career\ndata: {json.dumps(event)}\n\n"
+            if finished:
+                if job.status == 'done':
+                    yield f"event: done\ndata: {json.dumps(job.result)}\n\n"
+                else:
+                    yield f"event: failed\ndata: {json.dumps({'success': False, 'message': job.error})}\n\n"
+                return
+            if not events:
+                yield ': keep-alive\n\n'
+    
+    return app.response_class(generate(), mimetype='text/event-stream',
+                              headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def run_batch_job(job, run_id, chunk_size, batch_size):
+    """Background body of a cohort assessment: publish the checkpoint after every chunk"""
+    conn = get_db_connection()
+    catalog_conn = get_catalog_connection()
+    try:
+        run = load_run(conn, run_id)
+        job.start(count_users(conn, run['last_user_id'], run['until_id']))
+        run = run_batch(conn, run, model=model if run['mode'] == 'ai' else None, chunk_size=chunk_size,
+                        batch_size=batch_size, cache=analysis_cache, progress=job.publish,
+                        catalog_conn=catalog_conn, catalog_path=catalog_pool.path if catalog_pool else None)
+        return {'success': True, 'run': run}
+    finally:
+        catalog_conn.close()
+        conn.close()
+
+@app.route('/api/assess/batch', methods=['POST'])
+def assess_cohort():
+    """
+    Assess every user with after_id < id <= until_id in the background, or
+    continue an interrupted run with {"resume": run_id} (409 while it is still
+    running; {"force": true} takes over a run whose process died). Returns a
+    job id; each job event is the run checkpoint after a committed chunk.
+    """
+    data = request.json or {}
+    try:
+        chunk_size = int(data.get('chunk_size') or BATCH_CHUNK_SIZE)
+        batch_size = parse_batch_size(data)
+        after_id = int(data.get('after_id') or 0)
+        until_id = int(data['until_id']) if data.get('until_id') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({'success': False,
+                        'message': 'after_id, until_id, chunk_size and batch_size must be integers'}), 400
+    
+    conn = get_db_connection()
+    try:
+        if data.get('resume'):
+            run = load_run(conn, data['resume'])
+            if not run:
+                return jsonify({'success': False, 'message': 'Batch run not found'}), 404
+            if not claim_run(conn, run['id'], data.get('force') is True):
+                return jsonify({'success': False, 'message': 'Batch run is already running'}), 409
+        else:
+            run = start_run(conn, 'ai' if model else 'rules', after_id, until_id)
+    finally:
+        conn.close()
     
+    job = assessment_jobs.submit(run_batch_job, run['id'], max(1, chunk_size), batch_size)
     return jsonify({
         'success': True,
-        'recommendations': recommendations[:5],
-        'assessment_summary': {
-            'total_careers_analyzed': len(careers),
-            'top_match_score': recommendations[0]['match_score'] if recommendations else 0,
-            'skills_evaluated': len(user_skills)
-        }
-    })
+        'run_id': run['id'],
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/api/assess/{job.id}',
+        'events_url': f'/api/assess/{job.id}/events'
+    }), 202
 
 @app.route('/api/learning-path', methods=['POST'])
 def get_learning_path():
@@ -306,33 +686,42 @@ def get_learning_path():
     user_id = data.get('user_id')
     
     conn = get_db_connection()
+    catalog_conn = get_catalog_connection()
     
     # Get career details
-    career = conn.execute('SELECT * FROM career_paths WHERE id = ?', (career_id,)).fetchone()
+    career = catalog_conn.execute('SELECT * FROM career_paths WHERE id = ?', (career_id,)).fetchone()
     if not career:
+        catalog_conn.close()
         conn.close()
         return jsonify({'success': False, 'message': 'Career not found'}), 404
     
     career_dict = dict(career)
-    required_skills = json.loads(career_dict['required_skills'])
     
     # Get user's current skills
-    user = conn.execute('SELECT current_skills FROM users WHERE id = ?', (user_id,)).fetchone()
-    user_skills = json.loads(user['current_skills']) if user and user['current_skills'] else []
+    user_skills = [row['skill'] for row in conn.execute(
+        'SELECT skill FROM user_skills WHERE user_id = ? ORDER BY position', (user_id,)
+    )]
+    
+    # Skill gaps: required skills the user doesn't have (the catalog may be a separate snapshot file)
+    owned = set(user_skills)
+    skill_gaps = [row['skill'] for row in catalog_conn.execute(
+        'SELECT skill FROM career_skills WHERE career_id = ? ORDER BY position', (career_id,)
+    ) if row['skill'] not in owned]
     
-    # Get skill details and resources
-    skill_gaps = list(set(required_skills) - set(user_skills))
+    # Get skill details and resources, all missing skills in one query each
+    skills_by_name = fetch_skills_by_name(catalog_conn, skill_gaps)
+    resources_by_skill = fetch_skill_resources(catalog_conn, [skill['id'] for skill in skills_by_name.values()])
     learning_resources = {}
     
     for skill in skill_gaps:
-        skill_data = conn.execute('SELECT * FROM skills WHERE name = ?', (skill,)).fetchone()
-        if skill_data:
-            skill_dict = dict(skill_data)
+        skill_dict = skills_by_name.get(skill)
+        if skill_dict:
             learning_resources[skill] = {
                 'difficulty': skill_dict['difficulty_level'],
-                'resources': json.loads(skill_dict['learning_resources'])
+                'resources': resources_by_skill.get(skill_dict['id'], [])
             }
     
+    catalog_conn.close()
     conn.close()
     
     # Create learning path
@@ -369,6 +758,36 @@ def get_learning_path():
         'learning_path': learning_path
     })
 
+@app.route('/api/ai/stats', methods=['GET'])
+def get_ai_stats():
+    """AI analysis cache, latency, parse-rate, client breaker and background job counters"""
+    return jsonify({
+        'success': True,
+        'cache': analysis_cache.stats(),
+        'analysis': analysis_metrics.stats(),
+        'client': model.stats() if hasattr(model, 'stats') else None,
+        'jobs': assessment_jobs.stats()
+    })
+
+@app.route('/api/db/stats', methods=['GET'])
+def get_db_stats():
+    """Connection pool, catalog snapshot, catalog cache and assessment write-behind counters"""
+    snapshot = None
+    if catalog_pool:
+        catalog_conn = get_catalog_connection()
+        try:
+            snapshot = dict(catalog_pool.stats(), info=snapshot_info(catalog_conn))
+            snapshot['path'] = os.path.basename(snapshot['path'])
+        finally:
+            catalog_conn.close()
+    return jsonify({
+        'success': True,
+        'pool': db_pool.stats(),
+        'catalog_snapshot': snapshot,
+        'catalog_cache': catalog_cache.stats(),
+        'assessment_writer': assessment_writer.stats() if assessment_writer else None
+    })
+
 @app.route('/dashboard')
 def dashboard():
     """User dashboard"""
@@ -0,0 +1,201 @@
+"""
+Assessment Persistence
+Builds the assessments/recommendations rows for a scored user, so the
+/api/assess endpoint and the batch pipeline store exactly the same thing,
+plus an optional write-behind queue that takes the inserts (and the commit's
+fsync) off the request path
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import sqlite3
+import threading
+
+# Write-behind configuration
+ASSESSMENT_WRITE_BEHIND = os.getenv('ASSESSMENT_WRITE_BEHIND', 'False').lower() == 'true'
+WRITE_BEHIND_BATCH = int(os.getenv('WRITE_BEHIND_BATCH', '100'))
+WRITE_BEHIND_INTERVAL = float(os.getenv('WRITE_BEHIND_INTERVAL', '0.5'))
+WRITE_BEHIND_QUEUE = int(os.getenv('WRITE_BEHIND_QUEUE', '1000'))
+# How long a request waits for room in a full queue before writing synchronously
+WRITE_BEHIND_BLOCK_SECONDS = float(os.getenv('WRITE_BEHIND_BLOCK_SECONDS', '2'))
+
+# Recommendations kept in assessments.recommendations / the recommendations table
+TOP_ASSESSMENT = 5
+TOP_RECOMMENDATIONS = 3
+
+INSERT_ASSESSMENT = '''
+    INSERT INTO assessments (user_id, assessment_type, results, recommendations)
+    VALUES (?, ?, ?, ?)
+'''
+
+INSERT_RECOMMENDATION = '''
+    INSERT INTO recommendations (user_id, career_path_id, match_score, reasoning, skill_gaps)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+
+def rank_recommendations(recommendations):
+    """Sort recommendations by match score, best first (in place)"""
+    recommendations.sort(key=lambda x: x['match_score'], reverse=True)
+    return recommendations
+
+
+def assessment_rows(user_id, user_skills, user_interests, recommendations):
+    """
+    (assessment row, recommendation rows) for one user's ranked
+    recommendations, ready for INSERT_ASSESSMENT / INSERT_RECOMMENDATION
+    """
+    assessment = (
+        user_id,
+        'career_match',
+        json.dumps({'user_skills': user_skills, 'user_interests': user_interests}),
+        json.dumps(recommendations[:TOP_ASSESSMENT])
+    )
+    recommendation_rows = [
+        (user_id, rec['career_id'], rec['match_score'], rec['reasoning'], json.dumps(rec['skill_gaps']))
+        for rec in recommendations[:TOP_RECOMMENDATIONS]
+    ]
+    return assessment, recommendation_rows
+
+
+def insert_assessments(cursor, assessments, recommendations):
+    """Bulk-insert assessment and recommendation rows; the caller commits"""
+    cursor.executemany(INSERT_ASSESSMENT, assessments)
+    cursor.executemany(INSERT_RECOMMENDATION, recommendations)
+
+
+class AssessmentWriter:
+    """
+    Write-behind queue for assessment rows. A background thread drains the
+    bounded queue and commits everything it collected in one transaction once
+    `batch_size` assessments are waiting or `interval` seconds have passed.
+    submit() blocks while the queue is full (backpressure) and gives up after
+    `block_seconds`, so the caller can write synchronously instead.
+    """
+
+    _STOP = object()
+
+    def __init__(self, connect, batch_size=None, interval=None, max_queue=None, block_seconds=None):
+        self.connect = connect
+        self.batch_size = batch_size or WRITE_BEHIND_BATCH
+        self.interval = WRITE_BEHIND_INTERVAL if interval is None else interval
+        self.block_seconds = WRITE_BEHIND_BLOCK_SECONDS if block_seconds is None else block_seconds
+        self._queue = queue.Queue(maxsize=max_queue or WRITE_BEHIND_QUEUE)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self.queued = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _start(self):
+        # Caller holds the lock
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='assessment-writer', daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def submit(self, assessment, recommendation_rows):
+        """Queue one user's rows; returns False if they were not accepted"""
+        with self._lock:
+            if self._closed:
+                return False
+            self._start()
+        try:
+            self._queue.put((assessment, recommendation_rows), timeout=self.block_seconds)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            self.queued += 1
+        return True
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.interval
+            while True:
+                if item is self._STOP:
+                    stopping = True
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if stopping:
+                # Anything that slipped in behind the stop marker still gets written
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+            if batch:
+                try:
+                    self._write(batch)
+                finally:
+                    # Even a failed batch is done, or flush() would wait on it forever
+                    for _ in batch:
+                        self._queue.task_done()
+
+    def _write(self, batch):
+        assessments = [assessment for assessment, _ in batch]
+        recommendations = [row for _, rows in batch for row in rows]
+        conn = None
+        try:
+            conn = self.connect()
+            insert_assessments(conn.cursor(), assessments, recommendations)
+            conn.commit()
+            with self._lock:
+                self.written += len(batch)
+                self.batches += 1
+        except Exception as e:
+            # Any failure (connecting, a bad row) loses this batch only, never the writer thread
+            print(f"Assessment write-behind error: {e}")
+            with self._lock:
+                self.failed += len(batch)
+            if conn is not None:
+                try:
+                    conn.rollback()
+                except sqlite3.Error:
+                    pass
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def flush(self):
+        """Block until everything queued so far has been written"""
+        self._queue.join()
+
+    def close(self):
+        """Write what is queued and stop the writer thread (idempotent)"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(self._STOP)
+            thread.join()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': self._queue.qsize(),
+                'queued': self.queued,
+                'written': self.written,
+                'batches': self.batches,
+                'failed': self.failed,
+                'rejected': self.rejected
+            }
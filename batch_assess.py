@@ -0,0 +1,304 @@
+"""
+Batch Assessment
+Scores a whole cohort of students in one pass: the career catalog is loaded
+once, users are streamed from the users table in id order, and each chunk's
+assessments/recommendations are written in one transaction together with a
+checkpoint, so an interrupted run can be resumed where it stopped.
+
+Usage: python batch_assess.py [--after-id N] [--until-id N] [--resume RUN_ID [--force]]
+                              [--chunk-size 500] [--processes 4] [--ai]
+"""
+
+import os
+import sys
+import json
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from assessments import TOP_ASSESSMENT, rank_recommendations, assessment_rows, insert_assessments
+from ai_engine import analyze_careers
+from scoring import SCORING_MODE, get_scoring_engine
+from embeddings import get_embedding_index, embeddings_needed, embedding_candidates, recommend_embedding
+
+# Batch configuration
+BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', '500'))
+
+
+def start_run(conn, mode, after_id=0, until_id=None):
+    """Record a new run over users with after_id < id <= until_id"""
+    cursor = conn.execute('''
+        INSERT INTO batch_assessment_runs (mode, after_id, until_id, last_user_id)
+        VALUES (?, ?, ?, ?)
+    ''', (mode, after_id, until_id, after_id))
+    conn.commit()
+    return load_run(conn, cursor.lastrowid)
+
+
+def load_run(conn, run_id):
+    """A run's checkpoint as a dict, or None"""
+    row = conn.execute('SELECT * FROM batch_assessment_runs WHERE id = ?', (run_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def claim_run(conn, run_id, force=False):
+    """
+    Mark a run as running before resuming it, unless it already is: two
+    processes resuming one run would write every chunk twice. A run left
+    'running' by a process that died needs `force`. Returns whether it was claimed.
+    """
+    cursor = conn.execute('''
+        UPDATE batch_assessment_runs SET status = 'running', updated_at = CURRENT_TIMESTAMP
+        WHERE id = ? AND (status != 'running' OR ?)
+    ''', (run_id, bool(force)))
+    conn.commit()
+    return cursor.rowcount == 1
+
+
+def _set_status(conn, run_id, status):
+    conn.execute('''
+        UPDATE batch_assessment_runs SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?
+    ''', (status, run_id))
+    conn.commit()
+
+
+def count_users(conn, after_id=0, until_id=None):
+    """Number of users a run over (after_id, until_id] covers"""
+    if until_id is None:
+        return conn.execute('SELECT COUNT(*) FROM users WHERE id > ?', (after_id,)).fetchone()[0]
+    return conn.execute('SELECT COUNT(*) FROM users WHERE id > ? AND id <= ?',
+                        (after_id, until_id)).fetchone()[0]
+
+
+def decode_user(row):
+    """(user_id, user_dict, interests, skills) from a users row, as /api/assess reads it"""
+    user_dict = dict(row)
+    user_interests = json.loads(user_dict['interests']) if user_dict['interests'] else []
+    user_skills = json.loads(user_dict['current_skills']) if user_dict['current_skills'] else []
+    return user_dict['id'], user_dict, user_interests, user_skills
+
+
+def iter_user_chunks(conn, after_id=0, until_id=None, chunk_size=None):
+    """Yield lists of decoded users in id order, one keyset query per chunk"""
+    chunk_size = chunk_size or BATCH_CHUNK_SIZE
+    while True:
+        if until_id is None:
+            rows = conn.execute('SELECT * FROM users WHERE id > ? ORDER BY id LIMIT ?',
+                                (after_id, chunk_size)).fetchall()
+        else:
+            rows = conn.execute('SELECT * FROM users WHERE id > ? AND id <= ? ORDER BY id LIMIT ?',
+                                (after_id, until_id, chunk_size)).fetchall()
+        if not rows:
+            return
+        users = [decode_user(row) for row in rows]
+        yield users
+        after_id = users[-1][0]
+
+
+def score_users(engine, users, model=None, batch_size=None, cache=None, embedding_index=None):
+    """
+    (assessment rows, recommendation rows) for a chunk of users. Without a
+    model every user is one bitset pass (or, with SCORING_MODE=tfidf, one
+    sparse product, or with SCORING_MODE=embedding one nearest-neighbour
+    search) over the prebuilt engine; with one, each user's careers are
+    analyzed concurrently by the AI engine. `embedding_index` is required
+    when embeddings_needed() says so.
+    """
+    assessments, recommendations = [], []
+    for user_id, user_dict, user_interests, user_skills in users:
+        # Same candidate pruning and scoring formula as /api/assess
+        if model:
+            if embedding_index is not None:
+                candidates, _ = embedding_candidates(embedding_index, engine, user_skills, user_interests)
+            else:
+                candidates, _ = engine.candidates(user_skills)
+            careers = [engine.careers[i] for i in candidates]
+            required_skills = [engine.required_skills[i] for i in candidates]
+            ranked = rank_recommendations(analyze_careers(model, user_dict, user_interests, user_skills,
+                                                          careers, batch_size=batch_size, cache=cache,
+                                                          required_skills=required_skills))
+        elif SCORING_MODE == 'tfidf':
+            ranked, _ = engine.recommend_tfidf(user_skills, user_interests, k=TOP_ASSESSMENT)
+        elif SCORING_MODE == 'embedding':
+            ranked, _ = recommend_embedding(embedding_index, engine, user_skills, user_interests, k=TOP_ASSESSMENT)
+        else:
+            candidates, _ = engine.candidates(user_skills)
+            ranked = engine.recommend(user_skills, k=TOP_ASSESSMENT, indexes=candidates)
+        assessment, recommendation_rows = assessment_rows(user_id, user_skills, user_interests, ranked)
+        assessments.append(assessment)
+        recommendations.extend(recommendation_rows)
+    return assessments, recommendations
+
+
+def write_chunk(conn, run_id, last_user_id, count, scored):
+    """Insert one chunk's rows and advance the run checkpoint in the same transaction"""
+    assessments, recommendations = scored
+    cursor = conn.cursor()
+    insert_assessments(cursor, assessments, recommendations)
+    cursor.execute('''
+        UPDATE batch_assessment_runs
+        SET last_user_id = ?, processed = processed + ?, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    ''', (last_user_id, count, run_id))
+    conn.commit()
+
+
+# Per-process state for --processes: each worker builds its own engine once
+_worker_engine = None
+_worker_model = None
+_worker_batch_size = None
+_worker_embedding_index = None
+
+
+def _init_worker(db_path, catalog_path, use_ai, batch_size):
+    global _worker_engine, _worker_model, _worker_batch_size, _worker_embedding_index
+    from db import ConnectionPool, SnapshotPool
+    # Same catalog as the parent process: the read-only snapshot when it uses one
+    pool = SnapshotPool(catalog_path, max_idle=0) if catalog_path else ConnectionPool(db_path, max_idle=0)
+    conn = pool.acquire()
+    try:
+        _worker_engine = get_scoring_engine(conn)
+        if embeddings_needed(SCORING_MODE, use_ai):
+            _worker_embedding_index = get_embedding_index(_worker_engine, conn)
+    finally:
+        conn.close()
+    _worker_model = load_model() if use_ai else None
+    _worker_batch_size = batch_size
+
+
+def _score_in_worker(users):
+    return score_users(_worker_engine, users, _worker_model, _worker_batch_size,
+                       embedding_index=_worker_embedding_index)
+
+
+def run_batch(conn, run, model=None, chunk_size=None, batch_size=None, cache=None,
+              processes=1, db_path=None, progress=None, catalog_conn=None, catalog_path=None):
+    """
+    Score every user after the run's checkpoint and return the updated run.
+    With processes > 1, chunks are scored in a process pool (each worker
+    loads the catalog once) while this process does all the writing, in id
+    order, so the checkpoint never skips past an unwritten chunk.
+    `progress(run)` is called after each committed chunk. The catalog is
+    read from `catalog_conn` (e.g. the read-only snapshot) if given; workers
+    open the snapshot at `catalog_path` if given, else `db_path`.
+    """
+    run_id = run['id']
+    chunks = iter_user_chunks(conn, run['last_user_id'], run['until_id'], chunk_size)
+
+    def committed(users, scored):
+        write_chunk(conn, run_id, users[-1][0], len(users), scored)
+        if progress:
+            progress(load_run(conn, run_id))
+
+    _set_status(conn, run_id, 'running')
+    try:
+        if processes > 1:
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                     initargs=(db_path, catalog_path, model is not None,
+                                               batch_size)) as executor:
+                # Keep a couple of chunks per worker in flight, not the whole cohort
+                pending = deque()
+                for users in chunks:
+                    pending.append((users, executor.submit(_score_in_worker, users)))
+                    if len(pending) >= processes * 2:
+                        users, future = pending.popleft()
+                        committed(users, future.result())
+                while pending:
+                    users, future = pending.popleft()
+                    committed(users, future.result())
+        else:
+            engine = get_scoring_engine(catalog_conn or conn)
+            embedding_index = (get_embedding_index(engine, catalog_conn or conn)
+                               if embeddings_needed(SCORING_MODE, model is not None) else None)
+            for users in chunks:
+                committed(users, score_users(engine, users, model, batch_size, cache, embedding_index))
+    except BaseException:
+        conn.rollback()
+        _set_status(conn, run_id, 'failed')
+        raise
+
+    _set_status(conn, run_id, 'done')
+    return load_run(conn, run_id)
+
+
+def load_model():
+    """Gemini model from GEMINI_API_KEY, or None when no key is configured"""
+    from dotenv import load_dotenv
+    load_dotenv()
+    load_dotenv('.env.production')
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        return None
+    from ai_client import ResilientModel, LazyGeminiModel
+    return ResilientModel(LazyGeminiModel(api_key))
+
+
+def main(argv=None):
+    from db import ConnectionPool, database_path
+    from database.migrations import migrate
+    from catalog_snapshot import open_snapshot_pool
+
+    parser = argparse.ArgumentParser(description='Assess a cohort of students in one batch')
+    parser.add_argument('--after-id', type=int, default=0, help='only users with a larger id')
+    parser.add_argument('--until-id', type=int, default=None, help='only users up to this id')
+    parser.add_argument('--resume', type=int, metavar='RUN_ID', help='continue an earlier run')
+    parser.add_argument('--force', action='store_true',
+                        help='resume a run marked running (only if the process running it is gone)')
+    parser.add_argument('--chunk-size', type=int, default=BATCH_CHUNK_SIZE, help='users per transaction')
+    parser.add_argument('--processes', type=int, default=1, help='score chunks in N worker processes')
+    parser.add_argument('--ai', action='store_true', help='use Gemini instead of skill-overlap scoring')
+    parser.add_argument('--batch-size', type=int, default=None, help='careers per AI prompt')
+    parser.add_argument('--db', default=None, help='SQLite database path')
+    parser.add_argument('--catalog', default=None,
+                        help='catalog snapshot path (default: CATALOG_SNAPSHOT, if it has been built)')
+    args = parser.parse_args(argv)
+
+    db_path = args.db or database_path()
+    catalog_pool = open_snapshot_pool(args.catalog)
+    conn = ConnectionPool(db_path, max_idle=0, setup=migrate).acquire()
+    catalog_conn = catalog_pool.acquire() if catalog_pool else None
+    try:
+        if args.resume:
+            run = load_run(conn, args.resume)
+            if run is None:
+                print(f"Error: no batch run {args.resume}")
+                return 1
+            if run['status'] == 'done':
+                print(f"Run {run['id']} already finished ({run['processed']} users)")
+                return 0
+            mode = run['mode']
+        else:
+            run = None
+            mode = 'ai' if args.ai else 'rules'
+
+        # A resumed run keeps the scoring mode it started with
+        model = load_model() if mode == 'ai' else None
+        if mode == 'ai' and model is None:
+            print("Error: AI mode needs GEMINI_API_KEY")
+            return 1
+        if run is None:
+            run = start_run(conn, mode, args.after_id, args.until_id)
+        elif not claim_run(conn, run['id'], args.force):
+            print(f"Error: run {run['id']} is already running (last checkpoint {run['updated_at']}); "
+                  f"pass --force if the process running it has died")
+            return 1
+
+        total = count_users(conn, run['last_user_id'], run['until_id'])
+        print(f"Run {run['id']}: {total} users to assess ({run['mode']})")
+
+        def progress(current):
+            print(f"   {current['processed']} users assessed (last id {current['last_user_id']})")
+
+        run = run_batch(conn, run, model=model, chunk_size=args.chunk_size, batch_size=args.batch_size,
+                        processes=args.processes, db_path=db_path, progress=progress,
+                        catalog_conn=catalog_conn, catalog_path=catalog_pool.path if catalog_pool else None)
+        print(f"Run {run['id']} {run['status']}: {run['processed']} users assessed")
+    finally:
+        if catalog_conn:
+            catalog_conn.close()
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
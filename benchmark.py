@@ -0,0 +1,297 @@
+"""
+Performance benchmarks for the Career Advisor MVP
+Runs offline against synthetic data; no server or API key needed.
+
+Usage: python benchmark.py [section ...]
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+# Modules that must stay out of a cold start; they are imported on first use
+LAZY_MODULES = ('google.generativeai', 'google.oauth2', 'jwt', 'requests')
+
+
+def print_section(title):
+    print(f"\n{'='*50}")
+    print(f" {title}")
+    print('='*50)
+
+
+def timed(func, repeat=5):
+    """Best wall-clock time of `repeat` runs, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def synthetic_catalog(num_careers, num_skills=500, skills_per_career=6, seed=42):
+    """Career rows shaped like career_paths, with random required skills"""
+    rng = random.Random(seed)
+    vocabulary = [f"Skill {i}" for i in range(num_skills)]
+    return vocabulary, [
+        {
+            'id': i + 1,
+            'title': f"Career {i + 1}",
+            'description': 'Synthetic career',
+            'industry': f"Industry {i % 40}",
+            'required_skills': json.dumps(rng.sample(vocabulary, skills_per_career)),
+            'growth_potential': 'High',
+            'education_requirements': 'Any degree'
+        }
+        for i in range(num_careers)
+    ]
+
+
+def bench_scoring():
+    """Per-request JSON/set scoring loop vs the precomputed bitset engine"""
+    from scoring import SkillScoringEngine, skill_overlap_recommendation
+
+    print_section("📊 SKILL-OVERLAP SCORING")
+    for num_careers in (1_000, 10_000, 50_000):
+        vocabulary, careers = synthetic_catalog(num_careers)
+        user_skills = random.Random(7).sample(vocabulary, 8)
+
+        def legacy():
+            recommendations = []
+            for career in careers:
+                career_dict = dict(career)
+                required_skills = json.loads(career_dict['required_skills'])
+                recommendations.append(skill_overlap_recommendation(career_dict, required_skills, user_skills))
+            recommendations.sort(key=lambda x: x['match_score'], reverse=True)
+            return recommendations[:5]
+
+        build_ms = timed(lambda: SkillScoringEngine(careers), repeat=1)
+        engine = SkillScoringEngine(careers)
+        legacy_ms = timed(legacy)
+        engine_ms = timed(lambda: engine.recommend(user_skills, k=5))
+
+        assert [r['career_id'] for r in legacy()] == [r['career_id'] for r in engine.recommend(user_skills, k=5)]
+        print(f"   {num_careers:>6} careers: legacy {legacy_ms:8.2f} ms | engine {engine_ms:7.2f} ms "
+              f"({legacy_ms / engine_ms:5.1f}x) | one-off build {build_ms:7.2f} ms")
+
+
+def bench_candidates():
+    """Scoring the whole catalog vs pruning it through the inverted skill index first"""
+    from scoring import SkillScoringEngine
+
+    print_section("✂️  CANDIDATE PRUNING")
+    for num_careers in (1_000, 10_000, 50_000):
+        vocabulary, careers = synthetic_catalog(num_careers)
+        user_skills = random.Random(7).sample(vocabulary, 8)
+        engine = SkillScoringEngine(careers)
+
+        def pruned():
+            candidates, _ = engine.candidates(user_skills, min_overlap=1, limit=0)
+            return engine.recommend(user_skills, k=5, indexes=candidates)
+
+        full_ms = timed(lambda: engine.recommend(user_skills, k=5))
+        pruned_ms = timed(pruned)
+        candidates, dropped = engine.candidates(user_skills, min_overlap=1, limit=0)
+
+        assert [r['career_id'] for r in engine.recommend(user_skills, k=5)] == [r['career_id'] for r in pruned()]
+        print(f"   {num_careers:>6} careers: full {full_ms:7.2f} ms | pruned {pruned_ms:6.2f} ms "
+              f"({full_ms / pruned_ms:5.1f}x) | {len(candidates)} candidates, {dropped} pruned "
+              f"({dropped / num_careers:.0%} fewer AI calls)")
+
+
+def bench_tfidf():
+    """Throughput of the overlap formula vs TF-IDF cosine scoring (skills + interests)"""
+    from scoring import SkillScoringEngine
+
+    print_section("🧮 TF-IDF VS OVERLAP SCORING")
+    rng = random.Random(5)
+    topics = [f"topic{chr(97 + i // 26)}{chr(97 + i % 26)}" for i in range(300)]
+    for num_careers in (1_000, 10_000, 50_000):
+        vocabulary, careers = synthetic_catalog(num_careers)
+        for career in careers:
+            career['description'] = ' '.join(rng.sample(topics, 8))
+        users = [(rng.sample(vocabulary, 8), rng.sample(topics, 2)) for _ in range(200)]
+        engine = SkillScoringEngine(careers)
+
+        def overlap():
+            for user_skills, _ in users:
+                candidates, _ = engine.candidates(user_skills)
+                engine.recommend(user_skills, k=5, indexes=candidates)
+
+        def tfidf():
+            for user_skills, user_interests in users:
+                engine.recommend_tfidf(user_skills, user_interests, k=5)
+
+        build_ms = timed(lambda: engine.tfidf, repeat=1)
+        overlap_ms = timed(overlap, repeat=3)
+        tfidf_ms = timed(tfidf, repeat=3)
+        print(f"   {num_careers:>6} careers: overlap {len(users) / overlap_ms * 1000:8.0f} users/s | "
+              f"tfidf {len(users) / tfidf_ms * 1000:7.0f} users/s | matrix build {build_ms:7.1f} ms")
+
+
+def bench_embeddings():
+    """Build time and per-query latency of the embedding index, exhaustive vs IVF"""
+    import embeddings
+    from scoring import SkillScoringEngine
+
+    print_section("🧭 EMBEDDING INDEX")
+    print(f"   backend: {'NumPy' if embeddings.np is not None else 'pure Python'}, "
+          f"{embeddings.EMBEDDING_DIM} dimensions")
+    rng = random.Random(11)
+    topics = [f"topic{chr(97 + i // 26)}{chr(97 + i % 26)}" for i in range(300)]
+    for num_careers in (1_000, 10_000):
+        vocabulary, careers = synthetic_catalog(num_careers)
+        for career in careers:
+            career['description'] = ' '.join(rng.sample(topics, 8))
+        engine = SkillScoringEngine(careers)
+        users = [(rng.sample(vocabulary, 8), rng.sample(topics, 2)) for _ in range(50)]
+
+        start = time.perf_counter()
+        index = embeddings.build_index(engine.careers, engine.required_skills, nlist=0)
+        build_ms = (time.perf_counter() - start) * 1000
+        queries = [index.user_vector(user_skills, user_interests) for user_skills, user_interests in users]
+        exact_ms = timed(lambda: [index.search(query, 5) for query in queries], repeat=3) / len(queries)
+        line = f"   {num_careers:>6} careers: build {build_ms:8.0f} ms | exhaustive {exact_ms:7.2f} ms/query"
+
+        if embeddings.np is not None:
+            ivf = embeddings.build_index(engine.careers, engine.required_skills, nlist=int(num_careers ** 0.5))
+            ivf_ms = timed(lambda: [ivf.search(query, 5) for query in queries], repeat=3) / len(queries)
+            found = sum(len({career_id for career_id, _ in ivf.search(query, 5)[0]} &
+                            {career_id for career_id, _ in index.search(query, 5)[0]}) for query in queries)
+            line += f" | IVF {ivf_ms:6.2f} ms/query (recall@5 {found / (5 * len(queries)):.0%})"
+        print(line)
+
+
+def bench_learning_path():
+    """Per-skill lookups vs one bulk IN query, against the number of skill gaps"""
+    import sqlite3
+    from app import fetch_skills_by_name
+
+    print_section("📚 LEARNING-PATH SKILL LOOKUPS")
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    conn.execute('''
+        CREATE TABLE skills (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            category TEXT,
+            difficulty_level TEXT,
+            learning_resources TEXT
+        )
+    ''')
+    conn.execute('CREATE UNIQUE INDEX idx_skills_name ON skills (name)')
+    conn.executemany(
+        'INSERT INTO skills (name, category, difficulty_level, learning_resources) VALUES (?, ?, ?, ?)',
+        [(f"Skill {i}", 'Category', 'Intermediate', json.dumps(['Coursera', 'Udemy'])) for i in range(20_000)]
+    )
+
+    rng = random.Random(3)
+    for num_gaps in (3, 10, 50, 200, 1000):
+        gaps = [f"Skill {i}" for i in rng.sample(range(20_000), num_gaps)]
+
+        def per_skill():
+            return [conn.execute('SELECT * FROM skills WHERE name = ?', (skill,)).fetchone() for skill in gaps]
+
+        n_plus_one_ms = timed(per_skill)
+        bulk_ms = timed(lambda: fetch_skills_by_name(conn, gaps))
+        print(f"   {num_gaps:>5} gaps: one query per skill {n_plus_one_ms:7.3f} ms | "
+              f"bulk IN {bulk_ms:7.3f} ms ({n_plus_one_ms / bulk_ms:4.1f}x)")
+
+
+def bench_search():
+    """Finding every match with a LIKE scan vs the FTS5 index, as the catalog grows"""
+    import sqlite3
+    from database.migrations import migrate
+    from search import search_catalog
+
+    print_section("🔎 CATALOG SEARCH")
+    rng = random.Random(11)
+    # A realistic vocabulary: any one word appears in a small share of careers
+    vocabulary = sorted({''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(7)) for _ in range(5000)})
+    query = vocabulary[1234][:4]
+    for num_careers in (1_000, 10_000, 100_000):
+        conn = sqlite3.connect(':memory:')
+        conn.row_factory = sqlite3.Row
+        migrate(conn)
+        conn.executemany(
+            'INSERT INTO career_paths (title, description, industry, education_requirements) VALUES (?, ?, ?, ?)',
+            [(f"{rng.choice(vocabulary).title()} Specialist",
+              ' '.join(rng.sample(vocabulary, 12)),
+              f"Industry {i % 40}", 'Any degree') for i in range(num_careers)]
+        )
+        conn.commit()
+
+        def like_scan():
+            pattern = f'%{query}%'
+            return conn.execute(
+                'SELECT id, title FROM career_paths WHERE title LIKE ? OR description LIKE ?',
+                (pattern, pattern)
+            ).fetchall()
+
+        like_ms = timed(like_scan)
+        fts_ms = timed(lambda: search_catalog(conn, query, kinds=('careers',)))
+        matches = len(search_catalog(conn, query, kinds=('careers',), limit=num_careers)['careers'])
+        print(f"   {num_careers:>7} careers: LIKE scan {like_ms:7.3f} ms | FTS5 prefix + BM25 {fts_ms:7.3f} ms "
+              f"({matches} matches for '{query}*')")
+        conn.close()
+
+
+def import_profile(statement):
+    """
+    Run `statement` in a fresh interpreter under -X importtime. Returns
+    (wall-clock ms, {module: (self us, cumulative us, depth)}).
+    """
+    env = dict(os.environ, GEMINI_API_KEY=os.environ.get('GEMINI_API_KEY') or 'benchmark-key')
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            capture_output=True, text=True, env=env)
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return wall_ms, modules
+
+
+def bench_import_time():
+    """Cold-start import profile of the app (what every Vercel cold start pays)"""
+    print_section("🧊 COLD-START IMPORT TIME")
+    for label, statement in (('app', 'import app'), ('social_auth', 'import social_auth')):
+        wall_ms = min(import_profile(statement)[0] for _ in range(3))
+        _, modules = import_profile(statement)
+        top_level = sorted(((cumulative, name) for name, (_, cumulative, depth) in modules.items()
+                            if depth == 1), reverse=True)
+        print(f"   import {label}: {wall_ms:7.1f} ms wall clock (best of 3), "
+              f"{len(modules)} modules")
+        for cumulative, name in top_level[:8]:
+            print(f"      {cumulative / 1000:7.1f} ms  {name}")
+        loaded = [name for name in LAZY_MODULES if name in modules]
+        print(f"      lazy modules loaded at import: {', '.join(loaded) if loaded else 'none'}")
+
+    # What the first AI call adds on top, for reference
+    wall_ms, _ = import_profile('import google.generativeai')
+    print(f"   google.generativeai on first AI call: {wall_ms:7.1f} ms (fresh interpreter)")
+
+
+BENCHMARKS = {
+    'scoring': bench_scoring,
+    'candidates': bench_candidates,
+    'tfidf': bench_tfidf,
+    'embeddings': bench_embeddings,
+    'learning_path': bench_learning_path,
+    'search': bench_search,
+    'import_time': bench_import_time,
+}
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        BENCHMARKS[name]()
@@ -0,0 +1,267 @@
+"""
+Bulk User Import
+Streams student rows from CSV or NDJSON, validates them and inserts them in
+chunked executemany transactions, reporting duplicate emails and invalid
+rows. Memory stays bounded by the chunk size, whatever the file size.
+
+Usage: python bulk_import.py students.csv [--format ndjson] [--chunk-size 1000]
+"""
+
+import io
+import os
+import csv
+import sys
+import json
+import sqlite3
+import argparse
+
+# Import configuration
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', '1000'))
+
+# Only the first problems are listed individually; the rest are just counted
+MAX_REPORTED_ERRORS = 1000
+
+# SQLite's default limit on bound parameters is 999
+SQL_IN_CHUNK = 500
+
+def iter_csv_rows(stream):
+    """Yield dict rows from a CSV text stream with a header line"""
+    for row in csv.DictReader(stream):
+        yield row
+
+
+def iter_ndjson_rows(stream):
+    """Yield dict rows from an NDJSON text stream; bad lines become None"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else None
+
+
+def _parse_list(value):
+    """Accept a JSON array, a list, or a ';'-separated string"""
+    if value is None or value == '':
+        return []
+    if isinstance(value, list):
+        items = value
+    elif isinstance(value, str) and value.strip().startswith('['):
+        items = json.loads(value)
+        if not isinstance(items, list):
+            raise ValueError('expected a list')
+    elif isinstance(value, str):
+        items = value.split(';')
+    else:
+        raise ValueError('expected a list')
+    return [str(item).strip() for item in items if str(item).strip()]
+
+
+def validate_row(row):
+    """Return (record, None) for a usable row, or (None, error message)"""
+    if not isinstance(row, dict):
+        return None, 'Row is not a JSON object'
+
+    name = str(row.get('name') or '').strip()
+    email = str(row.get('email') or '').strip()
+    if not name:
+        return None, 'name is required'
+    if '@' not in email or email.startswith('@') or email.endswith('@'):
+        return None, 'email is invalid'
+
+    age = row.get('age')
+    if age in (None, ''):
+        age = None
+    else:
+        try:
+            age = int(age)
+        except (TypeError, ValueError):
+            return None, 'age must be an integer'
+        if not 0 < age < 120:
+            return None, 'age is out of range'
+
+    try:
+        interests = _parse_list(row.get('interests'))
+        skills = _parse_list(row.get('current_skills'))
+    except ValueError:
+        return None, 'interests and current_skills must be lists'
+
+    education_level = str(row.get('education_level') or '').strip() or None
+    return (name, email, age, education_level, interests, skills), None
+
+
+class ImportReport:
+    """Counts and (capped) per-row details of an import"""
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.invalid = 0
+        self.conflicts = 0
+        self.errors = []
+
+    def problem(self, line, kind, message, email=None):
+        if kind == 'conflict':
+            self.conflicts += 1
+        else:
+            self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            error = {'row': line, 'type': kind, 'message': message}
+            if email:
+                error['email'] = email
+            self.errors.append(error)
+
+    def to_dict(self):
+        return {
+            'success': True,
+            'rows': self.rows,
+            'imported': self.imported,
+            'invalid': self.invalid,
+            'conflicts': self.conflicts,
+            'errors': self.errors,
+            'errors_truncated': self.invalid + self.conflicts > len(self.errors)
+        }
+
+
+def _existing_emails(conn, emails):
+    existing = set()
+    for start in range(0, len(emails), SQL_IN_CHUNK):
+        chunk = emails[start:start + SQL_IN_CHUNK]
+        placeholders = ', '.join('?' * len(chunk))
+        existing.update(row[0] for row in conn.execute(
+            f'SELECT email FROM users WHERE email IN ({placeholders})', chunk))
+    return existing
+
+
+def _insert_chunk(conn, chunk, report):
+    """Insert one chunk of (line, record) pairs in a single transaction"""
+    existing = _existing_emails(conn, [record[1] for _, record in chunk])
+
+    seen = set()
+    accepted = []
+    for line, record in chunk:
+        email = record[1]
+        if email in existing or email in seen:
+            report.problem(line, 'conflict', 'Email already exists', email)
+            continue
+        seen.add(email)
+        accepted.append((line, record))
+
+    if not accepted:
+        return
+
+    cursor = conn.cursor()
+    try:
+        cursor.executemany('''
+            INSERT INTO users (name, email, age, education_level, interests, current_skills)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(name, email, age, education, json.dumps(interests), json.dumps(skills))
+              for _, (name, email, age, education, interests, skills) in accepted])
+    except sqlite3.IntegrityError:
+        # Someone registered one of these emails mid-import; redo the chunk row by row
+        conn.rollback()
+        inserted = []
+        for line, record in accepted:
+            name, email, age, education, interests, skills = record
+            try:
+                cursor.execute('''
+                    INSERT INTO users (name, email, age, education_level, interests, current_skills)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (name, email, age, education, json.dumps(interests), json.dumps(skills)))
+                inserted.append((line, record))
+            except sqlite3.IntegrityError:
+                report.problem(line, 'conflict', 'Email already exists', email)
+        accepted = inserted
+
+    # Triggers on users mirror skills and interests into the association tables
+    conn.commit()
+    report.imported += len(accepted)
+
+
+def import_users(conn, rows, chunk_size=None, canonicalize=None):
+    """
+    Validate and insert rows (an iterable of dicts, or None for unreadable
+    lines), committing every `chunk_size` valid rows. `canonicalize(skills)`,
+    if given, maps each row's skills onto catalog names first. Returns an
+    ImportReport.
+    """
+    chunk_size = chunk_size or IMPORT_CHUNK_SIZE
+    report = ImportReport()
+    chunk = []
+
+    # Rows are numbered from 1, not counting a CSV header
+    for line, row in enumerate(rows, start=1):
+        report.rows += 1
+        record, error = validate_row(row)
+        if error:
+            report.problem(line, 'invalid', error)
+            continue
+        if canonicalize:
+            record = record[:5] + (canonicalize(record[5]),)
+        chunk.append((line, record))
+        if len(chunk) >= chunk_size:
+            _insert_chunk(conn, chunk, report)
+            chunk = []
+
+    if chunk:
+        _insert_chunk(conn, chunk, report)
+    return report
+
+
+def iter_rows(stream, fmt):
+    """Row iterator for a text stream in 'csv' or 'ndjson' format"""
+    if fmt == 'csv':
+        return iter_csv_rows(stream)
+    if fmt == 'ndjson':
+        return iter_ndjson_rows(stream)
+    raise ValueError("format must be 'csv' or 'ndjson'")
+
+
+def text_stream(binary_stream):
+    """Wrap an uploaded byte stream for line-by-line text reading"""
+    # Werkzeug spools multipart files in a SpooledTemporaryFile, which before
+    # Python 3.11 lacks readable() and can't be wrapped: use the file it spools to
+    binary_stream = getattr(binary_stream, '_file', binary_stream)
+    return io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+
+
+def main(argv=None):
+    from db import ConnectionPool, database_path
+    from database.migrations import migrate
+    from skill_index import get_skill_index
+
+    parser = argparse.ArgumentParser(description='Bulk import students from CSV or NDJSON')
+    parser.add_argument('path', help='CSV or NDJSON file ("-" for stdin)')
+    parser.add_argument('--format', choices=('csv', 'ndjson'),
+                        help='input format (default: from the file extension)')
+    parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE,
+                        help='rows per transaction')
+    parser.add_argument('--db', default=None, help='SQLite database path')
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('ndjson' if args.path.endswith(('.ndjson', '.jsonl')) else 'csv')
+    conn = ConnectionPool(args.db or database_path(), max_idle=0, setup=migrate).acquire()
+    try:
+        canonicalize = get_skill_index(conn).canonicalize_all
+        if args.path == '-':
+            report = import_users(conn, iter_rows(text_stream(sys.stdin.buffer), fmt), args.chunk_size,
+                                  canonicalize)
+        else:
+            with open(args.path, encoding='utf-8-sig', newline='') as stream:
+                report = import_users(conn, iter_rows(stream, fmt), args.chunk_size, canonicalize)
+    finally:
+        conn.close()
+
+    summary = report.to_dict()
+    print(f"Rows: {summary['rows']} | imported: {summary['imported']} | "
+          f"conflicts: {summary['conflicts']} | invalid: {summary['invalid']}")
+    for error in summary['errors'][:20]:
+        print(f"  row {error['row']}: {error['type']} - {error['message']} {error.get('email', '')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Career/Skill Catalog
+Per-table version counters bumped by triggers on every write, so in-memory
+indexes and response caches know when to rebuild; plus the paginated,
+projected catalog queries behind /api/careers and /api/skills
+"""
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+def catalog_version(conn, table='career_paths'):
+    """Current version counter of a catalog table (see database/init_db.py CATALOG_TABLES)"""
+    row = conn.execute('SELECT version FROM catalog_version WHERE table_name = ?', (table,)).fetchone()
+    return row[0] if row else 0
+
+
+# Validated catalog request: doubles as the response cache key
+CatalogQuery = namedtuple('CatalogQuery', ['paginated', 'after_id', 'limit', 'fields', 'filters'])
+
+_columns = {}
+
+
+def table_columns(conn, table):
+    """Column names of a catalog table (the two schema scripts disagree, so ask SQLite)"""
+    if table not in _columns:
+        _columns[table] = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+    return _columns[table]
+
+
+def run_catalog_query(conn, table, query, json_fields=()):
+    """
+    Run a CatalogQuery. Column names have been checked against table_columns,
+    so they are safe to interpolate. Returns a list, or a page dict when the
+    query is paginated.
+    """
+    select = ', '.join(query.fields) if query.fields else '*'
+    where, params = ['id > ?'], [query.after_id]
+    for column, value in query.filters:
+        where.append(f'{column} = ?')
+        params.append(value)
+
+    sql = f"SELECT {select} FROM {table} WHERE {' AND '.join(where)} ORDER BY id"
+    if query.paginated:
+        # One extra row tells us whether there is a next page
+        sql += ' LIMIT ?'
+        params.append(query.limit + 1)
+
+    rows = []
+    for row in conn.execute(sql, params).fetchall():
+        row_dict = dict(row)
+        for field in json_fields:
+            if row_dict.get(field) is not None:
+                row_dict[field] = json.loads(row_dict[field])
+        rows.append(row_dict)
+
+    if not query.paginated:
+        return rows
+
+    has_more = len(rows) > query.limit
+    rows = rows[:query.limit]
+    return {
+        'items': rows,
+        'next_after_id': rows[-1]['id'] if has_more else None
+    }
+
+
+class CatalogResponseCache:
+    """
+    Read-through cache of serialized catalog responses. Each entry remembers
+    the version of the table it was built from and is rebuilt once a write
+    has bumped that version.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, conn, table, key, build):
+        """
+        Return (body, etag) for `key`, calling build() for the response data
+        when nothing is cached for the table's current version.
+        """
+        version = catalog_version(conn, table)
+        with self._lock:
+            entry = self._entries.get((table, key))
+            if entry and entry[0] == version:
+                self._entries.move_to_end((table, key))
+                self.hits += 1
+                return entry[1], entry[2]
+            self.misses += 1
+
+        body = (json.dumps(build(), separators=(',', ':'), sort_keys=True) + '\n').encode('utf-8')
+        etag = hashlib.sha256(body).hexdigest()[:32]
+
+        with self._lock:
+            self._entries[(table, key)] = (version, body, etag)
+            self._entries.move_to_end((table, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body, etag
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses
+            }
@@ -0,0 +1,143 @@
+"""
+Catalog Snapshot
+Build step that compiles the career/skill catalog into a standalone SQLite
+file shipped with the function. The app opens it read-only with
+immutable=1 and memory-maps it, so catalog reads need no writable copy in
+/tmp and no seeding on cold start.
+
+    python catalog_snapshot.py [--source DB | --seed] [--out PATH]
+"""
+
+import os
+import sys
+import time
+import hashlib
+import sqlite3
+import argparse
+
+from db import SnapshotPool, database_path
+from database.migrations import migrate
+
+# Where the app looks for the snapshot; missing file = read the catalog from the main database
+CATALOG_SNAPSHOT = os.getenv('CATALOG_SNAPSHOT', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'database', 'catalog_snapshot.db'))
+
+# Copied in dependency order
+SNAPSHOT_TABLES = ('career_paths', 'skills', 'career_skills', 'skill_resources', 'skill_aliases')
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+
+
+def copy_catalog(src, dst):
+    """Copy the catalog tables from src into dst; returns {table: rows} and a content digest"""
+    digest = hashlib.sha256()
+    counts = {}
+    for table in SNAPSHOT_TABLES:
+        dst_columns = set(_columns(dst, table))
+        columns = [column for column in _columns(src, table) if column in dst_columns]
+        column_list = ', '.join(columns)
+        # Drop rows the migrations seeded (e.g. default aliases); the source is authoritative
+        dst.execute(f'DELETE FROM {table}')
+        rows = src.execute(f'SELECT {column_list} FROM {table} ORDER BY rowid').fetchall()
+        dst.executemany(f'INSERT INTO {table} ({column_list}) VALUES ({", ".join("?" * len(columns))})', rows)
+        for row in rows:
+            digest.update(repr(tuple(row)).encode('utf-8'))
+        counts[table] = len(rows)
+    return counts, digest.hexdigest()
+
+
+def build_snapshot(source_path, out_path):
+    """
+    Write a snapshot of source_path's catalog to out_path. The file is built
+    next to its destination and renamed into place, so a reader never sees a
+    half-written snapshot. Returns the snapshot_info values.
+    """
+    tmp_path = out_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    src = sqlite3.connect(source_path)
+    dst = sqlite3.connect(tmp_path)
+    try:
+        # Bring an older source up to the current schema before reading it
+        migrate(src)
+
+        # Same schema and indexes as the main database, in a single self-contained file
+        dst.execute('PRAGMA journal_mode = DELETE')
+        migrate(dst)
+
+        counts, digest = copy_catalog(src, dst)
+        info = {
+            'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'source': os.path.abspath(source_path),
+            'content_sha256': digest,
+        }
+        info.update({f'{table}_rows': str(count) for table, count in counts.items()})
+        dst.execute('CREATE TABLE snapshot_info (key TEXT PRIMARY KEY, value TEXT)')
+        dst.executemany('INSERT INTO snapshot_info (key, value) VALUES (?, ?)', info.items())
+        dst.commit()
+
+        dst.execute('ANALYZE')
+        dst.execute('VACUUM')
+    finally:
+        src.close()
+        dst.close()
+
+    os.replace(tmp_path, out_path)
+    return info
+
+
+def open_snapshot_pool(path=None):
+    """Read-only pool over the catalog snapshot, or None if no snapshot has been built"""
+    path = path or CATALOG_SNAPSHOT
+    if not os.path.exists(path):
+        return None
+    return SnapshotPool(path)
+
+
+def snapshot_info(conn):
+    """When the snapshot was built and the file name it was built from (not the build machine's path)"""
+    info = dict(conn.execute("SELECT key, value FROM snapshot_info WHERE key IN ('built_at', 'source')").fetchall())
+    if info.get('source'):
+        info['source'] = os.path.basename(info['source'])
+    return info
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the read-only catalog snapshot')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--source', help='database to snapshot (default: the app database)')
+    source.add_argument('--seed', action='store_true', help='snapshot the built-in sample catalog')
+    parser.add_argument('--out', default=CATALOG_SNAPSHOT, help='snapshot path')
+    args = parser.parse_args(argv)
+
+    if args.seed:
+        from database.init_db import seed_sample_data
+        source_path = args.out + '.seed'
+        if os.path.exists(source_path):
+            os.remove(source_path)
+        seed_conn = sqlite3.connect(source_path)
+        migrate(seed_conn)
+        seed_conn.close()
+        seed_sample_data(source_path)
+    else:
+        source_path = args.source or database_path()
+        if not os.path.exists(source_path):
+            print(f"Error: {source_path} does not exist (use --seed for the sample catalog)")
+            return 1
+
+    try:
+        info = build_snapshot(source_path, args.out)
+    finally:
+        if args.seed:
+            os.remove(source_path)
+
+    print(f"Wrote {args.out}: {info['career_paths_rows']} careers, {info['skills_rows']} skills "
+          f"({os.path.getsize(args.out) // 1024} KB, sha256 {info['content_sha256'][:12]})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,86 +2,301 @@ import sqlite3
 import json
 from datetime import datetime
 
-def init_database():
-    """Initialize the database with required tables"""
-    conn = sqlite3.connect('database/career_advisor.db')
-    cursor = conn.cursor()
-    
-    # Users table
+def init_database(db_path='database/career_advisor.db'):
+    """Create (or upgrade) the database schema by running every pending migration"""
+    from database.migrations import migrate
+    conn = sqlite3.connect(db_path)
+    migrate(conn)
+    conn.close()
+    print("Database initialized successfully!")
+
+def create_catalog_indexes(cursor):
+    """Indexes behind the catalog endpoint filters; id is appended for keyset pagination"""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_career_paths_industry ON career_paths (industry, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_career_paths_growth ON career_paths (growth_potential, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_skills_category ON skills (category, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_skills_difficulty ON skills (difficulty_level, id)')
+
+# Full-text indexes over catalog columns, kept in step with their tables by triggers
+SEARCH_INDEXES = {
+    'career_paths_fts': ('career_paths', ('title', 'description', 'industry', 'education_requirements')),
+    'skills_fts': ('skills', ('name', 'category')),
+}
+
+def create_search_tables(cursor):
+    """External-content FTS5 tables over the catalog, their sync triggers, and a full rebuild"""
+    for fts, (table, columns) in SEARCH_INDEXES.items():
+        column_list = ', '.join(columns)
+        new_values = ', '.join(f'new.{column}' for column in columns)
+        old_values = ', '.join(f'old.{column}' for column in columns)
+        # prefix='2 3' keeps short prefix queries (autocomplete-style) off a full term scan
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {column_list},
+                content='{table}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts} (rowid, {column_list}) VALUES (new.id, {new_values});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+                INSERT INTO {fts} (rowid, {column_list}) VALUES (new.id, {new_values});
+            END
+        ''')
+        cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+# Common abbreviations and variants students type, mapped to catalog skill names
+DEFAULT_SKILL_ALIASES = [
+    ('ML', 'Machine Learning'),
+    ('Python3', 'Python'),
+    ('Python 3', 'Python'),
+    ('Py', 'Python'),
+    ('DSA', 'Data Structures'),
+    ('Algo', 'Algorithms'),
+    ('Stats', 'Statistics'),
+    ('Data Viz', 'Data Visualization'),
+    ('Dataviz', 'Data Visualization'),
+    ('Git/GitHub', 'Git'),
+    ('GitHub', 'Git'),
+    ('PM', 'Project Management'),
+    ('UI', 'UI Design'),
+    ('UX Research', 'User Research'),
+    ('SMM', 'Social Media Marketing'),
+    ('Google AdWords', 'Google Ads'),
+    ('AdWords', 'Google Ads'),
+    ('Tally', 'Tally/SAP'),
+    ('SAP', 'Tally/SAP'),
+    ('STAAD', 'STAAD Pro'),
+    ('STAAD.Pro', 'STAAD Pro'),
+    ('XD', 'Adobe XD'),
+    ('Communication', 'Communication Skills'),
+    ('Copywriting', 'Content Writing'),
+]
+
+def create_skill_aliases(cursor):
+    """Alias -> canonical skill name table, seeded with DEFAULT_SKILL_ALIASES"""
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            age INTEGER,
-            education_level TEXT,
-            interests TEXT,
-            current_skills TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        CREATE TABLE IF NOT EXISTS skill_aliases (
+            alias TEXT PRIMARY KEY COLLATE NOCASE,
+            skill TEXT NOT NULL
         )
     ''')
-    
-    # Career paths table
+    cursor.executemany('INSERT OR IGNORE INTO skill_aliases (alias, skill) VALUES (?, ?)', DEFAULT_SKILL_ALIASES)
+
+def create_normalized_tables(cursor):
+    """Create the association tables that mirror the JSON skill/interest columns"""
+    # Skills required by each career (mirrors career_paths.required_skills)
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS career_paths (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            description TEXT,
-            industry TEXT,
-            average_salary_range TEXT,
-            growth_potential TEXT,
-            required_skills TEXT,
-            education_requirements TEXT,
-            job_outlook TEXT
+        CREATE TABLE IF NOT EXISTS career_skills (
+            career_id INTEGER NOT NULL,
+            skill TEXT NOT NULL,
+            position INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (career_id, skill),
+            FOREIGN KEY (career_id) REFERENCES career_paths (id)
         )
     ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_career_skills_skill ON career_skills (skill, career_id)')
     
-    # Skills table
+    # Skills each user already has (mirrors users.current_skills)
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS skills (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL,
-            category TEXT,
-            difficulty_level TEXT,
-            learning_resources TEXT
+        CREATE TABLE IF NOT EXISTS user_skills (
+            user_id INTEGER NOT NULL,
+            skill TEXT NOT NULL,
+            position INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, skill),
+            FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_skills_skill ON user_skills (skill, user_id)')
     
-    # Assessment results table
+    # User interests (mirrors users.interests)
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS assessments (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            assessment_type TEXT,
-            results TEXT,
-            recommendations TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        CREATE TABLE IF NOT EXISTS user_interests (
+            user_id INTEGER NOT NULL,
+            interest TEXT NOT NULL,
+            position INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, interest),
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_interests_interest ON user_interests (interest, user_id)')
     
-    # User career recommendations table
+    # Learning resources per skill (mirrors skills.learning_resources)
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS recommendations (
+        CREATE TABLE IF NOT EXISTS skill_resources (
+            skill_id INTEGER NOT NULL,
+            resource TEXT NOT NULL,
+            position INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (skill_id, resource),
+            FOREIGN KEY (skill_id) REFERENCES skills (id)
+        )
+    ''')
+
+# Catalog tables whose writes bump a catalog_version counter (read by catalog.catalog_version)
+CATALOG_TABLES = ('career_paths', 'skills', 'skill_aliases')
+
+def create_catalog_versioning(cursor):
+    """Per-table version counters, bumped by triggers on every write to a catalog table"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    for table in CATALOG_TABLES:
+        cursor.execute('INSERT OR IGNORE INTO catalog_version (table_name, version) VALUES (?, 0)', (table,))
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE catalog_version SET version = version + 1 WHERE table_name = '{table}';
+                END
+            ''')
+
+def create_ai_analysis_cache(cursor):
+    """Persisted AI career analyses (ai_cache.AnalysisCache), dropped when their career changes"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ai_analysis_cache (
+            cache_key TEXT PRIMARY KEY,
+            career_id INTEGER NOT NULL,
+            payload TEXT NOT NULL,
+            stored_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_ai_analysis_cache_career ON ai_analysis_cache (career_id)')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_career_paths_invalidate_ai_cache
+        AFTER UPDATE ON career_paths
+        BEGIN
+            DELETE FROM ai_analysis_cache WHERE career_id = old.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_career_paths_delete_ai_cache
+        AFTER DELETE ON career_paths
+        BEGIN
+            DELETE FROM ai_analysis_cache WHERE career_id = old.id;
+        END
+    ''')
+
+def create_batch_runs(cursor):
+    """Checkpoints of batch assessment runs: the last user id whose results are committed"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS batch_assessment_runs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            career_path_id INTEGER,
-            match_score REAL,
-            reasoning TEXT,
-            skill_gaps TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id),
-            FOREIGN KEY (career_path_id) REFERENCES career_paths (id)
+            mode TEXT NOT NULL,
+            after_id INTEGER NOT NULL DEFAULT 0,
+            until_id INTEGER,
+            last_user_id INTEGER NOT NULL DEFAULT 0,
+            processed INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'running',
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
+
+# Association tables mirroring a JSON list column of their owner row:
+# link table -> (owner table, JSON column, owner id column, item column, trigger name prefix)
+LINK_TABLES = {
+    'career_skills': ('career_paths', 'required_skills', 'career_id', 'skill', 'career_paths_skills'),
+    'skill_resources': ('skills', 'learning_resources', 'skill_id', 'resource', 'skills_resources'),
+    'user_skills': ('users', 'current_skills', 'user_id', 'skill', 'users_skills'),
+    'user_interests': ('users', 'interests', 'user_id', 'interest', 'users_interests'),
+}
+
+# Link rows decoded from a JSON list column: of the trigger's new row, or of
+# every owner row when {source} is "<owner table>, "
+_LINK_ROWS = """
+    SELECT {row}.id, value, key FROM {source}json_each(
+        CASE WHEN json_valid({row}.{column}) AND json_type({row}.{column}) = 'array'
+             THEN {row}.{column} ELSE '[]' END)
+    WHERE type = 'text' AND trim(value) != ''
+"""
+
+def create_link_triggers(cursor, link):
+    """Keep a LINK_TABLES association table in step with its JSON column on every insert, update and delete"""
+    owner, column, owner_id, item, prefix = LINK_TABLES[link]
+    rows = _LINK_ROWS.format(row='new', source='', column=column)
+    insert = f'INSERT OR IGNORE INTO {link} ({owner_id}, {item}, position) {rows}'
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {prefix}_insert AFTER INSERT ON {owner} BEGIN
+            {insert};
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {prefix}_update AFTER UPDATE OF id, {column} ON {owner} BEGIN
+            DELETE FROM {link} WHERE {owner_id} = old.id;
+            {insert};
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {prefix}_delete AFTER DELETE ON {owner} BEGIN
+            DELETE FROM {link} WHERE {owner_id} = old.id;
+        END
+    ''')
+
+def resync_links(cursor, link):
+    """Rebuild a LINK_TABLES association table from its JSON column, for rows written before the triggers"""
+    owner, column, owner_id, item, _ = LINK_TABLES[link]
+    cursor.execute(f'DELETE FROM {link}')
+    cursor.execute(f'INSERT OR IGNORE INTO {link} ({owner_id}, {item}, position) ' +
+                   _LINK_ROWS.format(row=owner, source=f'{owner}, ', column=column))
+
+def _json_list(value):
+    try:
+        items = json.loads(value) if value else []
+    except ValueError:
+        return []
+    return items if isinstance(items, list) else []
+
+def link_rows(owner_id, items):
+    """(owner_id, item, position) rows for a decoded JSON list, skipping blanks"""
+    return [(owner_id, item, position) for position, item in enumerate(items)
+            if isinstance(item, str) and item.strip()]
+
+def backfill_normalized_tables(conn):
+    """Populate the association tables from the existing JSON columns; the caller commits"""
+    cursor = conn.cursor()
     
-    conn.commit()
-    conn.close()
-    print("Database initialized successfully!")
+    career_rows = []
+    for career_id, required_skills in cursor.execute('SELECT id, required_skills FROM career_paths').fetchall():
+        career_rows.extend(link_rows(career_id, _json_list(required_skills)))
+    cursor.executemany('''
+        INSERT OR IGNORE INTO career_skills (career_id, skill, position) VALUES (?, ?, ?)
+    ''', career_rows)
+    
+    skill_rows, interest_rows = [], []
+    for user_id, skills, interests in cursor.execute('SELECT id, current_skills, interests FROM users').fetchall():
+        skill_rows.extend(link_rows(user_id, _json_list(skills)))
+        interest_rows.extend(link_rows(user_id, _json_list(interests)))
+    cursor.executemany('''
+        INSERT OR IGNORE INTO user_skills (user_id, skill, position) VALUES (?, ?, ?)
+    ''', skill_rows)
+    cursor.executemany('''
+        INSERT OR IGNORE INTO user_interests (user_id, interest, position) VALUES (?, ?, ?)
+    ''', interest_rows)
+    
+    resource_rows = []
+    for skill_id, resources in cursor.execute('SELECT id, learning_resources FROM skills').fetchall():
+        resource_rows.extend(link_rows(skill_id, _json_list(resources)))
+    cursor.executemany('''
+        INSERT OR IGNORE INTO skill_resources (skill_id, resource, position) VALUES (?, ?, ?)
+    ''', resource_rows)
 
-def seed_sample_data():
+def seed_sample_data(db_path='database/career_advisor.db'):
     """Add sample career paths and skills relevant to Indian students"""
-    conn = sqlite3.connect('database/career_advisor.db')
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     # Sample career paths popular in India
@@ -112,7 +327,8 @@ def seed_sample_data():
             'industry': 'Marketing & Advertising',
             'average_salary_range': '₹4-12 LPA',
             'growth_potential': 'High',
-            'required_skills': json.dumps(['SEO', 'Social Media Marketing', 'Content Marketing', 'Analytics', 'Google Ads']),
+            'required_skills': json.dumps(['SEO', 'Social Media Marketing', 'Content Marketing', 'Analytics',
+                                           'Google Ads']),
             'education_requirements': 'Any Bachelor\'s degree with relevant certifications',
             'job_outlook': 'Very Good - Essential for all businesses'
         },
@@ -122,7 +338,8 @@ def seed_sample_data():
             'industry': 'Product & Business',
             'average_salary_range': '₹8-25 LPA',
             'growth_potential': 'Very High',
-            'required_skills': json.dumps(['Product Strategy', 'User Research', 'Data Analysis', 'Leadership', 'Agile']),
+            'required_skills': json.dumps(['Product Strategy', 'User Research', 'Data Analysis', 'Leadership',
+                                           'Agile']),
             'education_requirements': 'B.Tech/MBA preferred',
             'job_outlook': 'Excellent - High demand in tech companies'
         },
@@ -152,7 +369,8 @@ def seed_sample_data():
             'industry': 'Construction & Infrastructure',
             'average_salary_range': '₹3-10 LPA',
             'growth_potential': 'Moderate',
-            'required_skills': json.dumps(['AutoCAD', 'Structural Analysis', 'Project Management', 'STAAD Pro', 'Site Management']),
+            'required_skills': json.dumps(['AutoCAD', 'Structural Analysis', 'Project Management', 'STAAD Pro',
+                                           'Site Management']),
             'education_requirements': 'B.Tech/BE in Civil Engineering',
             'job_outlook': 'Good - Infrastructure development in India'
         },
@@ -205,9 +423,17 @@ def seed_sample_data():
         ''', tuple(skill.values()))
     
     conn.commit()
+    
+    # Keep the association tables in step with the JSON columns just written
+    backfill_normalized_tables(conn)
+    conn.commit()
     conn.close()
     print("Sample data added successfully!")
 
 if __name__ == "__main__":
+    # Run as a script from the project root: make the database package importable
+    import os
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     init_database()
     seed_sample_data()
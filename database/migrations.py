@@ -0,0 +1,228 @@
+"""
+Schema Migrations
+Every schema change, in order, recorded in a schema_version table. Run at
+deploy time with `python -m database.migrations [db path]`; the app also
+runs it on the first connection each process opens, where a database that is
+already current costs a single query.
+
+Each migration is idempotent, so databases created by older versions of
+app.py or init_db.py upgrade cleanly whatever state they are in.
+"""
+
+import sys
+import sqlite3
+
+from database.init_db import (
+    create_normalized_tables, create_catalog_indexes, create_search_tables, create_skill_aliases,
+    create_link_triggers, create_catalog_versioning, create_ai_analysis_cache, create_batch_runs,
+    backfill_normalized_tables, resync_links
+)
+
+
+def _base_tables(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            age INTEGER,
+            education_level TEXT,
+            interests TEXT,
+            current_skills TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS career_paths (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            industry TEXT,
+            average_salary_range TEXT,
+            growth_potential TEXT,
+            required_skills TEXT,
+            education_requirements TEXT,
+            job_outlook TEXT
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS skills (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            category TEXT,
+            difficulty_level TEXT,
+            learning_resources TEXT
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS assessments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            assessment_type TEXT,
+            results TEXT,
+            recommendations TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS recommendations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            career_path_id INTEGER,
+            match_score REAL,
+            reasoning TEXT,
+            skill_gaps TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            FOREIGN KEY (career_path_id) REFERENCES career_paths (id)
+        )
+    ''')
+
+
+def _career_path_columns(conn):
+    # Databases created by app.py have average_salary_min/max instead; those stay, unused
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(career_paths)')}
+    for column in ('average_salary_range', 'job_outlook'):
+        if column not in columns:
+            conn.execute(f'ALTER TABLE career_paths ADD COLUMN {column} TEXT')
+
+
+def _unique_skill_names(conn):
+    for index in conn.execute('PRAGMA index_list(skills)').fetchall():
+        # (seq, name, unique, origin, partial)
+        if index[2] and [col[2] for col in conn.execute(f"PRAGMA index_info('{index[1]}')")] == ['name']:
+            return
+    try:
+        conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_skills_name ON skills (name)')
+    except sqlite3.IntegrityError:
+        print("Warning: duplicate skill names found; skills.name is not indexed as UNIQUE.")
+
+
+def _normalized_tables(conn):
+    create_normalized_tables(conn.cursor())
+    backfill_normalized_tables(conn)
+
+
+def _catalog_indexes(conn):
+    create_catalog_indexes(conn.cursor())
+
+
+def _search_tables(conn):
+    try:
+        create_search_tables(conn.cursor())
+    except sqlite3.OperationalError as e:
+        # Some SQLite builds ship without FTS5; /api/search reports itself unavailable there
+        print(f"Warning: full-text search tables not created: {e}")
+
+
+def _skill_aliases(conn):
+    create_skill_aliases(conn.cursor())
+
+
+def _career_skill_triggers(conn):
+    cursor = conn.cursor()
+    create_link_triggers(cursor, 'career_skills')
+    # Careers added or edited since the backfill in migration 4 were never mirrored
+    resync_links(cursor, 'career_skills')
+
+
+def _link_triggers(conn):
+    cursor = conn.cursor()
+    for link in ('skill_resources', 'user_skills', 'user_interests'):
+        create_link_triggers(cursor, link)
+        # Skills edited since migration 4 were never mirrored into skill_resources
+        resync_links(cursor, link)
+
+
+def _catalog_versioning(conn):
+    create_catalog_versioning(conn.cursor())
+
+
+def _ai_analysis_cache(conn):
+    create_ai_analysis_cache(conn.cursor())
+
+
+def _batch_runs(conn):
+    create_batch_runs(conn.cursor())
+
+
+# (version, description, apply(conn)); append new migrations, never edit applied ones
+MIGRATIONS = [
+    (1, 'users, career_paths, skills, assessments and recommendations tables', _base_tables),
+    (2, 'career_paths salary range and job outlook columns', _career_path_columns),
+    (3, 'unique index on skills.name', _unique_skill_names),
+    (4, 'career_skills, user_skills, user_interests and skill_resources tables', _normalized_tables),
+    (5, 'catalog filter indexes', _catalog_indexes),
+    (6, 'career_paths and skills full-text search tables', _search_tables),
+    (7, 'skill_aliases table', _skill_aliases),
+    (8, 'triggers keeping career_skills in sync with career_paths.required_skills', _career_skill_triggers),
+    (9, 'catalog_version counters and their triggers', _catalog_versioning),
+    (10, 'ai_analysis_cache table', _ai_analysis_cache),
+    (11, 'batch_assessment_runs table', _batch_runs),
+    (12, 'triggers keeping skill_resources, user_skills and user_interests in sync', _link_triggers),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    """Highest applied migration, or 0 for a database that has never been migrated"""
+    try:
+        return conn.execute('SELECT MAX(version) FROM schema_version').fetchone()[0] or 0
+    except sqlite3.OperationalError:
+        return 0
+
+
+def migrate(conn):
+    """
+    Apply pending migrations in one transaction and return their versions.
+    BEGIN IMMEDIATE makes concurrent cold starts take turns; whoever comes
+    second finds the schema current and does nothing.
+    """
+    if schema_version(conn) >= LATEST_VERSION:
+        return []
+
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        current = schema_version(conn)
+        applied = []
+        for version, description, apply in MIGRATIONS:
+            if version > current:
+                apply(conn)
+                conn.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                             (version, description))
+                applied.append(version)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return applied
+
+
+if __name__ == "__main__":
+    from db import database_path
+
+    path = sys.argv[1] if len(sys.argv) > 1 else database_path()
+    conn = sqlite3.connect(path)
+    try:
+        applied = migrate(conn)
+    finally:
+        conn.close()
+    if applied:
+        print(f"Applied migrations {', '.join(map(str, applied))}; schema is at version {LATEST_VERSION}")
+    else:
+        print(f"Schema already at version {LATEST_VERSION}")
@@ -0,0 +1,176 @@
+"""
+Database Connection Pool
+Reuses SQLite connections across requests, configured for concurrent
+readers and writers (WAL, busy timeout, larger page cache and mmap)
+"""
+
+import os
+import sqlite3
+import threading
+from urllib.parse import quote
+
+# Pool configuration
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '8'))
+DB_BUSY_TIMEOUT_MS = int(os.getenv('DB_BUSY_TIMEOUT_MS', '5000'))
+DB_MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', str(256 * 1024 * 1024)))
+DB_CACHE_SIZE_KB = int(os.getenv('DB_CACHE_SIZE_KB', '16384'))
+
+
+def database_path():
+    """Path of the SQLite database (Vercel functions can only write to /tmp)"""
+    return '/tmp/career_advisor.db' if os.environ.get('VERCEL') else 'database/career_advisor.db'
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() hands it back to its pool"""
+
+    pool = None
+    checked_out = False
+    # Bumped on every checkout, so a stale handle can't release a later borrower's lease
+    lease = 0
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            super().close()
+
+    def discard(self):
+        """Really close the underlying connection"""
+        self.pool = None
+        super().close()
+
+
+class ConnectionPool:
+    """
+    Keeps up to `max_idle` configured connections around for reuse. Checkouts
+    never block: when the pool is empty a new connection is opened, and
+    connections returned to a full pool are closed. `setup(conn)`, e.g. the
+    schema migrations, runs once on the first connection the pool opens.
+    """
+
+    def __init__(self, path=None, max_idle=None, setup=None):
+        self.path = path or database_path()
+        self.max_idle = DB_POOL_SIZE if max_idle is None else max_idle
+        self.setup = setup
+        self._setup_done = setup is None
+        self._setup_lock = threading.Lock()
+        self._idle = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, factory=PooledConnection, check_same_thread=False)
+        self._configure(conn)
+        return conn
+
+    def _configure(self, conn):
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.execute(f'PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}')
+        conn.execute(f'PRAGMA mmap_size = {DB_MMAP_SIZE}')
+        conn.execute(f'PRAGMA cache_size = -{DB_CACHE_SIZE_KB}')
+
+    def _check_fork(self):
+        # Caller holds the lock. SQLite connections must not cross a fork.
+        if os.getpid() != self._pid:
+            self._idle = []
+            self._pid = os.getpid()
+            self.in_use = 0
+
+    def acquire(self):
+        """Check a connection out of the pool"""
+        with self._lock:
+            self._check_fork()
+            conn = self._idle.pop() if self._idle else None
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            if conn is not None:
+                self.reused += 1
+                conn.checked_out = True
+                conn.lease += 1
+                return conn
+
+        conn = self._connect()
+        if not self._setup_done:
+            with self._setup_lock:
+                if not self._setup_done:
+                    self.setup(conn)
+                    self._setup_done = True
+        conn.pool = self
+        conn.checked_out = True
+        conn.lease += 1
+        with self._lock:
+            self.created += 1
+        return conn
+
+    def release(self, conn, lease=None):
+        """
+        Return a connection, rolling back anything left uncommitted. Releasing
+        a connection that is already back in the pool, or whose `lease` has
+        since been handed to someone else, does nothing.
+        """
+        with self._lock:
+            if not conn.checked_out or (lease is not None and conn.lease != lease):
+                return
+            conn.checked_out = False
+
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.discard()
+            with self._lock:
+                self.in_use -= 1
+                self.discarded += 1
+            return
+
+        with self._lock:
+            self.in_use -= 1
+            if os.getpid() == self._pid and len(self._idle) < self.max_idle and conn not in self._idle:
+                self._idle.append(conn)
+                return
+            self.discarded += 1
+        conn.discard()
+
+    def close_all(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.discard()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'path': self.path,
+                'max_idle': self.max_idle,
+                'idle': len(self._idle),
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'created': self.created,
+                'reused': self.reused,
+                'discarded': self.discarded
+            }
+
+
+class SnapshotPool(ConnectionPool):
+    """
+    Pool over a prebuilt catalog file that never changes while the process
+    runs. immutable=1 lets SQLite skip locking and change detection, and the
+    file is memory-mapped, so opening it costs little more than an mmap.
+    """
+
+    def _connect(self):
+        uri = f'file:{quote(os.path.abspath(self.path))}?mode=ro&immutable=1'
+        conn = sqlite3.connect(uri, uri=True, factory=PooledConnection, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA mmap_size = {DB_MMAP_SIZE}')
+        conn.execute('PRAGMA query_only = 1')
+        return conn
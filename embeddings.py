@@ -0,0 +1,461 @@
+"""
+Embedding Index
+Local, CPU-only semantic matching: careers and skills are embedded with a
+hashing vectorizer (words and character trigrams, so no model files and no
+network), each skill enriched with its category, aliases and the careers
+requiring it, and each career with its required skills. The vectors are
+saved as one float32 matrix that is memory-mapped on load and searched by
+brute force (a single BLAS matrix-vector product when NumPy is installed)
+or, for large catalogs, through an IVF index that only scans the clusters
+nearest the query.
+
+    python embeddings.py [--db PATH] [--out PATH] [--dim 256] [--nlist N]
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import mmap
+import zlib
+import time
+import heapq
+import hashlib
+import argparse
+import threading
+from array import array
+from operator import mul
+
+from catalog import catalog_version
+from scoring import ASSESS_PREFILTER, ASSESS_MAX_CANDIDATES, SCORING_INTEREST_WEIGHT, career_text
+from skill_index import canonical_skill
+
+try:
+    import numpy as np
+except ImportError:  # optional: too large for the Vercel function, where pure Python is used
+    np = None
+
+# Saved index: <EMBEDDING_INDEX>.f32 (matrix) and <EMBEDDING_INDEX>.json (row ids, IVF lists)
+EMBEDDING_INDEX = os.getenv('EMBEDDING_INDEX',
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'embedding_index'))
+EMBEDDING_DIM = int(os.getenv('EMBEDDING_DIM', '256'))
+# Catalogs with at least this many careers get an IVF index (built with NumPy); smaller ones are scanned
+EMBEDDING_IVF_MIN = int(os.getenv('EMBEDDING_IVF_MIN', '2000'))
+EMBEDDING_NPROBE = int(os.getenv('EMBEDDING_NPROBE', '16'))
+# Cosine similarity above which a user skill counts as covering a required skill
+EMBEDDING_SKILL_MATCH = float(os.getenv('EMBEDDING_SKILL_MATCH', '0.6'))
+
+TRIGRAM_WEIGHT = 0.25
+# How much of a skill's vector comes from its category / the careers requiring it
+CATEGORY_WEIGHT = 0.5
+CONTEXT_WEIGHT = 0.5
+
+_WORD_PATTERN = re.compile(r'\w+')
+
+
+def _features(text):
+    """(feature, weight) pairs for a text: every word and the character trigrams of each word"""
+    for word in _WORD_PATTERN.findall(text.lower()):
+        yield 'w:' + word, 1.0
+        padded = f'<{word}>'
+        for i in range(len(padded) - 2):
+            yield 't:' + padded[i:i + 3], TRIGRAM_WEIGHT
+
+
+def embed_text(text, dim=None):
+    """Hashed feature vector of a text (not normalized); crc32 keeps it stable across processes"""
+    vector = [0.0] * (dim or EMBEDDING_DIM)
+    size = len(vector)
+    for feature, weight in _features(text):
+        hashed = zlib.crc32(feature.encode('utf-8'))
+        # The sign bit spreads collisions around zero instead of piling them up
+        vector[hashed % size] += weight if hashed & 0x80000000 else -weight
+    return vector
+
+
+def normalize(vector):
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else list(vector)
+
+
+def dot(a, b):
+    return sum(map(mul, a, b))
+
+
+def _add(total, vector, scale=1.0):
+    for i, x in enumerate(vector):
+        total[i] += x * scale
+
+
+def _mean(vectors, dim):
+    total = [0.0] * dim
+    for vector in vectors:
+        _add(total, vector, 1.0 / len(vectors))
+    return total
+
+
+def embed_catalog(careers, required_skills, skills=(), aliases=(), dim=None):
+    """
+    (career vectors, {canonical skill: (name, vector)}), all L2-normalized.
+    `skills` are (name, category) rows, `aliases` (alias, skill) rows. A
+    skill's vector mixes its own name and aliases with its category and the
+    careers requiring it, so skills used in the same kind of job end up
+    close together even when their names share nothing.
+    """
+    dim = dim or EMBEDDING_DIM
+    texts = [normalize(embed_text(career_text(career_dict), dim)) for career_dict in careers]
+
+    names, categories, alias_names, careers_by_skill = {}, {}, {}, {}
+    for name, category in skills:
+        if name and name.strip():
+            names.setdefault(canonical_skill(name), name)
+            categories[canonical_skill(name)] = category
+    for index, required in enumerate(required_skills):
+        for skill in required:
+            names.setdefault(canonical_skill(skill), skill)
+            careers_by_skill.setdefault(canonical_skill(skill), []).append(index)
+    for alias, skill in aliases:
+        alias_names.setdefault(canonical_skill(skill), []).append(alias)
+
+    skill_vectors = {}
+    for key, name in names.items():
+        vector = normalize(embed_text(' '.join([name] + alias_names.get(key, [])), dim))
+        if categories.get(key):
+            _add(vector, normalize(embed_text(categories[key], dim)), CATEGORY_WEIGHT)
+        if key in careers_by_skill:
+            _add(vector, normalize(_mean([texts[i] for i in careers_by_skill[key]], dim)), CONTEXT_WEIGHT)
+        skill_vectors[key] = (name, normalize(vector))
+
+    career_vectors = []
+    for text, required in zip(texts, required_skills):
+        vector = list(text)
+        keys = list(dict.fromkeys(canonical_skill(skill) for skill in required))
+        if keys:
+            _add(vector, normalize(_mean([skill_vectors[key][1] for key in keys], dim)))
+        career_vectors.append(normalize(vector))
+    return career_vectors, skill_vectors
+
+
+def _kmeans(matrix, nlist, iterations=10, seed=0):
+    """Spherical k-means over the rows of a NumPy matrix: (centroids, list of each row)"""
+    rng = np.random.default_rng(seed)
+    centroids = matrix[rng.choice(len(matrix), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = (matrix @ centroids.T).argmax(axis=1)
+        for c in range(nlist):
+            members = matrix[assignment == c]
+            if len(members):
+                centroid = members.sum(axis=0)
+                centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+    return centroids, (matrix @ centroids.T).argmax(axis=1)
+
+
+class EmbeddingIndex:
+    """
+    One float32 matrix, row-major: career vectors (grouped by IVF list when
+    there is one), then skill vectors, then the IVF centroids. `data` is a
+    flat float32 memoryview over an array or a memory-mapped file; with
+    NumPy it is also viewed as a matrix, without copying.
+    """
+
+    def __init__(self, data, meta):
+        self.meta = meta
+        self.dim = meta['dim']
+        self.career_ids = meta['career_ids']
+        self.row_by_id = {career_id: row for row, career_id in enumerate(self.career_ids)}
+        self.skill_names = meta['skills']
+        self._skill_rows = {canonical_skill(name): len(self.career_ids) + i for i, name in enumerate(self.skill_names)}
+        # [start, end) career rows of each IVF list; empty = scan every career
+        self.lists = meta['lists']
+        self._centroids = len(self.career_ids) + len(self.skill_names)
+        self._data = data
+        self._matrix = np.frombuffer(data, dtype=np.float32).reshape(-1, self.dim) if np is not None else None
+
+    def __len__(self):
+        return len(self.career_ids)
+
+    def row(self, i):
+        if self._matrix is not None:
+            return self._matrix[i].tolist()
+        return self._data[i * self.dim:(i + 1) * self.dim].tolist()
+
+    def _dots(self, start, end, query):
+        """Dot products of rows [start, end) with the query"""
+        if self._matrix is not None:
+            return (self._matrix[start:end] @ query).tolist()
+        data, dim = self._data, self.dim
+        return [sum(map(mul, data[i * dim:(i + 1) * dim], query)) for i in range(start, end)]
+
+    def skill_vector(self, skill):
+        """Catalog vector of a known skill; unknown skills are embedded from their name alone"""
+        row = self._skill_rows.get(canonical_skill(skill))
+        return self.row(row) if row is not None else normalize(embed_text(skill, self.dim))
+
+    def user_vector(self, user_skills, user_interests):
+        """Mean of the user's skill vectors plus their interests, weighted as in the tfidf mode"""
+        vector = [0.0] * self.dim
+        skills = [skill for skill in user_skills if isinstance(skill, str) and skill.strip()]
+        if skills:
+            _add(vector, _mean([self.skill_vector(skill) for skill in skills], self.dim))
+        interests = ' '.join(interest for interest in user_interests if isinstance(interest, str))
+        if interests.strip():
+            _add(vector, normalize(embed_text(interests, self.dim)), SCORING_INTEREST_WEIGHT)
+        return normalize(vector)
+
+    def search(self, query, k=10, nprobe=None):
+        """
+        ([(career id, cosine similarity)] for the k nearest careers, best
+        first; number of careers scanned). With IVF lists only the `nprobe`
+        lists whose centroids are nearest the query are scanned.
+        """
+        if self._matrix is not None:
+            query = np.asarray(query, dtype=np.float32)
+        if self.lists:
+            nprobe = nprobe or EMBEDDING_NPROBE
+            closeness = self._dots(self._centroids, self._centroids + len(self.lists), query)
+            probed = heapq.nlargest(nprobe, range(len(self.lists)), key=closeness.__getitem__)
+            ranges = sorted(self.lists[c] for c in probed)
+        else:
+            ranges = [(0, len(self.career_ids))]
+
+        scanned = sum(end - start for start, end in ranges)
+        if self._matrix is not None:
+            rows = np.concatenate([np.arange(start, end) for start, end in ranges])
+            similarities = np.concatenate([self._matrix[start:end] @ query for start, end in ranges])
+            # Partial selection (argpartition), then only the k survivors are sorted
+            if len(rows) > k:
+                keep = np.argpartition(-similarities, k)[:k]
+                rows, similarities = rows[keep], similarities[keep]
+            order = np.lexsort((rows, -similarities))
+            best = zip(rows[order].tolist(), similarities[order].tolist())
+        else:
+            scored = []
+            for start, end in ranges:
+                scored.extend(zip(range(start, end), self._dots(start, end, query)))
+            best = heapq.nlargest(k, scored, key=lambda item: (item[1], -item[0]))
+        return [(self.career_ids[row], similarity) for row, similarity in best], scanned
+
+    def save(self, path):
+        """Write <path>.f32 and <path>.json, each renamed into place once complete"""
+        with open(path + '.f32.tmp', 'wb') as f:
+            f.write(self._data)
+        with open(path + '.json.tmp', 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(path + '.f32.tmp', path + '.f32')
+        os.replace(path + '.json.tmp', path + '.json')
+
+
+def catalog_digest(careers, required_skills, skills=(), aliases=()):
+    """sha256 of everything the vectors are computed from; a saved index with another digest is stale"""
+    digest = hashlib.sha256()
+    for career_dict, required in zip(careers, required_skills):
+        digest.update(repr((career_dict['id'], career_text(career_dict), list(required))).encode('utf-8'))
+    for name, category in skills:
+        digest.update(repr(('skill', name, category)).encode('utf-8'))
+    for alias, skill in aliases:
+        digest.update(repr(('alias', alias, skill)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def build_index(careers, required_skills, skills=(), aliases=(), dim=None, nlist=None):
+    """
+    In-memory index over a catalog. Catalogs of EMBEDDING_IVF_MIN careers or
+    more are split into sqrt(n) IVF lists when NumPy is available to run
+    k-means; `nlist` overrides that (0 = always scan everything).
+    """
+    dim = dim or EMBEDDING_DIM
+    career_vectors, skill_vectors = embed_catalog(careers, required_skills, skills, aliases, dim)
+    if nlist is None:
+        nlist = int(math.sqrt(len(careers))) if np is not None and len(careers) >= EMBEDDING_IVF_MIN else 0
+    nlist = min(nlist, len(careers))
+
+    order, lists, centroids = list(range(len(careers))), [], []
+    if nlist > 1:
+        if np is None:
+            raise RuntimeError('building an IVF index needs NumPy (use nlist=0 to scan every career)')
+        centroid_matrix, assignment = _kmeans(np.array(career_vectors, dtype=np.float32), nlist)
+        # Each list's careers are contiguous rows, in catalog order
+        order.sort(key=lambda i: assignment[i])
+        ends = np.cumsum(np.bincount(assignment, minlength=nlist)).tolist()
+        lists = [[start, end] for start, end in zip([0] + ends[:-1], ends)]
+        centroids = centroid_matrix.tolist()
+
+    data = array('f')
+    for i in order:
+        data.extend(career_vectors[i])
+    for _, vector in skill_vectors.values():
+        data.extend(vector)
+    for centroid in centroids:
+        data.extend(centroid)
+
+    meta = {
+        'dim': dim,
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'catalog_sha256': catalog_digest(careers, required_skills, skills, aliases),
+        'career_ids': [careers[i]['id'] for i in order],
+        'skills': [name for name, _ in skill_vectors.values()],
+        'lists': lists,
+    }
+    return EmbeddingIndex(memoryview(data), meta)
+
+
+def load_index(path=None):
+    """The saved index, memory-mapped, or None if none has been built (or it can't be read)"""
+    path = path or EMBEDDING_INDEX
+    if not os.path.exists(path + '.json'):
+        return None
+    try:
+        with open(path + '.json') as f:
+            meta = json.load(f)
+        rows = len(meta['career_ids']) + len(meta['skills']) + len(meta['lists'])
+        with open(path + '.f32', 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size != rows * meta['dim'] * 4:
+                raise ValueError(f"{path}.f32 has {size} bytes, expected {rows * meta['dim'] * 4}")
+            if size:
+                data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).cast('f')
+            else:
+                data = memoryview(array('f'))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Warning: could not load embedding index {path}: {e}")
+        return None
+    return EmbeddingIndex(data, meta)
+
+
+def catalog_inputs(conn):
+    """(skills, aliases) rows build_index needs besides the scoring engine's careers"""
+    skills = conn.execute('SELECT name, category FROM skills ORDER BY id').fetchall()
+    aliases = conn.execute('SELECT alias, skill FROM skill_aliases ORDER BY alias').fetchall()
+    return skills, aliases
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _index_version(engine, conn):
+    return engine.version, catalog_version(conn, 'skills'), catalog_version(conn, 'skill_aliases')
+
+
+def get_embedding_index(engine, conn, path=None):
+    """
+    Return the shared index for the scoring engine's catalog: the saved one
+    if it was built from exactly this catalog (same content digest), else
+    one built in memory. Checked once per catalog version.
+    """
+    global _index
+    version = _index_version(engine, conn)
+    cached = _index
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with _index_lock:
+        if _index is None or _index[0] != version:
+            skills, aliases = catalog_inputs(conn)
+            digest = catalog_digest(engine.careers, engine.required_skills, skills, aliases)
+            index = load_index(path)
+            if index is not None and index.meta.get('catalog_sha256') != digest:
+                print("Warning: embedding index was built from another catalog; "
+                      "rebuild it with python embeddings.py")
+                index = None
+            if index is None:
+                index = build_index(engine.careers, engine.required_skills, skills, aliases, nlist=0)
+            _index = (version, index)
+        return _index[1]
+
+
+def embeddings_needed(scoring, use_ai):
+    """Whether an assessment reads the embedding index: as the scoring formula, or to pre-filter for the AI"""
+    return ASSESS_PREFILTER == 'embedding' if use_ai else scoring == 'embedding'
+
+
+def nearest_careers(index, engine, user_skills, user_interests, k):
+    """([(engine career index, similarity)], careers scanned) for the k careers nearest the user"""
+    hits, scanned = index.search(index.user_vector(user_skills, user_interests), k)
+    return [(engine.index_by_id[career_id], similarity)
+            for career_id, similarity in hits if career_id in engine.index_by_id], scanned
+
+
+def embedding_candidates(index, engine, user_skills, user_interests, limit=None):
+    """
+    (indexes in catalog order, number pruned) of the `limit` careers nearest
+    the user, as SkillScoringEngine.candidates returns them, so the AI only
+    sees careers semantically close to the user even without shared skills.
+    """
+    limit = ASSESS_MAX_CANDIDATES if limit is None else limit
+    if not limit or limit >= len(engine):
+        return list(range(len(engine))), 0
+    hits, _ = nearest_careers(index, engine, user_skills, user_interests, limit)
+    indexes = sorted(i for i, _ in hits)
+    return indexes, len(engine) - len(indexes)
+
+
+def recommend_embedding(index, engine, user_skills, user_interests, k=5):
+    """
+    (recommendations for the k careers nearest the user, careers scanned).
+    A required skill counts as covered when one of the user's skills is
+    within EMBEDDING_SKILL_MATCH of it, so near-synonyms are credited.
+    """
+    hits, scanned = nearest_careers(index, engine, user_skills, user_interests, k)
+    owned = [(skill, index.skill_vector(skill)) for skill in user_skills if isinstance(skill, str) and skill.strip()]
+
+    recommendations = []
+    for i, similarity in hits:
+        career_dict, required_skills = engine.careers[i], engine.required_skills[i]
+        covered, gaps = [], []
+        for skill in required_skills:
+            vector = index.skill_vector(skill)
+            closest, own = max(((dot(vector, own_vector), own) for own, own_vector in owned), default=(0.0, None))
+            if closest >= EMBEDDING_SKILL_MATCH:
+                covered.append((own, skill))
+            else:
+                gaps.append(skill)
+
+        related = [f"{own} ~ {skill}" for own, skill in covered if canonical_skill(own) != canonical_skill(skill)]
+        reasoning = f"Your skills cover {len(covered)} out of {len(required_skills)} required skills"
+        reasoning += f" (related: {', '.join(related[:3])})." if related else "."
+        recommendations.append({
+            'career_id': career_dict['id'],
+            'career_title': career_dict['title'],
+            'match_score': round(max(0.0, similarity) * 100, 1),
+            'reasoning': reasoning,
+            'skill_gaps': gaps[:3],
+            'career_details': career_dict
+        })
+    return recommendations, scanned
+
+
+def main(argv=None):
+    from db import ConnectionPool, database_path
+    from catalog_snapshot import CATALOG_SNAPSHOT, open_snapshot_pool
+    from database.migrations import migrate
+    from scoring import get_scoring_engine
+
+    parser = argparse.ArgumentParser(description='Build the local embedding index of careers and skills')
+    parser.add_argument('--db', default=None, help='catalog database (default: the snapshot, else the app database)')
+    parser.add_argument('--out', default=EMBEDDING_INDEX, help='index path, without extension')
+    parser.add_argument('--dim', type=int, default=EMBEDDING_DIM, help='vector dimensions')
+    parser.add_argument('--nlist', type=int, default=None, help='IVF lists (default: sqrt(careers) for large catalogs)')
+    args = parser.parse_args(argv)
+
+    # The snapshot is what deployments read the catalog from, so index that when there is one
+    pool = None if args.db else open_snapshot_pool()
+    source = CATALOG_SNAPSHOT if pool else args.db or database_path()
+    conn = (pool or ConnectionPool(source, max_idle=0, setup=migrate)).acquire()
+    try:
+        engine = get_scoring_engine(conn)
+        index = build_index(engine.careers, engine.required_skills, *catalog_inputs(conn),
+                            dim=args.dim, nlist=args.nlist)
+    finally:
+        conn.close()
+
+    index.save(args.out)
+    print(f"Wrote {args.out}.f32 from {source}: {len(index)} careers, {len(index.skill_names)} skills, "
+          f"{index.dim} dimensions, {len(index.lists) or 'no'} IVF lists "
+          f"({os.path.getsize(args.out + '.f32') // 1024} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Assessment Jobs
+Runs assessments on a background worker pool so /api/assess can return a
+job id immediately; clients poll or subscribe to results as they arrive.
+
+Jobs live in process memory. On serverless platforms a job only survives as
+long as the instance that accepted it, so clients should be ready to retry.
+"""
+
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Job configuration
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+JOB_TTL = int(os.getenv('JOB_TTL', '3600'))
+
+
+class AssessmentJob:
+    """State of one background assessment: per-career events, then a final result"""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = 'queued'
+        self.total = None
+        self.events = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+
+    def start(self, total):
+        with self._cond:
+            self.status = 'running'
+            self.total = total
+            self._cond.notify_all()
+
+    def publish(self, event):
+        """Record one scored career and wake up any subscribers"""
+        with self._cond:
+            self.events.append(event)
+            self._cond.notify_all()
+
+    def finish(self, result):
+        with self._cond:
+            self.status = 'done'
+            self.result = result
+            self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def fail(self, message):
+        with self._cond:
+            self.status = 'failed'
+            self.error = message
+            self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def wait_for_events(self, since, timeout=None):
+        """
+        Block until there are events past index `since`, the job finishes, or
+        `timeout` seconds pass. Returns (new events, finished).
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.events) > since or self.finished, timeout=timeout)
+            return self.events[since:], self.finished
+
+    def snapshot(self, since=0):
+        """Polling view of the job, with only the events past index `since`"""
+        with self._cond:
+            return {
+                'job_id': self.id,
+                'status': self.status,
+                'total': self.total,
+                'completed': len(self.events),
+                'results': self.events[since:],
+                'result': self.result,
+                'error': self.error
+            }
+
+
+class JobManager:
+    """
+    Bounded worker pool plus an in-memory registry of jobs, pruned after
+    JOB_TTL. Jobs exist only in the process that started them, so on
+    serverless hosts a later poll may reach an instance that never saw the
+    job; the web UI uses the single-request NDJSON stream instead.
+    """
+
+    def __init__(self, max_workers=None, ttl=None):
+        self.max_workers = max_workers or JOB_WORKERS
+        self.ttl = JOB_TTL if ttl is None else ttl
+        self._executor = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _run(self, job, func, args):
+        try:
+            job.finish(func(job, *args))
+        except Exception as e:
+            print(f"Assessment job {job.id} failed: {e}")
+            job.fail('Assessment failed')
+
+    def submit(self, func, *args):
+        """Queue func(job, *args); its return value becomes the job result"""
+        job = AssessmentJob()
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='assessment-job')
+            self._executor.submit(self._run, job, func, args)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune(self):
+        # Caller holds the lock
+        cutoff = time.time() - self.ttl
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            statuses = {}
+            for job in self._jobs.values():
+                statuses[job.status] = statuses.get(job.status, 0) + 1
+            return {
+                'workers': self.max_workers,
+                'jobs': len(self._jobs),
+                'by_status': statuses
+            }
@@ -0,0 +1,126 @@
+"""
+Prompt Templates
+Gemini prompts built from precompiled templates: the user-profile prefix is
+rendered once per request and each career adds a compact one-line block.
+Every prompt carries a local token estimate, and a per-request TokenBudget
+decides which careers get a model call at all.
+"""
+
+import os
+import re
+import threading
+
+# Token accounting configuration (0 disables the limit)
+AI_TOKEN_BUDGET = int(os.getenv('AI_TOKEN_BUDGET', '50000'))
+AI_PROFILE_MAX_TOKENS = int(os.getenv('AI_PROFILE_MAX_TOKENS', '300'))
+
+PROFILE_TEMPLATE = """Analyze the career match for an Indian student with the following profile:
+- Education Level: {education_level}
+- Age: {age}
+- Interests: {interests}
+- Current Skills: {skills}
+"""
+
+CAREER_TEMPLATE = """
+Career Path: {title} | Industry: {industry} | Required Skills: {skills}
+
+Provide: 1. Match score (0-100) 2. Brief reasoning (2-3 sentences) 3. Top 3 skill gaps
+Format response as JSON with keys: match_score, reasoning, skill_gaps
+"""
+
+BATCH_HEADER = "\nCareer Paths:\n"
+BATCH_BLOCK_TEMPLATE = "- career_id {id}: {title} | Industry: {industry} | Required Skills: {skills}\n"
+BATCH_INSTRUCTIONS = """
+For every career provide: 1. Match score (0-100) 2. Brief reasoning (2-3 sentences) 3. Top 3 skill gaps
+Format response as a JSON array with one object per career, with keys: career_id, match_score, reasoning, skill_gaps
+"""
+
+# Words, digit runs and single punctuation marks
+_TOKEN_PATTERN = re.compile(r'[^\W\d_]+|\d+|\S')
+
+
+def estimate_tokens(text):
+    """
+    Approximate SentencePiece-style token count: about one token per four
+    letters of a word, per three digits, and per punctuation mark. It errs
+    on the high side, which is the safe side for a budget.
+    """
+    tokens = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        if piece[0].isdigit():
+            tokens += -(-len(piece) // 3)
+        elif piece[0].isalpha():
+            tokens += -(-len(piece) // 4)
+        else:
+            tokens += 1
+    return tokens
+
+
+_BATCH_FIXED_TOKENS = estimate_tokens(BATCH_HEADER) + estimate_tokens(BATCH_INSTRUCTIONS)
+
+
+class TokenBudget:
+    """Prompt tokens one request may still spend; a limit of 0 means unlimited"""
+
+    def __init__(self, limit=None):
+        self.limit = AI_TOKEN_BUDGET if limit is None else limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens):
+        """Claim `tokens`, or return False (claiming nothing) if they don't fit"""
+        with self._lock:
+            if self.limit and self.used + tokens > self.limit:
+                return False
+            self.used += tokens
+            return True
+
+    @property
+    def remaining(self):
+        return max(0, self.limit - self.used) if self.limit else None
+
+
+class CareerPrompts:
+    """
+    Prompts for one user. The profile prefix is rendered (and, if it would
+    exceed `max_profile_tokens`, trimmed from the end of its longest list)
+    once; career and batch prompts only render their career blocks.
+    """
+
+    def __init__(self, user_dict, user_interests, user_skills, max_profile_tokens=None):
+        max_profile_tokens = AI_PROFILE_MAX_TOKENS if max_profile_tokens is None else max_profile_tokens
+        interests, skills = list(user_interests), list(user_skills)
+
+        self.prefix = self._render_profile(user_dict, interests, skills)
+        self.prefix_tokens = estimate_tokens(self.prefix)
+        while max_profile_tokens and self.prefix_tokens > max_profile_tokens and (interests or skills):
+            (interests if len(interests) > len(skills) else skills).pop()
+            self.prefix = self._render_profile(user_dict, interests, skills)
+            self.prefix_tokens = estimate_tokens(self.prefix)
+
+    @staticmethod
+    def _render_profile(user_dict, interests, skills):
+        return PROFILE_TEMPLATE.format(
+            education_level=user_dict['education_level'],
+            age=user_dict['age'],
+            interests=', '.join(interests),
+            skills=', '.join(skills)
+        )
+
+    def career_prompt(self, career_dict, required_skills):
+        """(prompt, estimated tokens) for a single career analysis"""
+        block = CAREER_TEMPLATE.format(title=career_dict['title'], industry=career_dict['industry'],
+                                       skills=', '.join(required_skills))
+        return self.prefix + block, self.prefix_tokens + estimate_tokens(block)
+
+    def batch_block(self, career_dict, required_skills):
+        """(block, estimated tokens) for one career of a batch prompt"""
+        block = BATCH_BLOCK_TEMPLATE.format(id=career_dict['id'], title=career_dict['title'],
+                                            industry=career_dict['industry'],
+                                            skills=', '.join(required_skills))
+        return block, estimate_tokens(block)
+
+    def batch_prompt(self, blocks):
+        """(prompt, estimated tokens) for several careers from their batch_block() results"""
+        prompt = self.prefix + BATCH_HEADER + ''.join(block for block, _ in blocks) + BATCH_INSTRUCTIONS
+        return prompt, self.prefix_tokens + _BATCH_FIXED_TOKENS + sum(tokens for _, tokens in blocks)
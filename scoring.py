@@ -0,0 +1,318 @@
+"""
+Career Scoring
+Rule-based skill-overlap scoring shared by the assessment endpoints, and a
+precomputed bitset engine that scores a user against the whole catalog,
+with an inverted skill index to prune careers the user has nothing in
+common with before they are scored. A second mode scores TF-IDF weighted
+skills and interests by cosine similarity.
+"""
+
+import os
+import re
+import json
+import math
+import heapq
+import threading
+
+from catalog import catalog_version
+from skill_index import canonical_skill
+
+# Candidate pruning: careers sharing fewer than ASSESS_MIN_OVERLAP skills with the user are
+# not scored at all (0 disables pruning), and at most ASSESS_MAX_CANDIDATES are (0 = no limit)
+ASSESS_MIN_OVERLAP = int(os.getenv('ASSESS_MIN_OVERLAP', '1'))
+ASSESS_MAX_CANDIDATES = int(os.getenv('ASSESS_MAX_CANDIDATES', '50'))
+# How careers are picked for the AI: 'skills' (shared skills, as above) or 'embedding'
+# (the ASSESS_MAX_CANDIDATES nearest in the local embedding index, see embeddings.py)
+ASSESS_PREFILTER = os.getenv('ASSESS_PREFILTER', 'skills')
+
+# Scoring without the AI: 'overlap' (share of required skills owned), 'tfidf' or
+# 'embedding' (nearest careers in the local embedding index)
+SCORING_MODES = ('overlap', 'tfidf', 'embedding')
+SCORING_MODE = os.getenv('SCORING_MODE', 'overlap')
+# Weight of interests relative to skills in the tfidf and embedding modes
+SCORING_INTEREST_WEIGHT = float(os.getenv('SCORING_INTEREST_WEIGHT', '0.5'))
+
+# int.bit_count is Python 3.10+; Vercel still runs 3.9
+if hasattr(int, 'bit_count'):
+    popcount = int.bit_count
+else:
+    def popcount(value):
+        return bin(value).count('1')
+
+
+def skill_overlap_recommendation(career_dict, required_skills, user_skills):
+    """
+    Score a career by the share of its required skills the user already has,
+    skills compared by canonical_skill as in the engine and candidate index
+    """
+    owned = {canonical_skill(skill) for skill in user_skills if isinstance(skill, str)}
+    required = {canonical_skill(skill) for skill in required_skills}
+    skill_overlap = len(owned & required)
+    match_score = min(100, (skill_overlap / max(len(required_skills), 1)) * 100)
+
+    return {
+        'career_id': career_dict['id'],
+        'career_title': career_dict['title'],
+        'match_score': match_score,
+        'reasoning': f"You have {skill_overlap} out of {len(required_skills)} required skills.",
+        'skill_gaps': [skill for skill in dict.fromkeys(required_skills) if canonical_skill(skill) not in owned][:3],
+        'career_details': career_dict
+    }
+
+
+_WORD_PATTERN = re.compile(r'[^\W\d_]+')
+_STOPWORDS = frozenset('and the for with from into that this your you are all any other its their our'.split())
+
+
+def text_terms(text):
+    """Lowercased words of 3+ letters, stopwords dropped and a plural 's' stripped"""
+    terms = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        if len(word) < 3 or word in _STOPWORDS:
+            continue
+        if len(word) > 4 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def career_text(career_dict):
+    """The career fields interests are matched against"""
+    return ' '.join(str(career_dict.get(field) or '') for field in ('title', 'industry', 'description'))
+
+
+class TfidfScorer:
+    """
+    Careers as L2-normalized sparse vectors over two kinds of terms: required
+    skills weighted by IDF across the catalog (a skill every career asks for
+    says little), and title/industry/description words weighted by TF-IDF.
+    `interest_weight` scales the interest terms of the user vector only, so
+    it enters each score once. The matrix is stored column-wise, as one posting
+    list of (career index, weight) per term, so scoring a user is a single
+    sparse matrix-vector product touching only careers that share a term.
+    """
+
+    def __init__(self, careers, required_skills, interest_weight=None):
+        self.interest_weight = SCORING_INTEREST_WEIGHT if interest_weight is None else interest_weight
+
+        rows = []
+        df = {}
+        for career_dict, skills in zip(careers, required_skills):
+            counts = {('skill', canonical_skill(skill)): 1 for skill in skills}
+            for word in text_terms(career_text(career_dict)):
+                counts[('text', word)] = counts.get(('text', word), 0) + 1
+            rows.append(counts)
+            for term in counts:
+                df[term] = df.get(term, 0) + 1
+
+        # Smoothed IDF, as in scikit-learn
+        self.idf = {term: math.log((1 + len(rows)) / (1 + count)) + 1 for term, count in df.items()}
+        self.postings = {}
+        for index, counts in enumerate(rows):
+            weights = {term: (1 + math.log(tf)) * self.idf[term] for term, tf in counts.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for term, weight in weights.items():
+                self.postings.setdefault(term, []).append((index, weight / norm))
+
+    def user_vector(self, user_skills, user_interests):
+        """L2-normalized {term: weight} for a user; terms no career has are dropped"""
+        terms = {('skill', canonical_skill(skill)) for skill in user_skills if isinstance(skill, str)}
+        for interest in user_interests:
+            if isinstance(interest, str):
+                terms.update(('text', word) for word in text_terms(interest))
+        vector = {term: self.idf[term] * (self.interest_weight if term[0] == 'text' else 1.0)
+                  for term in terms if term in self.idf}
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        return {term: weight / norm for term, weight in vector.items()}
+
+    def scores(self, user_skills, user_interests):
+        """{career index: cosine similarity} for every career sharing at least one term"""
+        scores = {}
+        for term, user_weight in self.user_vector(user_skills, user_interests).items():
+            for index, weight in self.postings[term]:
+                scores[index] = scores.get(index, 0.0) + user_weight * weight
+        return scores
+
+
+class SkillScoringEngine:
+    """
+    Careers x skills matrix built once from the career_skills table (or
+    career_paths.required_skills for careers it doesn't cover). Every career
+    row is packed into an int bitset over the skill vocabulary, so scoring a
+    user is one AND + popcount per career instead of decoding JSON and
+    building sets. Bits are keyed on canonical_skill, like careers_by_skill,
+    which maps each canonical skill to the careers requiring it, so
+    candidate generation only visits the user's skills.
+    """
+
+    def __init__(self, careers, version=None, skills_by_career=None):
+        self.version = version
+        self.vocabulary = {}
+        self.careers = []
+        self.required_skills = []
+        self.masks = []
+        self.required_counts = []
+        self.careers_by_skill = {}
+        self.index_by_id = {}
+        self._tfidf = None
+        self._tfidf_lock = threading.Lock()
+
+        for career in careers:
+            career_dict = dict(career)
+            if skills_by_career is not None and career_dict['id'] in skills_by_career:
+                required_skills = skills_by_career[career_dict['id']]
+            else:
+                required_skills = json.loads(career_dict['required_skills'] or '[]')
+
+            mask = 0
+            for skill in required_skills:
+                bit = self.vocabulary.setdefault(canonical_skill(skill), len(self.vocabulary))
+                mask |= 1 << bit
+            for skill in {canonical_skill(skill) for skill in required_skills}:
+                self.careers_by_skill.setdefault(skill, []).append(len(self.careers))
+
+            self.index_by_id[career_dict['id']] = len(self.careers)
+            self.careers.append(career_dict)
+            self.required_skills.append(required_skills)
+            self.masks.append(mask)
+            # Matches skill_overlap_recommendation, which divides by the list length
+            self.required_counts.append(max(len(required_skills), 1))
+
+    def __len__(self):
+        return len(self.careers)
+
+    def user_mask(self, user_skills):
+        """Bitset of the user's skills; skills no career requires are dropped"""
+        mask = 0
+        for skill in user_skills:
+            bit = self.vocabulary.get(canonical_skill(skill)) if isinstance(skill, str) else None
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def overlap_counts(self, user_skills):
+        """Number of required skills the user has, for every career"""
+        user_mask = self.user_mask(user_skills)
+        return [popcount(mask & user_mask) for mask in self.masks]
+
+    def scores(self, user_skills):
+        """Skill-overlap match score (0-100) for every career"""
+        return [min(100, overlap / required * 100)
+                for overlap, required in zip(self.overlap_counts(user_skills), self.required_counts)]
+
+    def candidates(self, user_skills, min_overlap=None, limit=None):
+        """
+        (indexes in catalog order, number pruned) of the careers worth scoring
+        for a user: overlap counts are accumulated over the user's skills in
+        the inverted index, careers below `min_overlap` are dropped and only
+        the `limit` with the most shared skills are kept. A user who shares
+        no skill with any career gets the first `limit` careers in catalog
+        order instead, since interests are all the AI has to go on then, but
+        one call per career in the catalog would be too many.
+        """
+        min_overlap = ASSESS_MIN_OVERLAP if min_overlap is None else min_overlap
+        limit = ASSESS_MAX_CANDIDATES if limit is None else limit
+        if min_overlap <= 0:
+            return list(range(len(self.careers))), 0
+
+        counts = {}
+        for skill in {canonical_skill(skill) for skill in user_skills}:
+            for index in self.careers_by_skill.get(skill, ()):
+                counts[index] = counts.get(index, 0) + 1
+        indexes = [index for index, count in counts.items() if count >= min_overlap]
+        if not indexes:
+            kept = min(limit, len(self.careers)) if limit else len(self.careers)
+            return list(range(kept)), len(self.careers) - kept
+
+        if limit and len(indexes) > limit:
+            indexes = heapq.nlargest(limit, indexes,
+                                     key=lambda i: (counts[i], counts[i] / self.required_counts[i], -i))
+        indexes.sort()
+        return indexes, len(self.careers) - len(indexes)
+
+    def top_k(self, user_skills, k=5, indexes=None):
+        """Indexes of the k best-scoring careers (of `indexes`, if given), ties kept in catalog order"""
+        if indexes is None:
+            scores = self.scores(user_skills)
+            # Partial selection, O(n log k), like argpartition
+            return heapq.nlargest(k, range(len(scores)), key=scores.__getitem__)
+
+        user_mask = self.user_mask(user_skills)
+        score = lambda i: min(100, popcount(self.masks[i] & user_mask) / self.required_counts[i] * 100)
+        return heapq.nlargest(k, indexes, key=score)
+
+    def recommend(self, user_skills, k=5, indexes=None):
+        """Recommendations for the k best-scoring careers, best first"""
+        return [skill_overlap_recommendation(self.careers[i], self.required_skills[i], user_skills)
+                for i in self.top_k(user_skills, k, indexes)]
+
+    @property
+    def tfidf(self):
+        """TF-IDF career matrix, built on first use"""
+        if self._tfidf is None:
+            with self._tfidf_lock:
+                if self._tfidf is None:
+                    self._tfidf = TfidfScorer(self.careers, self.required_skills)
+        return self._tfidf
+
+    def recommend_tfidf(self, user_skills, user_interests, k=5):
+        """
+        (recommendations for the k careers most similar to the user's skills
+        and interests, number of careers scored). Careers sharing no term with
+        the user score 0 and are never visited; if that is all of them, the
+        first k careers are returned, as candidates() falls back to catalog order.
+        """
+        tfidf = self.tfidf
+        scores = tfidf.scores(user_skills, user_interests)
+        if scores:
+            best = heapq.nlargest(k, scores, key=lambda i: (scores[i], -i))
+        else:
+            best = list(range(min(k, len(self.careers))))
+
+        owned = {canonical_skill(skill) for skill in user_skills if isinstance(skill, str)}
+        interest_terms = {word for interest in user_interests if isinstance(interest, str)
+                          for word in text_terms(interest)}
+        recommendations = []
+        for i in best:
+            career_dict, required_skills = self.careers[i], self.required_skills[i]
+            shared = [skill for skill in required_skills if canonical_skill(skill) in owned]
+            # Missing skills, most distinctive (highest IDF) first
+            gaps = sorted((skill for skill in required_skills if canonical_skill(skill) not in owned),
+                          key=lambda skill: -tfidf.idf.get(('skill', canonical_skill(skill)), 0))
+            matched = [word for word in dict.fromkeys(text_terms(career_text(career_dict)))
+                       if word in interest_terms]
+
+            reasoning = f"You have {len(shared)} out of {len(required_skills)} required skills"
+            reasoning += f", and your interests match: {', '.join(matched[:3])}." if matched else "."
+            recommendations.append({
+                'career_id': career_dict['id'],
+                'career_title': career_dict['title'],
+                'match_score': round(min(100, scores.get(i, 0.0) * 100), 1),
+                'reasoning': reasoning,
+                'skill_gaps': gaps[:3],
+                'career_details': career_dict
+            })
+        return recommendations, len(scores) or len(self.careers)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_scoring_engine(conn):
+    """Return the shared engine, rebuilding it when career_paths has changed"""
+    global _engine
+    version = catalog_version(conn, 'career_paths')
+    engine = _engine
+    if engine is not None and engine.version == version:
+        return engine
+
+    with _engine_lock:
+        if _engine is None or _engine.version != version:
+            careers = conn.execute('SELECT * FROM career_paths').fetchall()
+            skills_by_career = {}
+            for career_id, skill in conn.execute(
+                    'SELECT career_id, skill FROM career_skills ORDER BY career_id, position'):
+                skills_by_career.setdefault(career_id, []).append(skill)
+            _engine = SkillScoringEngine(careers, version=version, skills_by_career=skills_by_career)
+        return _engine
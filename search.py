@@ -0,0 +1,93 @@
+"""
+Catalog Search
+Full-text search over career_paths and skills through the FTS5 tables kept
+in sync by triggers (see database/init_db.py). Results are ranked by BM25
+with per-column weights and carry a highlighted snippet; the word still
+being typed matches as a prefix. Each query is an index lookup, so its cost
+does not grow with the catalog.
+"""
+
+import re
+from html import escape
+
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
+SNIPPET_TOKENS = 12
+
+# FTS5 wraps matches in these (private-use characters catalog text won't
+# contain) so the snippet can be HTML-escaped before they become <mark> tags
+_MARK_START, _MARK_END = '\ue000', '\ue001'
+
+# kind -> (FTS table, content table, returned columns, BM25 weight per indexed column)
+SEARCH_SOURCES = {
+    'careers': ('career_paths_fts', 'career_paths', ('id', 'title', 'industry', 'growth_potential'),
+                (10.0, 2.0, 4.0, 1.0)),
+    'skills': ('skills_fts', 'skills', ('id', 'name', 'category', 'difficulty_level'),
+               (10.0, 3.0)),
+}
+
+# Words, optionally ending in * to ask for a prefix match
+_TERM_PATTERN = re.compile(r'(\w+)(\*)?')
+
+
+def match_expression(text):
+    """
+    FTS5 MATCH expression for free text: every word must match, quoted so
+    user input can't use FTS5 operators. The last word is a prefix unless
+    the text ends in whitespace; a word typed with a trailing * always is.
+    Returns None when there are no words.
+    """
+    terms = _TERM_PATTERN.findall(text)
+    if not terms:
+        return None
+    typing = not text[-1].isspace()
+    parts = []
+    for position, (word, star) in enumerate(terms):
+        prefix = star or (typing and position == len(terms) - 1)
+        parts.append(f'"{word}"' + ('*' if prefix else ''))
+    return ' '.join(parts)
+
+
+def highlight(snippet):
+    """HTML-escape a snippet from FTS5 and turn its match markers into <mark> tags"""
+    return escape(snippet or '').replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def search_available(conn):
+    """False on SQLite builds without FTS5, where the search tables could not be created"""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'career_paths_fts'"
+    ).fetchone() is not None
+
+
+def search_catalog(conn, text, kinds=tuple(SEARCH_SOURCES), limit=SEARCH_DEFAULT_LIMIT):
+    """
+    Best `limit` matches for `text` of each kind, most relevant first.
+    `score` is the negated BM25 rank (higher is better); `snippet` is
+    HTML-escaped text with the matched words wrapped in <mark></mark>.
+    """
+    results = {kind: [] for kind in kinds}
+    expression = match_expression(text)
+    if expression is None:
+        return results
+
+    for kind in kinds:
+        fts, table, columns, weights = SEARCH_SOURCES[kind]
+        select = ', '.join(f'c.{column}' for column in columns)
+        # Ordering by the rank column (configured with our weights) lets FTS5 stop after `limit` rows
+        rows = conn.execute(f'''
+            SELECT {select}, {fts}.rank AS rank,
+                   snippet({fts}, -1, ?, ?, '…', {SNIPPET_TOKENS}) AS snippet
+            FROM {fts}
+            JOIN {table} c ON c.id = {fts}.rowid
+            WHERE {fts} MATCH ? AND {fts}.rank MATCH ?
+            ORDER BY {fts}.rank
+            LIMIT ?
+        ''', (_MARK_START, _MARK_END, expression, f"bm25({', '.join(map(str, weights))})",
+              limit)).fetchall()
+        for row in rows:
+            result = dict(row)
+            result['score'] = round(-result.pop('rank'), 4)
+            result['snippet'] = highlight(result['snippet'])
+            results[kind].append(result)
+    return results
@@ -0,0 +1,123 @@
+"""
+Skill Index
+In-memory prefix index over canonical skill names and their aliases. It
+backs /api/skills/suggest (a bisect into sorted arrays, no SQL) and the
+canonicalizer that turns free-text skills ("python3", "ML") into catalog
+names on registration, so skill-overlap scoring compares clean names.
+"""
+
+import threading
+from bisect import bisect_left
+
+from catalog import catalog_version
+
+SUGGEST_DEFAULT_LIMIT = 10
+SUGGEST_MAX_LIMIT = 50
+
+
+def canonical_skill(name):
+    """Case- and whitespace-insensitive form of a skill name"""
+    return ' '.join(name.split()).casefold()
+
+
+class SkillIndex:
+    """
+    Canonical names come from skills.name and every career's required
+    skills; aliases map to one of them. Two sorted key arrays are kept: whole
+    names/aliases, and every later word of a name ("learning" for "Machine
+    Learning"), so suggestions rank whole-name prefix matches first.
+    """
+
+    def __init__(self, names, aliases=(), version=None):
+        self.version = version
+        # canonical key -> display name
+        self.names = {}
+        for name in names:
+            if name and name.strip():
+                self.names.setdefault(canonical_skill(name), ' '.join(name.split()))
+        # canonical alias key -> (alias as written, display name)
+        self.aliases = {}
+        for alias, skill in aliases:
+            key = canonical_skill(alias)
+            # A real skill name is never shadowed by an alias
+            if key and key not in self.names:
+                self.aliases[key] = (' '.join(alias.split()), self.names.get(canonical_skill(skill), skill))
+
+        entries = [(key, name, None) for key, name in self.names.items()]
+        entries += [(key, skill, alias) for key, (alias, skill) in self.aliases.items()]
+        entries.sort()
+        self._keys = [key for key, _, _ in entries]
+        self._entries = [(name, alias) for _, name, alias in entries]
+
+        words = []
+        for key, name in self.names.items():
+            parts = key.split(' ')
+            words.extend((' '.join(parts[i:]), name) for i in range(1, len(parts)))
+        words.sort()
+        self._word_keys = [key for key, _ in words]
+        self._word_entries = [(name, None) for _, name in words]
+
+    def __len__(self):
+        return len(self.names)
+
+    def canonicalize(self, skill):
+        """Catalog name for a skill or alias; unknown skills keep their own (trimmed) spelling"""
+        key = canonical_skill(skill)
+        if key in self.names:
+            return self.names[key]
+        if key in self.aliases:
+            return self.aliases[key][1]
+        return ' '.join(skill.split())
+
+    def canonicalize_all(self, skills):
+        """Canonicalize a list of skills, dropping blanks and duplicates, order kept"""
+        canonical = (self.canonicalize(skill) for skill in skills if isinstance(skill, str) and skill.strip())
+        return list(dict.fromkeys(canonical))
+
+    def suggest(self, prefix, limit=SUGGEST_DEFAULT_LIMIT):
+        """
+        Up to `limit` {"name", "alias"} suggestions for what has been typed
+        so far; `alias` is the alias that matched, or None.
+        """
+        key = canonical_skill(prefix)
+        if not key:
+            return []
+
+        suggestions, seen = [], set()
+        for keys, entries in ((self._keys, self._entries), (self._word_keys, self._word_entries)):
+            i = bisect_left(keys, key)
+            while i < len(keys) and keys[i].startswith(key) and len(suggestions) < limit:
+                name, alias = entries[i]
+                if name not in seen:
+                    seen.add(name)
+                    # Only worth showing when the name itself doesn't start with what was typed
+                    if alias and canonical_skill(name).startswith(key):
+                        alias = None
+                    suggestions.append({'name': name, 'alias': alias})
+                i += 1
+        return suggestions
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _index_version(conn):
+    return tuple(catalog_version(conn, table) for table in ('career_paths', 'skills', 'skill_aliases'))
+
+
+def get_skill_index(conn):
+    """Return the shared index, rebuilding it when skills, careers or aliases have changed"""
+    global _index
+    version = _index_version(conn)
+    index = _index
+    if index is not None and index.version == version:
+        return index
+
+    with _index_lock:
+        if _index is None or _index.version != version:
+            names = [row[0] for row in conn.execute('SELECT name FROM skills ORDER BY id')]
+            names += [row[0] for row in conn.execute('SELECT DISTINCT skill FROM career_skills')]
+            aliases = conn.execute('SELECT alias, skill FROM skill_aliases').fetchall()
+            _index = SkillIndex(names, aliases, version=version)
+        return _index
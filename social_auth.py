@@ -6,11 +6,10 @@ Handles Google and LinkedIn OAuth integration
 from flask import Blueprint, request, jsonify, session, redirect, url_for
 import os
 import json
-import requests
 from datetime import datetime, timedelta
-import jwt
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
+
+# jwt, requests and google-auth are imported where they are used, so that
+# loading this blueprint doesn't add them to every serverless cold start
 
 # Create blueprint
 social_auth_bp = Blueprint('social_auth', __name__)
@@ -31,6 +30,7 @@ users_db = {}
 
 def generate_user_token(user_id):
     """Generate JWT token for user"""
+    import jwt
     payload = {
         'user_id': user_id,
         'exp': datetime.utcnow() + timedelta(days=7)
@@ -81,6 +81,8 @@ def google_auth():
             })
         
         # Verify the Google ID token
+        from google.oauth2 import id_token
+        from google.auth.transport import requests as google_requests
         try:
             idinfo = id_token.verify_oauth2_token(
                 token, 
@@ -242,6 +244,7 @@ def linkedin_auth():
 @social_auth_bp.route('/auth/linkedin/exchange', methods=['POST'])
 def linkedin_exchange_code():
     """Exchange LinkedIn authorization code for access token"""
+    import requests
     try:
         data = request.get_json()
         code = data.get('code')
@@ -3,6 +3,7 @@
 // Load skills on page load
 document.addEventListener('DOMContentLoaded', function() {
     loadSkills();
+    setupSkillSearch();
     setupRangeSliders();
 });
 
@@ -23,6 +24,65 @@ async function loadSkills() {
     }
 }
 
+// Skill autocomplete: suggestions come from /api/skills/suggest as the user types
+function setupSkillSearch() {
+    const input = document.getElementById('skillSearch');
+    const datalist = document.getElementById('skillSuggestions');
+    let latest = '';
+    
+    input.addEventListener('input', async function() {
+        const query = input.value.trim();
+        latest = query;
+        if (!query) {
+            datalist.innerHTML = '';
+            return;
+        }
+        
+        // A picked suggestion fires input too: select it instead of searching again
+        const picked = Array.from(datalist.options).find(option => option.value === input.value);
+        if (picked) {
+            selectSkill(picked.value);
+            input.value = '';
+            datalist.innerHTML = '';
+            return;
+        }
+        
+        try {
+            const response = await fetch(`/api/skills/suggest?q=${encodeURIComponent(query)}`);
+            const data = await response.json();
+            if (query !== latest || !data.success) {
+                return;  // a newer keystroke has already been sent
+            }
+            datalist.innerHTML = '';
+            data.suggestions.forEach(suggestion => {
+                const option = document.createElement('option');
+                option.value = suggestion.name;
+                if (suggestion.alias) {
+                    option.label = `${suggestion.alias} → ${suggestion.name}`;
+                }
+                datalist.appendChild(option);
+            });
+        } catch (error) {
+            console.error('Error loading skill suggestions:', error);
+        }
+    });
+}
+
+// Mark a skill as selected, adding it to the grid if it isn't listed there
+function selectSkill(skillName) {
+    const grid = document.getElementById('technicalSkills');
+    let element = Array.from(grid.querySelectorAll('.skill-checkbox'))
+        .find(el => el.textContent.trim() === skillName);
+    if (!element) {
+        element = document.createElement('div');
+        element.className = 'skill-checkbox';
+        element.textContent = skillName;
+        element.addEventListener('click', () => toggleSkill(element, skillName));
+        grid.appendChild(element);
+    }
+    element.classList.add('selected');
+}
+
 // Toggle skill selection
 function toggleSkill(element, skillName) {
     element.classList.toggle('selected');
@@ -39,7 +99,7 @@ function setupRangeSliders() {
 }
 
 // Submit assessment
-async function submitAssessment() {
+function submitAssessment() {
     const userId = localStorage.getItem('userId');
     
     if (!userId) {
@@ -48,9 +108,9 @@ async function submitAssessment() {
         return;
     }
     
-    // Collect selected skills
-    const selectedSkills = Array.from(document.querySelectorAll('.skill-checkbox.selected'))
-        .map(el => el.textContent.trim());
+    // Collect selected skills, including ones picked through the autocomplete
+    const selectedSkills = new Set(Array.from(document.querySelectorAll('.skill-checkbox.selected'))
+        .map(el => el.textContent.trim()));
     
     // Collect soft skills ratings
     const softSkills = {
@@ -64,42 +124,18 @@ async function submitAssessment() {
     const interests = Array.from(document.querySelectorAll('.interest-options input:checked'))
         .map(el => el.value);
     
-    // Get future goals
-    const futureGoals = document.getElementById('futureGoals').value;
-    
     // Add high-rated soft skills to skills list
     Object.entries(softSkills).forEach(([skill, rating]) => {
         if (parseInt(rating) >= 4) {
-            selectedSkills.push('Communication Skills');
+            selectedSkills.add('Communication Skills');
         }
     });
     
-    // Update user profile with new skills
-    try {
-        // First, run the assessment
-        const response = await fetch('/api/assess', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                user_id: parseInt(userId),
-                skills: selectedSkills,
-                interests: interests,
-                future_goals: futureGoals
-            })
-        });
-        
-        const data = await response.json();
-        
-        if (data.success) {
-            alert('Assessment complete! Redirecting to your results...');
-            window.location.href = '/dashboard';
-        } else {
-            alert('Assessment failed: ' + data.message);
-        }
-    } catch (error) {
-        console.error('Error:', error);
-        alert('An error occurred during assessment');
-    }
+    // The dashboard saves the profile and runs the assessment in one request,
+    // showing results as they arrive
+    localStorage.setItem('assessmentPending', JSON.stringify({
+        skills: Array.from(selectedSkills),
+        interests: interests
+    }));
+    window.location.href = '/dashboard';
 }
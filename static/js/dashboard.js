@@ -6,10 +6,27 @@ document.addEventListener('DOMContentLoaded', function() {
     if (userName) {
         document.getElementById('userName').textContent = userName;
     }
+    
+    // Run the assessment started from the assessment page
+    const pending = localStorage.getItem('assessmentPending');
+    if (pending) {
+        localStorage.removeItem('assessmentPending');
+        runAssessment(parsePendingProfile(pending));
+    }
 });
 
-// Run career assessment
-async function runAssessment() {
+// Skills and interests submitted on the assessment page, or null if there are none
+function parsePendingProfile(pending) {
+    try {
+        const profile = JSON.parse(pending);
+        return profile && typeof profile === 'object' ? profile : null;
+    } catch (error) {
+        return null;
+    }
+}
+
+// Run career assessment; a profile from the assessment page is saved before scoring
+async function runAssessment(profile) {
     const userId = localStorage.getItem('userId');
     
     if (!userId) {
@@ -20,15 +37,27 @@ async function runAssessment() {
     
     document.getElementById('loadingMessage').textContent = 'Analyzing your profile...';
     
+    // Stream results as each career is scored where the browser can read a response
+    // incrementally; otherwise wait for the whole JSON response. Both are answered by
+    // the same request, so they work on serverless hosts where background jobs don't.
+    const streaming = typeof TextDecoder !== 'undefined' && window.ReadableStream;
+    
     try {
         const response = await fetch('/api/assess', {
             method: 'POST',
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'Accept': streaming ? 'application/x-ndjson' : 'application/json'
             },
-            body: JSON.stringify({ user_id: parseInt(userId) })
+            body: JSON.stringify(Object.assign({ user_id: parseInt(userId) }, profile || {}))
         });
         
+        const contentType = response.headers.get('Content-Type') || '';
+        if (streaming && response.body && contentType.startsWith('application/x-ndjson')) {
+            await readAssessmentStream(response);
+            return;
+        }
+        
         const data = await response.json();
         
         if (data.success) {
@@ -42,6 +71,63 @@ async function runAssessment() {
     }
 }
 
+// Read an NDJSON assessment: a summary line, one line per career, then the final result
+async function readAssessmentStream(response) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    const partial = [];
+    let total = null;
+    let buffer = '';
+    
+    const handle = function(line) {
+        if (!line.trim()) {
+            return;
+        }
+        const message = JSON.parse(line);
+        if (message.type === 'summary') {
+            total = message.total_careers;
+        } else if (message.type === 'career') {
+            partial.push(message);
+            displayPartialRecommendations(partial, total);
+        } else if (message.type === 'result') {
+            displayRecommendations(message);
+        } else if (message.type === 'error') {
+            alert('Assessment failed: ' + message.message);
+        }
+    };
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) {
+            break;
+        }
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.forEach(handle);
+    }
+    handle(buffer + decoder.decode());
+}
+
+// Show the best careers scored so far while the assessment is still running
+function displayPartialRecommendations(partial, total) {
+    if (partial.length === 0) {
+        return;
+    }
+    
+    const ranked = [...partial].sort((a, b) => b.match_score - a.match_score);
+    
+    const loadingMessage = document.getElementById('loadingMessage');
+    loadingMessage.style.display = 'block';
+    loadingMessage.textContent = `Analyzed ${partial.length}${total ? ' of ' + total : ''} careers...`;
+    document.getElementById('recommendationsContainer').style.display = 'block';
+    
+    document.getElementById('careersAnalyzed').textContent = partial.length;
+    document.getElementById('topMatchScore').textContent = Math.round(ranked[0].match_score) + '%';
+    
+    renderRecommendationCards(ranked.slice(0, 5));
+}
+
 // Display recommendations
 function displayRecommendations(data) {
     // Hide loading message
@@ -53,9 +139,13 @@ function displayRecommendations(data) {
     document.getElementById('topMatchScore').textContent = Math.round(data.assessment_summary.top_match_score) + '%';
     document.getElementById('skillsEvaluated').textContent = data.assessment_summary.skills_evaluated;
     
-    // Display recommendations
+    renderRecommendationCards(data.recommendations);
+}
+
+// Render recommendation cards
+function renderRecommendationCards(recommendations) {
     const recommendationsList = document.getElementById('recommendationsList');
-    recommendationsList.innerHTML = data.recommendations.map((rec, index) => `
+    recommendationsList.innerHTML = recommendations.map((rec, index) => `
         <div class="recommendation-card">
             <span class="match-score">${Math.round(rec.match_score)}% Match</span>
             <h3>${index + 1}. ${rec.career_title}</h3>
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+# The app is a set of top-level modules, so tests import them from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    """The Flask app over a fresh seeded database, with every process-wide catalog cache reset"""
+    import app as app_module
+    import embeddings
+    import scoring
+    import skill_index
+    from catalog import CatalogResponseCache
+    from database.init_db import seed_sample_data
+    from database.migrations import migrate
+    from db import ConnectionPool
+
+    path = str(tmp_path / 'app.db')
+    pool = ConnectionPool(path, setup=migrate)
+    pool.acquire().close()
+    seed_sample_data(path)
+
+    monkeypatch.setattr(app_module, 'db_pool', pool)
+    monkeypatch.setattr(app_module, 'catalog_pool', None)
+    monkeypatch.setattr(app_module, 'catalog_cache', CatalogResponseCache())
+    monkeypatch.setattr(app_module, 'assessment_writer', None)
+    monkeypatch.setattr(app_module, 'model', None)
+    monkeypatch.setattr(scoring, '_engine', None)
+    monkeypatch.setattr(skill_index, '_index', None)
+    monkeypatch.setattr(embeddings, '_index', None)
+    yield app_module
+    pool.close_all()
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,58 @@
+"""
+Test doubles for the Gemini model and the clock
+"""
+
+import random
+import threading
+import time
+
+
+class StubResponse:
+    """Minimal stand-in for a Gemini GenerateContentResponse"""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """
+    Offline stand-in for genai.GenerativeModel. Sleeps `latency` seconds per
+    call and raises `error` (a RuntimeError by default) on a `failure_rate`
+    fraction of calls. `text` may be a callable that builds the response
+    text from the prompt.
+    """
+
+    def __init__(self, latency=0.0, failure_rate=0.0, text=None, seed=None, error=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.error = error
+        self.text = text or '{"match_score": 75, "reasoning": "Stub analysis.", "skill_gaps": []}'
+        self.calls = 0
+        self.prompts = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.prompts.append(prompt)
+            fail = self.failure_rate and self._random.random() < self.failure_rate
+        latency = self.latency(prompt) if callable(self.latency) else self.latency
+        if latency:
+            time.sleep(latency)
+        if fail:
+            raise self.error or RuntimeError('Stub model failure')
+        return StubResponse(self.text(prompt) if callable(self.text) else self.text)
+
+
+class FakeClock:
+    """Manually advanced replacement for time.monotonic"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
@@ -0,0 +1,36 @@
+import json
+
+from ai_cache import AnalysisCache, cache_key, normalize_profile
+from ai_engine import analyze_careers
+from stubs import StubModel
+
+USER = {'education_level': 'Undergraduate', 'age': 20}
+CAREER = {'id': 1, 'title': 'Data Scientist', 'industry': 'Technology',
+          'description': 'Analyze data', 'required_skills': json.dumps(['Python'])}
+
+
+def test_cache_key_follows_the_skills_used_for_scoring():
+    profile = normalize_profile(USER, ['data'], ['Python'])
+    key = cache_key(profile, CAREER, ['Python'])
+    assert key == cache_key(profile, dict(CAREER), ['Python'])
+    # career_skills changed while the JSON column did not
+    assert key != cache_key(profile, CAREER, ['Python', 'SQL'])
+    assert key != cache_key(profile, CAREER, ['Python'], mode='batch')
+
+
+def test_normalized_skills_reach_the_prompt_and_the_cache():
+    cache = AnalysisCache(max_entries=10, ttl=0)
+    model = StubModel()
+    analyze_careers(model, USER, ['data'], ['Python'], [CAREER], batch_size=0, cache=cache,
+                    token_budget=0, required_skills=[['Python', 'SQL']])
+    assert 'Required Skills: Python, SQL' in model.prompts[0]
+
+    # Same skills: served from the cache
+    analyze_careers(model, USER, ['data'], ['Python'], [CAREER], batch_size=0, cache=cache,
+                    token_budget=0, required_skills=[['Python', 'SQL']])
+    assert model.calls == 1
+
+    # The career's skills were edited: the cached analysis no longer applies
+    analyze_careers(model, USER, ['data'], ['Python'], [CAREER], batch_size=0, cache=cache,
+                    token_budget=0, required_skills=[['Python', 'Spark']])
+    assert model.calls == 2
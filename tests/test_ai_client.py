@@ -0,0 +1,110 @@
+import pytest
+
+from ai_client import CircuitBreaker, CircuitOpenError, ResilientModel, TokenBucket
+from stubs import FakeClock, StubModel
+
+
+def test_token_bucket_allows_a_burst_then_the_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+    assert bucket.acquire(0)
+    assert bucket.acquire(0)
+    assert not bucket.acquire(0)
+
+    clock.advance(0.5)
+    assert bucket.acquire(0)
+    assert not bucket.acquire(0)
+
+
+def test_token_bucket_refill_is_capped_at_the_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+    clock.advance(100)
+    assert bucket.acquire(0) and bucket.acquire(0)
+    assert not bucket.acquire(0)
+
+
+def test_token_bucket_rate_zero_is_unlimited():
+    bucket = TokenBucket(rate=0, burst=1, clock=FakeClock())
+    assert all(bucket.acquire(0) for _ in range(100))
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=FakeClock())
+    assert not breaker.record_failure()
+    breaker.record_success()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == 'open'
+    assert breaker.is_open
+    assert not breaker.allow()
+
+
+def test_breaker_half_open_lets_one_trial_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=clock)
+    breaker.record_failure()
+
+    clock.advance(9)
+    assert not breaker.allow()
+    clock.advance(1)
+    assert not breaker.is_open
+    assert breaker.allow()
+    assert breaker.state == 'half_open'
+    assert not breaker.allow()
+    assert breaker.is_open
+
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+
+def test_breaker_failed_trial_reopens_for_another_period():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=10, clock=clock)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.advance(10)
+    assert breaker.allow()
+    assert breaker.record_failure()
+    assert breaker.state == 'open'
+    assert breaker.times_opened == 2
+
+    clock.advance(5)
+    assert not breaker.allow()
+    clock.advance(5)
+    assert breaker.allow()
+
+
+def test_breaker_cancelled_trial_frees_the_slot():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=1, clock=clock)
+    breaker.record_failure()
+    clock.advance(1)
+    assert breaker.allow()
+    breaker.cancel_trial()
+    assert breaker.allow()
+
+
+def test_resilient_model_short_circuits_while_open():
+    clock = FakeClock()
+    stub = StubModel(failure_rate=1.0)
+    model = ResilientModel(stub, rate=0, max_concurrency=2, queue_timeout=0,
+                           failure_threshold=2, reset_seconds=30, clock=clock)
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match='Stub model failure'):
+            model.generate_content('prompt')
+    assert not model.available
+
+    with pytest.raises(CircuitOpenError):
+        model.generate_content('prompt')
+    assert stub.calls == 2
+    assert model.stats()['short_circuited'] == 1
+
+    # After the reset period a successful trial closes the breaker again
+    clock.advance(30)
+    stub.failure_rate = 0.0
+    assert model.generate_content('prompt').text
+    assert model.available
+    assert model.stats()['breaker_state'] == 'closed'
@@ -0,0 +1,102 @@
+import json
+import re
+import time
+
+from ai_engine import analyze_careers, iter_batch_analyses, iter_completed
+from stubs import StubModel
+
+USER = {'education_level': 'Undergraduate', 'age': 20}
+
+
+def career(career_id, title, skills):
+    return {'id': career_id, 'title': title, 'industry': 'Technology',
+            'required_skills': json.dumps(skills)}
+
+
+CAREERS = [
+    career(1, 'Data Scientist', ['Python', 'Statistics']),
+    career(2, 'Web Developer', ['JavaScript', 'HTML']),
+    career(3, 'Cloud Engineer', ['AWS', 'Linux'])
+]
+
+
+def sleeper(seconds, value):
+    def call():
+        time.sleep(seconds)
+        return value
+    return call
+
+
+def test_iter_completed_yields_in_completion_order():
+    calls = [sleeper(0.3, 'a'), sleeper(0.15, 'b'), sleeper(0.0, 'c')]
+    results = list(iter_completed(calls, max_workers=3, timeout=5))
+    assert [index for index, _, _ in results] == [2, 1, 0]
+    assert [result for _, result, _ in results] == ['c', 'b', 'a']
+    assert all(error is None for _, _, error in results)
+
+
+def test_iter_completed_reports_errors():
+    def boom():
+        raise ValueError('boom')
+
+    results = {index: (result, error) for index, result, error in iter_completed([boom, sleeper(0, 1)])}
+    assert isinstance(results[0][1], ValueError)
+    assert results[1] == (1, None)
+
+
+def test_iter_completed_abandons_calls_past_the_timeout():
+    started = time.monotonic()
+    results = {index: (result, error)
+               for index, result, error in iter_completed([sleeper(2, 'slow'), sleeper(0, 'fast')],
+                                                          max_workers=2, timeout=0.2)}
+    assert time.monotonic() - started < 1.5
+    assert results[1] == ('fast', None)
+    assert results[0][0] is None
+    assert isinstance(results[0][1], TimeoutError)
+
+
+def test_analyze_careers_returns_catalog_order():
+    # Later careers answer first, so completion order is the reverse of catalog order
+    delays = {'Data Scientist': 0.2, 'Web Developer': 0.1, 'Cloud Engineer': 0.0}
+    model = StubModel(latency=lambda prompt: next(d for t, d in delays.items() if t in prompt))
+    recommendations = analyze_careers(model, USER, ['Technology'], ['Python'], CAREERS,
+                                      max_workers=3, timeout=5, batch_size=0, token_budget=0)
+    assert [r['career_id'] for r in recommendations] == [1, 2, 3]
+    assert all(r['reasoning'] == 'Stub analysis.' for r in recommendations)
+    assert model.calls == 3
+
+
+def test_timed_out_call_falls_back_to_skill_overlap():
+    model = StubModel(latency=lambda prompt: 2 if 'Web Developer' in prompt else 0)
+    recommendations = analyze_careers(model, USER, ['Technology'], ['JavaScript'], CAREERS,
+                                      max_workers=3, timeout=0.2, batch_size=0, token_budget=0)
+    web = recommendations[1]
+    assert web['career_id'] == 2
+    assert web['reasoning'] == 'You have 1 out of 2 required skills.'
+    assert web['match_score'] == 50
+    assert recommendations[0]['reasoning'] == 'Stub analysis.'
+
+
+def first_career_only(prompt):
+    """Answer for the first career of a batch prompt and drop the rest"""
+    career_id = int(re.search(r'career_id (\d+)', prompt).group(1))
+    return json.dumps([{'career_id': career_id, 'match_score': 80,
+                        'reasoning': f'Analysis of {career_id}.', 'skill_gaps': []}])
+
+
+def test_batch_retries_careers_missing_from_response():
+    model = StubModel(text=first_career_only)
+    results = dict(iter_batch_analyses(model, USER, ['Technology'], [], CAREERS[:2],
+                                       batch_size=2, timeout=5, retries=1, token_budget=0))
+    assert model.calls == 2
+    assert 'career_id 2' in model.prompts[1] and 'career_id 1' not in model.prompts[1]
+    assert [results[i]['reasoning'] for i in (0, 1)] == ['Analysis of 1.', 'Analysis of 2.']
+
+
+def test_batch_falls_back_once_retries_run_out():
+    model = StubModel(text=first_career_only)
+    results = dict(iter_batch_analyses(model, USER, ['Technology'], [], CAREERS[:2],
+                                       batch_size=2, timeout=5, retries=0, token_budget=0))
+    assert model.calls == 1
+    assert results[0]['reasoning'] == 'Analysis of 1.'
+    assert results[1]['reasoning'] == 'You have 0 out of 2 required skills.'
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from ai_response import (JsonStreamExtractor, extract_json_values, parse_batch_response,
+                         parse_career_analysis)
+
+
+def test_extracts_objects_around_prose_and_fences():
+    text = 'Here you go:\n```json\n{"a": 1}\n```\nand also [1, 2]'
+    assert extract_json_values(text) == ([{'a': 1}, [1, 2]], None)
+
+
+def test_values_split_across_chunks():
+    extractor = JsonStreamExtractor()
+    assert extractor.feed('[{"career_id": 1, "reas') == []
+    assert extractor.feed('oning": "ok"}, {"career_id"') == []
+    assert extractor.feed(': 2}] trailing') == [[{'career_id': 1, 'reasoning': 'ok'}, {'career_id': 2}]]
+    assert extractor.close() == ([], None)
+
+
+def test_brackets_inside_strings_are_ignored():
+    values, partial = extract_json_values('{"reasoning": "use {braces} and ]brackets[ \\" freely"}')
+    assert values == [{'reasoning': 'use {braces} and ]brackets[ " freely'}]
+    assert partial is None
+
+
+def test_close_repairs_a_truncated_value():
+    extractor = JsonStreamExtractor()
+    extractor.feed('[{"career_id": 1, "match_score": 70}, {"career_id": 2, "reasoning": "cut of')
+    assert extractor.close() == ([], [{'career_id': 1, 'match_score': 70},
+                                      {'career_id': 2, 'reasoning': 'cut of'}])
+
+
+def test_close_drops_a_half_written_member():
+    extractor = JsonStreamExtractor()
+    extractor.feed('{"match_score": 70, "reasoning": "fine", "skill_gaps": ["SQL", ')
+    assert extractor.close() == ([], {'match_score': 70, 'reasoning': 'fine', 'skill_gaps': ['SQL']})
+
+
+def test_mismatched_brackets_are_treated_as_prose():
+    assert extract_json_values('(see [note}) then {"a": 1}') == ([{'a': 1}], None)
+
+
+def test_stray_brace_that_never_closes_does_not_swallow_the_value():
+    text = 'Scores use a {0-100 scale. {"match_score": 70, "reasoning": "Good fit."}'
+    assert extract_json_values(text) == ([{'match_score': 70, 'reasoning': 'Good fit.'}], None)
+
+
+def test_stray_brace_that_closes_later_does_not_swallow_the_value():
+    text = 'Result {see below: {"match_score": 70, "reasoning": "Good fit."} end}'
+    assert extract_json_values(text) == ([{'match_score': 70, 'reasoning': 'Good fit.'}], None)
+
+
+def test_stray_bracket_closed_by_a_brace_does_not_swallow_the_value():
+    text = 'Note [1: {"match_score": 70, "reasoning": "Good fit."} }'
+    assert extract_json_values(text) == ([{'match_score': 70, 'reasoning': 'Good fit.'}], None)
+
+
+def test_stray_brace_before_a_truncated_value_still_repairs_it():
+    extractor = JsonStreamExtractor()
+    assert extractor.feed('A {brace. {"match_score": 70, "reasoning": "ok"}, {"match_score": 5') == []
+    assert extractor.close() == ([{'match_score': 70, 'reasoning': 'ok'}], {'match_score': 5})
+
+
+def test_parse_career_analysis_after_a_stray_brace():
+    analysis = parse_career_analysis('Scores are {0-100}. {"match_score": 64, "reasoning": "Decent."')
+    assert analysis.match_score == 64.0
+
+
+def test_parse_batch_response_keeps_known_careers():
+    text = '[{"career_id": 1, "match_score": 80, "reasoning": "Good."},' \
+           ' {"career_id": 9, "match_score": 50, "reasoning": "Unknown."},' \
+           ' {"career_id": 2, "match_score": "x", "reasoning": "Bad score."}]'
+    parsed = parse_batch_response(text, {1, 2})
+    assert list(parsed) == [1]
+    assert parsed[1].match_score == 80.0
+
+
+@pytest.mark.parametrize('junk', ['{' * 3000, '[' * 3000, '{"a": [' * 1500, '{x ' * 3000 + '{"match_score": 1}',
+                                  '{x} ' * 3000, '[' * 3000 + ']' * 3000],
+                         ids=['braces', 'brackets', 'nested', 'unclosed prose', 'closed prose', 'deep array'])
+def test_pathological_input_is_bounded(junk):
+    started = time.monotonic()
+    extract_json_values(junk)
+    assert time.monotonic() - started < 2
@@ -0,0 +1,90 @@
+import json
+
+from assessments import TOP_ASSESSMENT, TOP_RECOMMENDATIONS
+from batch_assess import start_run
+from jobs import AssessmentJob
+
+
+def register(client, skills=('Python',), interests=('Technology',)):
+    response = client.post('/api/register', json={
+        'name': 'Asha', 'email': 'asha@example.com', 'age': 20, 'education_level': 'Undergraduate',
+        'interests': list(interests), 'current_skills': list(skills)
+    })
+    return response.get_json()['user_id']
+
+
+def test_assess_saves_submitted_skills_before_scoring(client, app_module):
+    user_id = register(client, skills=())
+    response = client.post('/api/assess', json={'user_id': user_id, 'skills': ['python', 'SQL'],
+                                                'interests': ['Data']})
+    data = response.get_json()
+    assert data['success']
+    assert data['assessment_summary']['skills_evaluated'] == 2
+    assert data['recommendations'][0]['match_score'] > 0
+
+    conn = app_module.get_db_connection()
+    try:
+        user = conn.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+        linked = [row[0] for row in conn.execute(
+            'SELECT skill FROM user_skills WHERE user_id = ? ORDER BY position', (user_id,))]
+    finally:
+        conn.close()
+    assert json.loads(user['current_skills']) == ['Python', 'SQL'] == linked
+    assert json.loads(user['interests']) == ['Data']
+
+
+def test_assess_rejects_malformed_skills(client):
+    user_id = register(client)
+    response = client.post('/api/assess', json={'user_id': user_id, 'skills': 'Python'})
+    assert response.status_code == 400
+
+
+def test_assess_streams_ndjson(client):
+    user_id = register(client)
+    response = client.post('/api/assess', json={'user_id': user_id},
+                           headers={'Accept': 'application/x-ndjson'})
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines[0]['type'] == 'summary'
+    assert {line['type'] for line in lines[1:-1]} == {'career'}
+    assert lines[-1]['type'] == 'result' and lines[-1]['success']
+    assert len(lines) - 2 == lines[0]['total_careers']
+
+
+def test_assessment_is_saved_when_the_stream_is_abandoned(client, app_module):
+    user_id = register(client)
+    response = client.post('/api/assess', json={'user_id': user_id},
+                           headers={'Accept': 'application/x-ndjson'}, buffered=False)
+    first = json.loads(next(iter(response.response)))
+    assert first['type'] == 'summary'
+    response.close()
+
+    conn = app_module.get_db_connection()
+    try:
+        [assessment] = conn.execute('SELECT * FROM assessments WHERE user_id = ?', (user_id,)).fetchall()
+        saved = conn.execute('SELECT COUNT(*) FROM recommendations WHERE user_id = ?', (user_id,)).fetchone()[0]
+    finally:
+        conn.close()
+    assert len(json.loads(assessment['recommendations'])) == min(TOP_ASSESSMENT, first['total_careers'])
+    assert saved == min(TOP_RECOMMENDATIONS, first['total_careers'])
+
+
+def test_batch_resume_of_a_running_run_needs_force(client, app_module, monkeypatch):
+    submitted = []
+
+    def submit(func, *args):
+        submitted.append(args)
+        return AssessmentJob()
+
+    monkeypatch.setattr(app_module.assessment_jobs, 'submit', submit)
+    conn = app_module.get_db_connection()
+    try:
+        run_id = start_run(conn, 'rules')['id']
+    finally:
+        conn.close()
+
+    response = client.post('/api/assess/batch', json={'resume': run_id})
+    assert response.status_code == 409 and not submitted
+    response = client.post('/api/assess/batch', json={'resume': run_id, 'force': True})
+    assert response.status_code == 202 and len(submitted) == 1
+    assert client.post('/api/assess/batch', json={'resume': run_id + 1}).status_code == 404
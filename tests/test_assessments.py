@@ -0,0 +1,97 @@
+import sqlite3
+import threading
+
+import pytest
+
+from assessments import AssessmentWriter, assessment_rows
+from database.migrations import migrate
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'writer.db')
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    conn.close()
+    return path
+
+
+def rows(user_id):
+    recommendation = {'career_id': 1, 'match_score': 50.0, 'reasoning': 'ok', 'skill_gaps': []}
+    return assessment_rows(user_id, ['Python'], ['Data'], [recommendation])
+
+
+def counts(path):
+    conn = sqlite3.connect(path)
+    try:
+        return tuple(conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                     for table in ('assessments', 'recommendations'))
+    finally:
+        conn.close()
+
+
+def test_flush_writes_everything_queued_in_batches(db_path):
+    writer = AssessmentWriter(lambda: sqlite3.connect(db_path), batch_size=4, interval=0.05)
+    try:
+        assert all(writer.submit(*rows(user_id)) for user_id in range(10))
+        writer.flush()
+        assert counts(db_path) == (10, 10)
+        stats = writer.stats()
+        assert stats['written'] == stats['queued'] == 10
+        assert stats['pending'] == stats['failed'] == 0
+        assert stats['batches'] >= 3
+    finally:
+        writer.close()
+
+
+def test_close_writes_what_is_queued_and_refuses_more(db_path):
+    writer = AssessmentWriter(lambda: sqlite3.connect(db_path), batch_size=100, interval=60)
+    for user_id in range(5):
+        writer.submit(*rows(user_id))
+    writer.close()
+    assert counts(db_path) == (5, 5)
+    assert not writer.submit(*rows(6))
+    writer.close()
+    assert counts(db_path) == (5, 5)
+
+
+def test_failed_batch_does_not_stop_the_writer(db_path):
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise sqlite3.OperationalError('database is locked')
+        return sqlite3.connect(db_path)
+
+    writer = AssessmentWriter(connect, batch_size=1, interval=0)
+    try:
+        writer.submit(*rows(1))
+        writer.flush()
+        writer.submit(*rows(2))
+        writer.flush()
+        assert writer.stats()['failed'] == 1
+        assert writer.stats()['written'] == 1
+        assert counts(db_path) == (1, 1)
+    finally:
+        writer.close()
+
+
+def test_full_queue_rejects_after_block_seconds(db_path):
+    release = threading.Event()
+
+    def connect():
+        release.wait()
+        return sqlite3.connect(db_path)
+
+    writer = AssessmentWriter(connect, batch_size=1, interval=0, max_queue=1, block_seconds=0.05)
+    try:
+        # The writer thread holds the first item in connect(); the second fills the queue
+        assert writer.submit(*rows(1))
+        accepted = [writer.submit(*rows(user_id)) for user_id in range(2, 5)]
+        assert False in accepted
+        assert writer.stats()['rejected'] == accepted.count(False)
+    finally:
+        release.set()
+        writer.close()
+    assert counts(db_path)[0] == 1 + accepted.count(True)
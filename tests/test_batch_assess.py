@@ -0,0 +1,86 @@
+import json
+import sqlite3
+
+import pytest
+
+import scoring
+from batch_assess import claim_run, load_run, main, run_batch, start_run
+from catalog_snapshot import build_snapshot
+from database.migrations import migrate
+from db import ConnectionPool, SnapshotPool
+
+
+def make_database(path, careers, users=()):
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    conn.executemany('''
+        INSERT INTO career_paths (id, title, description, required_skills, industry)
+        VALUES (?, ?, '', ?, 'Technology')
+    ''', [(career_id, title, json.dumps(skills)) for career_id, title, skills in careers])
+    conn.executemany('''
+        INSERT INTO users (name, email, age, education_level, interests, current_skills)
+        VALUES (?, ?, 20, 'Undergraduate', '[]', ?)
+    ''', [(name, f'{name}@example.com', json.dumps(skills)) for name, skills in users])
+    conn.commit()
+    conn.close()
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_batch_reads_the_catalog_from_the_snapshot(tmp_path, monkeypatch, processes):
+    monkeypatch.setattr(scoring, '_engine', None)
+    db_path, source_path, snapshot_path = (str(tmp_path / name) for name in ('app.db', 'src.db', 'snap.db'))
+    make_database(db_path, [(1, 'Database Career', ['Python'])], users=[('asha', ['Python'])])
+    make_database(source_path, [(7, 'Snapshot Career', ['Python'])])
+    build_snapshot(source_path, snapshot_path)
+
+    conn = ConnectionPool(db_path, max_idle=0).acquire()
+    catalog_conn = SnapshotPool(snapshot_path, max_idle=0).acquire()
+    try:
+        run = run_batch(conn, start_run(conn, 'rules'), processes=processes, db_path=db_path,
+                        catalog_conn=catalog_conn, catalog_path=snapshot_path)
+        assert run['status'] == 'done' and run['processed'] == 1
+        career_ids = [row[0] for row in conn.execute('SELECT career_path_id FROM recommendations')]
+        assert career_ids == [7]
+    finally:
+        catalog_conn.close()
+        conn.close()
+
+
+def test_running_run_is_only_claimed_with_force(tmp_path):
+    db_path = str(tmp_path / 'app.db')
+    make_database(db_path, [(1, 'Career', ['Python'])])
+    conn = ConnectionPool(db_path, max_idle=0).acquire()
+    try:
+        run = start_run(conn, 'rules')
+        assert run['status'] == 'running'
+        assert not claim_run(conn, run['id'])
+        assert claim_run(conn, run['id'], force=True)
+
+        conn.execute("UPDATE batch_assessment_runs SET status = 'failed' WHERE id = ?", (run['id'],))
+        assert claim_run(conn, run['id'])
+        assert load_run(conn, run['id'])['status'] == 'running'
+    finally:
+        conn.close()
+
+
+def test_cli_refuses_to_resume_a_running_run_without_force(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(scoring, '_engine', None)
+    db_path = str(tmp_path / 'app.db')
+    make_database(db_path, [(1, 'Career', ['Python'])], users=[('asha', ['Python'])])
+    conn = ConnectionPool(db_path, max_idle=0).acquire()
+    try:
+        run_id = start_run(conn, 'rules')['id']
+    finally:
+        conn.close()
+    args = ['--db', db_path, '--catalog', str(tmp_path / 'no-snapshot.db'), '--resume', str(run_id)]
+
+    assert main(args) == 1
+    assert 'already running' in capsys.readouterr().out
+    assert main(args + ['--force']) == 0
+
+    conn = ConnectionPool(db_path, max_idle=0).acquire()
+    try:
+        run = load_run(conn, run_id)
+        assert run['status'] == 'done' and run['processed'] == 1
+    finally:
+        conn.close()
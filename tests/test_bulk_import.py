@@ -0,0 +1,55 @@
+import io
+import json
+
+from bulk_import import text_stream
+
+CSV = ('name,email,age,education_level,interests,current_skills\n'
+       'Asha,asha@example.com,20,Undergraduate,Technology;Data,python;SQL\n'
+       'Ravi,ravi@example.com,abc,Undergraduate,,\n'
+       'Asha Again,asha@example.com,21,Undergraduate,,\n')
+
+
+class SpooledWithoutReadable:
+    """SpooledTemporaryFile as it is before Python 3.11: no readable(), the data in _file"""
+
+    def __init__(self, data):
+        self._file = io.BytesIO(data)
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+
+def test_text_stream_unwraps_a_spooled_upload():
+    stream = text_stream(SpooledWithoutReadable('\ufeffname\nAsha\n'.encode('utf-8')))
+    assert stream.read() == 'name\nAsha\n'
+
+
+def test_multipart_csv_upload(client, app_module):
+    response = client.post('/api/users/import', data={'file': (io.BytesIO(CSV.encode('utf-8')), 'students.csv')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    report = response.get_json()
+    assert (report['rows'], report['imported'], report['invalid'], report['conflicts']) == (3, 1, 1, 1)
+
+    conn = app_module.get_db_connection()
+    try:
+        user = conn.execute("SELECT * FROM users WHERE email = 'asha@example.com'").fetchone()
+        skills = [row[0] for row in conn.execute(
+            'SELECT skill FROM user_skills WHERE user_id = ? ORDER BY position', (user['id'],))]
+    finally:
+        conn.close()
+    # Skills are stored under their catalog names
+    assert json.loads(user['current_skills']) == skills
+    assert 'Python' in skills
+
+
+def test_raw_ndjson_body(client):
+    body = '\n'.join(json.dumps({'name': f'User {i}', 'email': f'user{i}@example.com'}) for i in range(3))
+    response = client.post('/api/users/import?format=ndjson', data=body, content_type='application/x-ndjson')
+    assert response.get_json()['imported'] == 3
+
+
+def test_unknown_format_is_rejected(client):
+    response = client.post('/api/users/import?format=xml', data='<users/>')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
@@ -0,0 +1,108 @@
+from catalog_snapshot import build_snapshot
+from db import SnapshotPool
+
+
+def query(app_module, sql, params=()):
+    conn = app_module.get_db_connection()
+    try:
+        return [dict(row) for row in conn.execute(sql, params).fetchall()]
+    finally:
+        conn.close()
+
+
+def test_careers_list_everything_unpaginated(client, app_module):
+    careers = client.get('/api/careers').get_json()
+    ids = [row['id'] for row in query(app_module, 'SELECT id FROM career_paths ORDER BY id')]
+    assert [c['id'] for c in careers] == ids
+    assert isinstance(careers[0]['required_skills'], list)
+
+
+def test_etag_answers_if_none_match_with_304(client):
+    response = client.get('/api/careers')
+    etag = response.headers['ETag']
+    assert response.status_code == 200 and etag
+
+    cached = client.get('/api/careers', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+    assert client.get('/api/careers?industry=Technology', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_catalog_write_invalidates_the_cached_response(client, app_module):
+    before = client.get('/api/skills')
+    assert client.get('/api/skills').headers['ETag'] == before.headers['ETag']
+    assert app_module.catalog_cache.stats()['hits'] == 1
+
+    conn = app_module.get_db_connection()
+    try:
+        conn.execute("INSERT INTO skills (name, category, learning_resources) VALUES ('Rust', 'Technical', '[]')")
+        conn.commit()
+    finally:
+        conn.close()
+
+    after = client.get('/api/skills', headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert after.headers['ETag'] != before.headers['ETag']
+    assert 'Rust' in [skill['name'] for skill in after.get_json()]
+
+
+def test_keyset_pages_cover_the_catalog_once(client, app_module):
+    ids, after_id = [], 0
+    while after_id is not None:
+        page = client.get(f'/api/careers?after_id={after_id}&limit=2').get_json()
+        assert len(page['items']) <= 2
+        ids.extend(item['id'] for item in page['items'])
+        after_id = page['next_after_id']
+    assert ids == [row['id'] for row in query(app_module, 'SELECT id FROM career_paths ORDER BY id')]
+
+
+def test_last_page_has_no_cursor(client, app_module):
+    [last] = query(app_module, 'SELECT MAX(id) AS id FROM career_paths')
+    page = client.get(f"/api/careers?after_id={last['id']}").get_json()
+    assert page == {'items': [], 'next_after_id': None}
+
+
+def test_fields_projection_always_includes_id(client):
+    skills = client.get('/api/skills?fields=name,category').get_json()
+    assert skills and all(set(skill) == {'id', 'name', 'category'} for skill in skills)
+
+    careers = client.get('/api/careers?fields=title,required_skills&limit=1').get_json()
+    [career] = careers['items']
+    assert set(career) == {'id', 'title', 'required_skills'}
+    assert isinstance(career['required_skills'], list)
+
+
+def test_filters_match_exactly(client, app_module):
+    [row] = query(app_module, 'SELECT industry, growth_potential FROM career_paths ORDER BY id LIMIT 1')
+    careers = client.get('/api/careers', query_string=row).get_json()
+    expected = query(app_module, 'SELECT id FROM career_paths WHERE industry = ? AND growth_potential = ? ORDER BY id',
+                     (row['industry'], row['growth_potential']))
+    assert [c['id'] for c in careers] == [r['id'] for r in expected]
+
+    [row] = query(app_module, 'SELECT category, difficulty_level FROM skills ORDER BY id LIMIT 1')
+    skills = client.get('/api/skills', query_string=row).get_json()
+    assert skills and all(s['category'] == row['category'] and s['difficulty_level'] == row['difficulty_level']
+                          for s in skills)
+    assert client.get('/api/skills?category=No+Such+Category').get_json() == []
+
+
+def test_bad_catalog_arguments_are_rejected(client):
+    for query_string in ('limit=0', 'limit=100000', 'after_id=x', 'fields=title,password'):
+        response = client.get(f'/api/careers?{query_string}')
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
+
+
+def test_db_stats_do_not_expose_snapshot_paths(client, app_module, tmp_path, monkeypatch):
+    snapshot_path = str(tmp_path / 'snapshot.db')
+    build_snapshot(app_module.db_pool.path, snapshot_path)
+    pool = SnapshotPool(snapshot_path)
+    monkeypatch.setattr(app_module, 'catalog_pool', pool)
+    try:
+        snapshot = client.get('/api/db/stats').get_json()['catalog_snapshot']
+    finally:
+        pool.close_all()
+    assert snapshot['path'] == 'snapshot.db'
+    assert snapshot['info']['source'] == 'app.db'
+    assert set(snapshot['info']) == {'source', 'built_at'}
+    assert str(tmp_path) not in repr(snapshot)
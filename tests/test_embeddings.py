@@ -0,0 +1,106 @@
+import json
+import sqlite3
+
+import pytest
+
+import embeddings
+import scoring
+from database.migrations import migrate
+from embeddings import build_index, dot, embed_text, get_embedding_index, load_index, normalize
+from scoring import get_scoring_engine
+
+CAREERS = [
+    {'id': 1, 'title': 'Data Scientist', 'industry': 'Technology', 'description': 'Machine learning models'},
+    {'id': 2, 'title': 'Graphic Designer', 'industry': 'Media', 'description': 'Visual design and branding'},
+    {'id': 3, 'title': 'Data Engineer', 'industry': 'Technology', 'description': 'Data pipelines'},
+    {'id': 4, 'title': 'Chef', 'industry': 'Hospitality', 'description': 'Cooking for restaurants'},
+]
+REQUIRED_SKILLS = [['Python', 'Statistics'], ['Photoshop', 'Illustrator'], ['Python', 'SQL'], ['Cooking']]
+
+
+@pytest.fixture(autouse=True)
+def pure_python(monkeypatch):
+    # The Vercel function has no NumPy; exercise the fallback whether or not it is installed here
+    monkeypatch.setattr(embeddings, 'np', None)
+    monkeypatch.setattr(embeddings, '_index', None)
+
+
+def test_pure_python_search_is_exact_brute_force():
+    index = build_index(CAREERS, REQUIRED_SKILLS, dim=64, nlist=0)
+    query = index.user_vector(['Python'], ['data'])
+    hits, scanned = index.search(query, k=3)
+    assert scanned == len(CAREERS)
+
+    similarities = [dot(index.row(i), query) for i in range(len(CAREERS))]
+    expected = sorted(range(len(CAREERS)), key=lambda i: (-similarities[i], i))[:3]
+    assert [career_id for career_id, _ in hits] == [CAREERS[i]['id'] for i in expected]
+    assert [similarity for _, similarity in hits] == pytest.approx([similarities[i] for i in expected])
+    assert {hits[0][0], hits[1][0]} == {1, 3}
+
+
+def test_ivf_needs_numpy():
+    with pytest.raises(RuntimeError):
+        build_index(CAREERS, REQUIRED_SKILLS, dim=64, nlist=2)
+
+
+def test_saved_index_is_memory_mapped_back(tmp_path):
+    path = str(tmp_path / 'index')
+    index = build_index(CAREERS, REQUIRED_SKILLS, skills=[('Python', 'Programming')], dim=64, nlist=0)
+    index.save(path)
+    loaded = load_index(path)
+    assert loaded.meta == index.meta
+    assert loaded.row(0) == index.row(0)
+    query = normalize(embed_text('cooking', 64))
+    assert loaded.search(query, k=2) == index.search(query, k=2)
+
+
+def test_truncated_index_is_not_loaded(tmp_path):
+    path = str(tmp_path / 'index')
+    build_index(CAREERS, REQUIRED_SKILLS, dim=64, nlist=0).save(path)
+    with open(path + '.f32', 'r+b') as f:
+        f.truncate(10)
+    assert load_index(path) is None
+    assert load_index(str(tmp_path / 'missing')) is None
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    monkeypatch.setattr(scoring, '_engine', None)
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    migrate(conn)
+    for career, required in zip(CAREERS, REQUIRED_SKILLS):
+        conn.execute('''
+            INSERT INTO career_paths (id, title, industry, description, required_skills) VALUES (?, ?, ?, ?, ?)
+        ''', (career['id'], career['title'], career['industry'], career['description'], json.dumps(required)))
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_saved_index_is_used_when_its_digest_matches(catalog, tmp_path):
+    path = str(tmp_path / 'index')
+    engine = get_scoring_engine(catalog)
+    build_index(engine.careers, engine.required_skills, *embeddings.catalog_inputs(catalog), nlist=0).save(path)
+    with open(path + '.json') as f:
+        saved = json.load(f)
+
+    index = get_embedding_index(engine, catalog, path)
+    assert index.meta == saved
+    assert get_embedding_index(engine, catalog, path) is index
+
+
+def test_stale_saved_index_is_rebuilt_in_memory(catalog, tmp_path, capsys):
+    path = str(tmp_path / 'index')
+    engine = get_scoring_engine(catalog)
+    build_index(engine.careers, engine.required_skills, *embeddings.catalog_inputs(catalog), nlist=0).save(path)
+
+    catalog.execute("UPDATE career_paths SET description = 'Deep learning research' WHERE id = 1")
+    catalog.commit()
+    engine = get_scoring_engine(catalog)
+    index = get_embedding_index(engine, catalog, path)
+    assert 'built from another catalog' in capsys.readouterr().out
+    skills, aliases = embeddings.catalog_inputs(catalog)
+    assert index.meta['catalog_sha256'] == \
+        embeddings.catalog_digest(engine.careers, engine.required_skills, skills, aliases)
+    assert sorted(index.career_ids) == [1, 2, 3, 4]
@@ -0,0 +1,20 @@
+import json
+
+
+def test_learning_path_reads_resources_from_skill_resources(client, app_module):
+    conn = app_module.get_db_connection()
+    try:
+        conn.execute("UPDATE skills SET learning_resources = ? WHERE name = 'Machine Learning'",
+                     (json.dumps(['Updated Course']),))
+        career_id = conn.execute("SELECT id FROM career_paths WHERE title = 'Data Scientist'").fetchone()[0]
+        conn.commit()
+    finally:
+        conn.close()
+
+    user_id = client.post('/api/register', json={'name': 'Asha', 'email': 'asha@example.com',
+                                                 'current_skills': ['Python']}).get_json()['user_id']
+    response = client.post('/api/learning-path', json={'career_id': career_id, 'user_id': user_id})
+    path = response.get_json()['learning_path']
+    assert path['current_skills'] == ['Python']
+    assert 'Python' not in path['skills_to_learn']
+    assert path['learning_resources']['Machine Learning']['resources'] == ['Updated Course']
@@ -0,0 +1,176 @@
+import json
+import sqlite3
+
+import pytest
+
+from catalog import catalog_version
+from database.init_db import CATALOG_TABLES
+from database.migrations import LATEST_VERSION, MIGRATIONS, migrate, schema_version
+
+# The tables app.py's init_db() created before migrations existed
+OLD_APP_SCHEMA = '''
+    CREATE TABLE users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        age INTEGER,
+        education_level TEXT,
+        interests TEXT,
+        current_skills TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE career_paths (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        industry TEXT,
+        required_skills TEXT,
+        average_salary_min INTEGER,
+        average_salary_max INTEGER,
+        growth_potential TEXT,
+        education_requirements TEXT
+    );
+    CREATE TABLE skills (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        category TEXT,
+        difficulty_level TEXT,
+        learning_resources TEXT
+    );
+'''
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    migrate(conn)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def old_conn():
+    """A database created by the pre-migration app.py, with one row in each table"""
+    conn = sqlite3.connect(':memory:')
+    conn.executescript(OLD_APP_SCHEMA)
+    conn.execute('''
+        INSERT INTO users (name, email, interests, current_skills) VALUES ('Ravi', 'ravi@example.com', ?, ?)
+    ''', (json.dumps(['Finance']), json.dumps(['Excel', 'SQL'])))
+    conn.execute('''
+        INSERT INTO career_paths (title, industry, required_skills, average_salary_min, average_salary_max)
+        VALUES ('Data Analyst', 'Technology', ?, 400000, 900000)
+    ''', (json.dumps(['SQL', 'Excel', 'Statistics']),))
+    conn.execute("INSERT INTO skills (name, category, learning_resources) VALUES ('SQL', 'Technical', ?)",
+                 (json.dumps(['SQLBolt']),))
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def schema(conn):
+    return sorted(conn.execute('SELECT type, name, sql FROM sqlite_master').fetchall(), key=repr)
+
+
+def row_counts(conn):
+    return {name: conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0] for (name,) in
+            conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")}
+
+
+def links(conn, table, owner_column, item_column, owner_id):
+    return [row[0] for row in conn.execute(
+        f'SELECT {item_column} FROM {table} WHERE {owner_column} = ? ORDER BY position', (owner_id,))]
+
+
+def test_skill_resources_follow_skills(conn):
+    cursor = conn.execute("INSERT INTO skills (name, learning_resources) VALUES ('Go', ?)",
+                          (json.dumps(['Tour of Go', 'Go by Example']),))
+    skill_id = cursor.lastrowid
+    assert links(conn, 'skill_resources', 'skill_id', 'resource', skill_id) == ['Tour of Go', 'Go by Example']
+
+    conn.execute('UPDATE skills SET learning_resources = ? WHERE id = ?', (json.dumps(['Effective Go']), skill_id))
+    assert links(conn, 'skill_resources', 'skill_id', 'resource', skill_id) == ['Effective Go']
+
+    conn.execute("UPDATE skills SET learning_resources = 'not json' WHERE id = ?", (skill_id,))
+    assert links(conn, 'skill_resources', 'skill_id', 'resource', skill_id) == []
+
+    conn.execute('DELETE FROM skills WHERE id = ?', (skill_id,))
+    assert conn.execute('SELECT COUNT(*) FROM skill_resources').fetchone()[0] == 0
+
+
+def test_user_links_follow_users(conn):
+    cursor = conn.execute('''
+        INSERT INTO users (name, email, interests, current_skills) VALUES ('Asha', 'asha@example.com', ?, ?)
+    ''', (json.dumps(['Data', '']), json.dumps(['Python', 'SQL', 'Python'])))
+    user_id = cursor.lastrowid
+    assert links(conn, 'user_skills', 'user_id', 'skill', user_id) == ['Python', 'SQL']
+    assert links(conn, 'user_interests', 'user_id', 'interest', user_id) == ['Data']
+
+    conn.execute('UPDATE users SET current_skills = ? WHERE id = ?', (json.dumps(['Java']), user_id))
+    assert links(conn, 'user_skills', 'user_id', 'skill', user_id) == ['Java']
+    assert links(conn, 'user_interests', 'user_id', 'interest', user_id) == ['Data']
+
+    conn.execute('DELETE FROM users WHERE id = ?', (user_id,))
+    assert conn.execute('SELECT COUNT(*) FROM user_skills').fetchone()[0] == 0
+    assert conn.execute('SELECT COUNT(*) FROM user_interests').fetchone()[0] == 0
+
+
+def test_old_app_database_is_migrated(old_conn):
+    assert schema_version(old_conn) == 0
+    assert migrate(old_conn) == [version for version, _, _ in MIGRATIONS]
+    assert schema_version(old_conn) == LATEST_VERSION
+
+    columns = {row[1] for row in old_conn.execute('PRAGMA table_info(career_paths)')}
+    assert {'average_salary_range', 'job_outlook', 'average_salary_min'} <= columns
+    career_id = old_conn.execute('SELECT id FROM career_paths').fetchone()[0]
+    assert links(old_conn, 'career_skills', 'career_id', 'skill', career_id) == ['SQL', 'Excel', 'Statistics']
+    user_id = old_conn.execute('SELECT id FROM users').fetchone()[0]
+    assert links(old_conn, 'user_skills', 'user_id', 'skill', user_id) == ['Excel', 'SQL']
+    assert links(old_conn, 'user_interests', 'user_id', 'interest', user_id) == ['Finance']
+    skill_id = old_conn.execute('SELECT id FROM skills').fetchone()[0]
+    assert links(old_conn, 'skill_resources', 'skill_id', 'resource', skill_id) == ['SQLBolt']
+    with pytest.raises(sqlite3.IntegrityError):
+        old_conn.execute("INSERT INTO skills (name) VALUES ('SQL')")
+
+
+def test_rerunning_migrations_is_a_no_op(old_conn):
+    migrate(old_conn)
+    before = schema(old_conn), row_counts(old_conn)
+    assert migrate(old_conn) == []
+    # Every migration is idempotent on its own too, not just skipped by schema_version
+    for _, _, apply in MIGRATIONS:
+        apply(old_conn)
+    old_conn.commit()
+    assert (schema(old_conn), row_counts(old_conn)) == before
+
+
+def test_career_skills_follow_career_paths(conn):
+    cursor = conn.execute("INSERT INTO career_paths (title, required_skills) VALUES ('Designer', ?)",
+                          (json.dumps(['Figma', 'Sketch']),))
+    career_id = cursor.lastrowid
+    assert links(conn, 'career_skills', 'career_id', 'skill', career_id) == ['Figma', 'Sketch']
+
+    conn.execute('UPDATE career_paths SET required_skills = ? WHERE id = ?', (json.dumps(['Figma']), career_id))
+    assert links(conn, 'career_skills', 'career_id', 'skill', career_id) == ['Figma']
+
+    conn.execute('DELETE FROM career_paths WHERE id = ?', (career_id,))
+    assert conn.execute('SELECT COUNT(*) FROM career_skills').fetchone()[0] == 0
+
+
+@pytest.mark.parametrize('table, insert, update, delete', [
+    ('career_paths', "INSERT INTO career_paths (title) VALUES ('Chef')",
+     "UPDATE career_paths SET industry = 'Food'", 'DELETE FROM career_paths'),
+    ('skills', "INSERT INTO skills (name) VALUES ('Cooking')",
+     "UPDATE skills SET category = 'Craft'", 'DELETE FROM skills'),
+    ('skill_aliases', "INSERT INTO skill_aliases (alias, skill) VALUES ('cook', 'Cooking')",
+     "UPDATE skill_aliases SET skill = 'Cookery' WHERE alias = 'cook'",
+     "DELETE FROM skill_aliases WHERE alias = 'cook'"),
+])
+def test_catalog_writes_bump_catalog_version(conn, table, insert, update, delete):
+    assert table in CATALOG_TABLES
+    others = {other: catalog_version(conn, other) for other in CATALOG_TABLES if other != table}
+    versions = [catalog_version(conn, table)]
+    for statement in (insert, update, delete):
+        conn.execute(statement)
+        versions.append(catalog_version(conn, table))
+    assert versions == sorted(set(versions))
+    assert {other: catalog_version(conn, other) for other in others} == others
@@ -0,0 +1,129 @@
+import json
+import sqlite3
+
+import pytest
+
+import scoring
+from database.init_db import seed_sample_data
+from database.migrations import migrate
+from scoring import SkillScoringEngine, TfidfScorer, get_scoring_engine, skill_overlap_recommendation
+
+CAREERS = [
+    {'id': 1, 'title': 'Data Scientist', 'industry': 'Technology', 'description': 'Analyze data'},
+    {'id': 2, 'title': 'Graphic Designer', 'industry': 'Media', 'description': 'Design visuals'}
+]
+REQUIRED_SKILLS = [['Python', 'Statistics'], ['Photoshop', 'Illustrator']]
+
+
+def contributions(interest_weight):
+    """(skill term, interest term) contributions to the first career's score"""
+    scorer = TfidfScorer(CAREERS, REQUIRED_SKILLS, interest_weight=interest_weight)
+    user = scorer.user_vector(['Python'], ['data'])
+    career = {term: weight for term, postings in scorer.postings.items()
+              for index, weight in postings if index == 0}
+    return [user[term] * career[term] for term in sorted(user)]
+
+
+def test_interest_weight_is_applied_once():
+    skill_full, text_full = contributions(1.0)
+    skill_half, text_half = contributions(0.5)
+    # Halving the weight halves the interest/skill ratio; applied on both sides it would quarter it
+    assert (text_half / skill_half) == pytest.approx(0.5 * text_full / skill_full)
+
+
+def test_career_vectors_do_not_depend_on_interest_weight():
+    assert TfidfScorer(CAREERS, REQUIRED_SKILLS, 0.2).postings == \
+        TfidfScorer(CAREERS, REQUIRED_SKILLS, 1.0).postings
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """(engine, [(career dict, required skills)]) over the seeded catalog"""
+    path = str(tmp_path / 'catalog.db')
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    migrate(conn)
+    seed_sample_data(path)
+    scoring._engine = None
+    try:
+        engine = get_scoring_engine(conn)
+        careers = [(dict(row), json.loads(row['required_skills'])) for row in
+                   conn.execute('SELECT * FROM career_paths')]
+        yield engine, careers
+    finally:
+        scoring._engine = None
+        conn.close()
+
+
+USERS = [
+    [],
+    ['Python'],
+    ['python', ' SQL ', 'Machine  Learning'],
+    ['Java', 'JavaScript', 'React', 'Node.js'],
+    ['Communication', 'Excel', 'Not A Real Skill'],
+]
+
+
+@pytest.mark.parametrize('user_skills', USERS)
+def test_engine_matches_skill_overlap_recommendation(catalog, user_skills):
+    engine, careers = catalog
+    expected = [skill_overlap_recommendation(career_dict, required_skills, user_skills)
+                for career_dict, required_skills in careers]
+    assert engine.scores(user_skills) == [r['match_score'] for r in expected]
+    assert engine.overlap_counts(user_skills) == [int(r['reasoning'].split()[2]) for r in expected]
+
+    best = sorted(expected, key=lambda r: -r['match_score'])[:5]
+    recommended = engine.recommend(user_skills, k=5)
+    assert [r['match_score'] for r in recommended] == [r['match_score'] for r in best]
+    for recommendation in recommended:
+        assert recommendation in expected
+
+
+def test_skills_match_case_and_whitespace_insensitively(catalog):
+    engine, _ = catalog
+    assert engine.overlap_counts(['python', ' MACHINE   learning ']) == \
+        engine.overlap_counts(['Python', 'Machine Learning'])
+    assert any(engine.overlap_counts(['python']))
+
+
+def small_engine():
+    careers = [
+        {'id': 10, 'title': 'Analyst', 'required_skills': json.dumps(['SQL', 'Excel', 'Statistics'])},
+        {'id': 11, 'title': 'Engineer', 'required_skills': json.dumps(['Python', 'SQL'])},
+        {'id': 12, 'title': 'Designer', 'required_skills': json.dumps(['Figma'])},
+        {'id': 13, 'title': 'Scientist', 'required_skills': json.dumps(['Python', 'SQL', 'Statistics'])},
+        {'id': 14, 'title': 'Writer', 'required_skills': '[]'},
+    ]
+    return SkillScoringEngine(careers)
+
+
+def test_candidates_prune_careers_below_min_overlap():
+    engine = small_engine()
+    assert engine.candidates(['sql'], min_overlap=1, limit=0) == ([0, 1, 3], 2)
+    assert engine.candidates(['SQL', 'Python'], min_overlap=2, limit=0) == ([1, 3], 3)
+    assert engine.candidates(['SQL'], min_overlap=0, limit=1) == ([0, 1, 2, 3, 4], 0)
+
+
+def test_candidates_keep_the_most_shared_skills_up_to_limit():
+    engine = small_engine()
+    # Scientist shares 3, Analyst and Engineer 2 each; Engineer wins the tie on required-skill share
+    indexes, pruned = engine.candidates(['SQL', 'Python', 'Statistics', 'Excel'], min_overlap=1, limit=2)
+    assert (indexes, pruned) == ([0, 3], 3)
+    indexes, _ = engine.candidates(['SQL', 'Python', 'Statistics'], min_overlap=1, limit=2)
+    assert indexes == [1, 3]
+
+
+def test_candidates_without_shared_skills_fall_back_to_catalog_order():
+    engine = small_engine()
+    assert engine.candidates(['Cooking'], min_overlap=1, limit=2) == ([0, 1], 3)
+    assert engine.candidates([], min_overlap=1, limit=0) == ([0, 1, 2, 3, 4], 0)
+    assert engine.candidates(['Cooking'], min_overlap=1, limit=50) == ([0, 1, 2, 3, 4], 0)
+
+
+def test_candidates_default_to_the_configured_limits(monkeypatch):
+    engine = small_engine()
+    monkeypatch.setattr(scoring, 'ASSESS_MIN_OVERLAP', 1)
+    monkeypatch.setattr(scoring, 'ASSESS_MAX_CANDIDATES', 1)
+    assert engine.candidates(['Cooking']) == ([0], 4)
+    # All share one skill; Designer owns all of its required skills
+    assert engine.candidates(['Figma', 'SQL']) == ([2], 4)
@@ -0,0 +1,35 @@
+import sqlite3
+
+import pytest
+
+from database.migrations import migrate
+from search import highlight, search_available, search_catalog
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    migrate(conn)
+    if not search_available(conn):
+        pytest.skip('SQLite built without FTS5')
+    conn.execute('''
+        INSERT INTO career_paths (title, description, required_skills, industry)
+        VALUES (?, ?, '[]', 'Technology')
+    ''', ('Data <script>alert(1)</script> Scientist', 'Builds "models" & <b>pipelines</b> for data'))
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_snippet_is_escaped_around_the_marks(conn):
+    [result] = search_catalog(conn, 'data', kinds=('careers',))['careers']
+    snippet = result['snippet']
+    assert '<script>' not in snippet and '<b>' not in snippet
+    assert '&lt;script&gt;' in snippet
+    assert '<mark>Data</mark>' in snippet
+
+
+def test_highlight_escapes_text_but_keeps_markers():
+    assert highlight('a < b \ue000match\ue001 & "c"') == 'a &lt; b <mark>match</mark> &amp; &quot;c&quot;'
+    assert highlight(None) == ''
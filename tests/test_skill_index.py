@@ -0,0 +1,67 @@
+import sqlite3
+
+import pytest
+
+import skill_index
+from database.migrations import migrate
+from skill_index import SkillIndex, get_skill_index
+
+NAMES = ['Machine Learning', 'Python', 'Marketing', '  Data   Analysis ', 'python']
+ALIASES = [('ML', 'machine learning'), ('python3', 'Python'), ('Py', 'PYTHON'), ('Marketing', 'Sales')]
+
+
+@pytest.fixture
+def index():
+    return SkillIndex(NAMES, ALIASES)
+
+
+def test_canonicalize_names_and_aliases(index):
+    assert len(index) == 4
+    assert index.canonicalize('  machine   LEARNING') == 'Machine Learning'
+    assert index.canonicalize('ml') == 'Machine Learning'
+    assert index.canonicalize('Python3') == 'Python'
+    assert index.canonicalize('data analysis') == 'Data Analysis'
+    assert index.canonicalize('  Rust  lang ') == 'Rust lang'
+
+
+def test_alias_never_shadows_a_real_skill(index):
+    assert index.canonicalize('marketing') == 'Marketing'
+
+
+def test_canonicalize_all_drops_blanks_duplicates_and_non_strings(index):
+    assert index.canonicalize_all(['ML', 'machine learning', ' ', None, 'py', 'Go']) == \
+        ['Machine Learning', 'Python', 'Go']
+
+
+def test_suggest_ranks_whole_name_prefixes_before_later_words(index):
+    assert [s['name'] for s in index.suggest('ma')] == ['Machine Learning', 'Marketing']
+    assert index.suggest('an') == [{'name': 'Data Analysis', 'alias': None}]
+    assert [s['name'] for s in index.suggest('l')] == ['Machine Learning']
+    assert index.suggest('ma', limit=1) == [{'name': 'Machine Learning', 'alias': None}]
+
+
+def test_suggest_shows_the_alias_only_when_the_name_does_not_match(index):
+    assert index.suggest('ml') == [{'name': 'Machine Learning', 'alias': 'ML'}]
+    assert index.suggest('py') == [{'name': 'Python', 'alias': None}]
+    assert index.suggest('PYTHON3') == [{'name': 'Python', 'alias': 'python3'}]
+    assert index.suggest('   ') == []
+    assert index.suggest('zz') == []
+
+
+def test_shared_index_is_rebuilt_when_the_catalog_changes(monkeypatch):
+    monkeypatch.setattr(skill_index, '_index', None)
+    conn = sqlite3.connect(':memory:')
+    migrate(conn)
+    conn.execute("INSERT INTO skills (name) VALUES ('Kotlin')")
+    first = get_skill_index(conn)
+    assert get_skill_index(conn) is first
+    assert first.canonicalize('kotlin') == 'Kotlin'
+
+    conn.execute("INSERT INTO skill_aliases (alias, skill) VALUES ('kt', 'Kotlin')")
+    conn.execute("INSERT INTO career_paths (title, required_skills) VALUES ('Android Developer', ?)",
+                 ('["Jetpack Compose"]',))
+    second = get_skill_index(conn)
+    assert second is not first
+    assert second.canonicalize('KT') == 'Kotlin'
+    assert second.canonicalize('jetpack compose') == 'Jetpack Compose'
+    conn.close()